@@ -0,0 +1,439 @@
+"""
+Katana Game Benchmark Automation Framework - Core Asyncio Module
+
+This module provides asyncio counterparts of the detection and interaction
+primitives. All waiters share a single capture loop, matching and input run
+in an executor, and cancelling a waiting task stops its polling immediately,
+so an orchestrator can watch several conditions at once (e.g. an end screen,
+a crash dialog and a timeout) with first_of().
+
+Example:
+    adetector = AsyncImageDetector(benchmark.detector)
+    name, result = await first_of({
+        "finished": adetector.wait_for("benchmark_end_screen.png", timeout=600),
+        "crashed": adetector.wait_for("crash_dialog.png", timeout=600),
+    }, timeout=600)
+"""
+import time
+import asyncio
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .templates import Template
+
+logger = logging.getLogger("katana")
+
+class AsyncCaptureLoop:
+    """Shared capture loop serving full frames to any number of async waiters
+    
+    The loop only captures while at least one waiter is waiting for a frame,
+    at most once per interval. Waiters that search a region get a view of the
+    shared full frame.
+    """
+    
+    def __init__(self, capture, interval=0.1):
+        """Initialize the capture loop
+        
+        Args:
+            capture (CaptureBackend): Backend frames are captured with
+            interval (float): Minimum time between captures in seconds
+        """
+        self.capture = capture
+        self.interval = interval
+        self.frames = 0
+        self._frame = None
+        self._timestamp = None
+        self._error = None
+        self._waiters = 0
+        self._task = None
+        self._condition = None
+        self._loop = None
+        # Captures run on one dedicated thread, never blocking the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="katana-capture")
+    
+    def _ensure_running(self):
+        """Start the capture task on the running event loop if needed"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # First use, or a new event loop (e.g. a later asyncio.run)
+            self._loop = loop
+            self._condition = asyncio.Condition()
+            self._task = None
+        if self._task is None:
+            self._error = None
+            self._task = loop.create_task(self._run())
+    
+    def _grab(self):
+        """Capture a frame (runs on the capture thread)"""
+        frame, timestamp = self.capture.grab_timestamped()
+        # Backends may reuse their buffer on the next capture while waiters still match
+        return frame.copy(), timestamp
+    
+    async def _run(self):
+        """Capture frames while anyone is waiting for one"""
+        loop = asyncio.get_running_loop()
+        try:
+            while self._waiters > 0:
+                try:
+                    frame, timestamp = await loop.run_in_executor(self._executor, self._grab)
+                except Exception as e:
+                    logger.error(f"❌ Capture loop failed: {e}")
+                    async with self._condition:
+                        self._error = e
+                        self._condition.notify_all()
+                    return
+                
+                async with self._condition:
+                    self._frame, self._timestamp = frame, timestamp
+                    self.frames += 1
+                    self._condition.notify_all()
+                await asyncio.sleep(self.interval)
+        finally:
+            self._task = None
+    
+    async def next_frame(self, after=None, region=None):
+        """Wait for a frame captured after a given time
+        
+        Args:
+            after (float, optional): Only accept frames captured later than this timestamp
+            region (tuple, optional): Region to return (left, top, width, height)
+            
+        Returns:
+            tuple: (frame, timestamp) with the frame cropped to the region
+        """
+        self._waiters += 1
+        try:
+            self._ensure_running()
+            async with self._condition:
+                await self._condition.wait_for(
+                    lambda: self._error is not None or
+                    (self._timestamp is not None and (after is None or self._timestamp > after)))
+                if self._error is not None:
+                    raise self._error
+                frame, timestamp = self._frame, self._timestamp
+        finally:
+            self._waiters -= 1
+        
+        if region:
+            left, top, width, height = region
+            frame = frame[top:top + height, left:left + width]
+        return frame, timestamp
+    
+    def close(self):
+        """Stop the capture thread"""
+        if self._task is not None:
+            self._task.cancel()
+        self._executor.shutdown(wait=False)
+
+
+class AsyncImageDetector:
+    """Asyncio counterpart of ImageDetector's find and wait methods
+    
+    Templates may be given as paths or as loaded Template objects (e.g. from
+    ImageDetector.load_scaled_template). Return values match the blocking
+    methods of ImageDetector.
+    """
+    
+    def __init__(self, detector, executor=None, capture_interval=0.1):
+        """Initialize the async detector
+        
+        Args:
+            detector (ImageDetector): Detector that performs the matching
+            executor (Executor, optional): Executor matching runs in (default: the event loop's)
+            capture_interval (float): Minimum time between shared captures in seconds
+        """
+        self.detector = detector
+        self.executor = executor
+        self.capture_interval = capture_interval
+        self._capture_loop = None
+    
+    @property
+    def capture_loop(self):
+        """AsyncCaptureLoop: Shared capture loop of the detector's current capture backend"""
+        if self._capture_loop is None or self._capture_loop.capture is not self.detector.capture:
+            if self._capture_loop is not None:
+                self._capture_loop.close()
+            self._capture_loop = AsyncCaptureLoop(self.detector.capture, self.capture_interval)
+        return self._capture_loop
+    
+    def _load(self, template):
+        """Load a template given as a path or Template"""
+        return template if isinstance(template, Template) else self.detector.load_template(template)
+    
+    async def _match(self, templates, frame, region, threshold, timestamp):
+        """Score loaded templates against a frame in the executor"""
+        def score(cached):
+            return self.detector.match_template(cached, region=region, frame=frame,
+                                                threshold=threshold, timestamp=timestamp)
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.detector._map, score, templates)
+    
+    async def _poll(self, templates, timeout, check_interval, threshold, region, skip_unchanged, gone=False):
+        """Poll shared frames until a template appears (or all are gone)
+        
+        Args:
+            templates (list): Loaded templates
+            timeout (float): Maximum time to wait in seconds
+            check_interval (float): Time between checks in seconds
+            threshold (float): Confidence threshold (0.0-1.0)
+            region (tuple, optional): Region to search in (left, top, width, height)
+            skip_unchanged (bool): Skip matching while the frame has not changed
+            gone (bool): Wait for no template to match instead of one to match
+            
+        Returns:
+            MatchResult or bool or None: First passing match (or True once gone), None on timeout
+        """
+        loop = asyncio.get_running_loop()
+        change_detector = self.detector.change_detector
+        deadline = loop.time() + timeout
+        # Only frames captured after the wait started count
+        last_timestamp = time.time()
+        last_signature = None
+        
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            try:
+                frame, last_timestamp = await asyncio.wait_for(
+                    self.capture_loop.next_frame(after=last_timestamp, region=region), remaining)
+            except asyncio.TimeoutError:
+                return None
+            
+            if skip_unchanged:
+                signature = change_detector.signature(frame)
+                if not change_detector.has_changed(last_signature, signature):
+                    change_detector.record_skip()
+                    await asyncio.sleep(min(check_interval, max(0.0, deadline - loop.time())))
+                    continue
+                last_signature = signature
+            
+            matches = await self._match(templates, frame, region, threshold, last_timestamp)
+            passing = [match for match in matches if match is not None and match.passes(threshold)]
+            if gone and not passing:
+                return True
+            if not gone and passing:
+                return passing[0]
+            
+            await asyncio.sleep(min(check_interval, max(0.0, deadline - loop.time())))
+    
+    async def find(self, template, threshold=0.8, region=None):
+        """Find a template in the next captured frame
+        
+        Args:
+            template (str or Template): Template path or loaded template
+            threshold (float): Confidence threshold (0.0-1.0)
+            region (tuple, optional): Region to search in (left, top, width, height)
+            
+        Returns:
+            tuple or None: (x, y) coordinates of match center if found, None otherwise
+        """
+        cached = self._load(template)
+        if cached is None:
+            return None
+        
+        frame, timestamp = await self.capture_loop.next_frame(after=time.time(), region=region)
+        match = (await self._match([cached], frame, region, threshold, timestamp))[0]
+        if match is not None and match.passes(threshold):
+            logger.info(f"✅ Match found for {cached.name} at {match.location} with confidence {match.confidence:.2f}")
+            return match.location
+        logger.warning(f"⚠️ No match found for {cached.name} (max confidence {match.confidence if match else 0.0:.2f})")
+        return None
+    
+    async def wait_for(self, template, timeout=30, check_interval=1, threshold=0.8, region=None,
+                       skip_unchanged=True):
+        """Wait until a template appears on screen or timeout
+        
+        Args:
+            template (str or Template): Template path or loaded template
+            timeout (float): Maximum time to wait in seconds
+            check_interval (float): Time between checks in seconds
+            threshold (float): Confidence threshold (0.0-1.0)
+            region (tuple, optional): Region to search in (left, top, width, height)
+            skip_unchanged (bool): Skip matching while the frame has not changed
+            
+        Returns:
+            tuple or None: (x, y) coordinates of match center if found, None otherwise
+        """
+        template_path, location = await self.wait_for_any([template], timeout, check_interval, threshold,
+                                                          region, skip_unchanged)
+        return location
+    
+    async def wait_for_any(self, templates, timeout=30, check_interval=1, threshold=0.8, region=None,
+                           skip_unchanged=True):
+        """Wait until any of the templates appears on screen or timeout
+        
+        Args:
+            templates (list): Template paths or loaded templates
+            timeout (float): Maximum time to wait in seconds
+            check_interval (float): Time between checks in seconds
+            threshold (float): Confidence threshold (0.0-1.0)
+            region (tuple, optional): Region to search in (left, top, width, height)
+            skip_unchanged (bool): Skip matching while the frame has not changed
+            
+        Returns:
+            tuple: (template_path, (x, y)) of the first template found, or (None, None) on timeout
+        """
+        loaded = [cached for cached in (self._load(template) for template in templates) if cached is not None]
+        if not loaded:
+            return None, None
+        
+        names = [cached.name for cached in loaded]
+        start_time = time.time()
+        logger.info(f"⏳ Waiting for any of {names} (timeout: {timeout}s)...")
+        
+        match = await self._poll(loaded, timeout, check_interval, threshold, region, skip_unchanged)
+        elapsed = time.time() - start_time
+        if match is None:
+            logger.warning(f"⌛ Timeout after {elapsed:.1f}s waiting for any of {names}")
+            return None, None
+        
+        logger.info(f"✅ Found {match.name} at {match.location} with confidence {match.confidence:.2f} after {elapsed:.1f}s")
+        return match.template_path, match.location
+    
+    async def wait_until_gone(self, template, timeout=10, check_interval=0.5, threshold=0.8, region=None):
+        """Wait until a template is no longer on screen
+        
+        Args:
+            template (str or Template): Template path or loaded template
+            timeout (float): Maximum time to wait in seconds
+            check_interval (float): Time between checks in seconds
+            threshold (float): Confidence threshold (0.0-1.0)
+            region (tuple, optional): Region to search in (left, top, width, height)
+            
+        Returns:
+            bool: True if the template disappeared, False on timeout
+        """
+        cached = self._load(template)
+        if cached is None:
+            return True
+        return bool(await self._poll([cached], timeout, check_interval, threshold, region,
+                                     skip_unchanged=False, gone=True))
+    
+    def close(self):
+        """Stop the shared capture loop"""
+        if self._capture_loop is not None:
+            self._capture_loop.close()
+            self._capture_loop = None
+
+
+class AsyncGameInteractor:
+    """Asyncio counterpart of GameInteractor's input and click methods"""
+    
+    def __init__(self, interactor, detector=None, executor=None):
+        """Initialize the async interactor
+        
+        Args:
+            interactor (GameInteractor): Interactor that sends the input
+            detector (AsyncImageDetector, optional): Async detector to share (created if None)
+            executor (Executor, optional): Executor input and matching run in (default: the event loop's)
+        """
+        self.interactor = interactor
+        self.executor = executor
+        self.detector = detector or AsyncImageDetector(interactor.detector, executor)
+    
+    async def _run(self, function, *args, **kwargs):
+        """Run a blocking interactor call in the executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+    
+    async def click(self, x, y, **click_kwargs):
+        """Click at the specified coordinates (see GameInteractor.click)"""
+        return await self._run(self.interactor.click, x, y, **click_kwargs)
+    
+    async def press_key(self, key, presses=1, interval=None):
+        """Press a key (see GameInteractor.press_key)"""
+        return await self._run(self.interactor.press_key, key, presses, interval)
+    
+    async def type_text(self, text, interval=0.05):
+        """Type text with the keyboard (see GameInteractor.type_text)"""
+        return await self._run(self.interactor.type_text, text, interval)
+    
+    async def click_template(self, template_path, threshold=0.8, region=None, wait_disappear=False,
+                             disappear_timeout=10, click_offset=(0, 0), timeout=0, **click_kwargs):
+        """Find and click on a template image
+        
+        Args:
+            template_path (str): Path to template image
+            threshold (float): Confidence threshold (0.0-1.0)
+            region (tuple, optional): Region to search in (left, top, width, height)
+            wait_disappear (bool): Whether to wait for template to disappear after click
+            disappear_timeout (int): Timeout for template to disappear in seconds
+            click_offset (tuple): (x, y) offset from template center to click
+            timeout (float): Time to wait for the template to appear (0 checks a single frame)
+            **click_kwargs: Additional arguments for click method
+            
+        Returns:
+            bool: True if template was found and clicked, False otherwise
+        """
+        template_path = Path(template_path)
+        logger.info(f"🖱️ Searching and clicking: {template_path.name}")
+        
+        if timeout > 0:
+            match = await self.detector.wait_for(template_path, timeout=timeout, threshold=threshold,
+                                                 region=region, check_interval=0.5)
+        else:
+            match = await self.detector.find(template_path, threshold=threshold, region=region)
+        
+        if not match:
+            logger.error(f"❌ Failed to find template: {template_path.name}")
+            return False
+        
+        # Apply click offset
+        x, y = match
+        success = await self.click(x + click_offset[0], y + click_offset[1], **click_kwargs)
+        
+        if success and wait_disappear:
+            logger.info(f"⏳ Waiting for {template_path.name} to disappear...")
+            if await self.detector.wait_until_gone(template_path, timeout=disappear_timeout,
+                                                   threshold=threshold, region=region):
+                logger.info(f"✅ Template {template_path.name} disappeared after click")
+            else:
+                logger.warning(f"⚠️ Template {template_path.name} did not disappear after click")
+        
+        return success
+
+
+def _has_result(result):
+    """Check whether a raced condition finished with a result"""
+    return result is not None and result is not False and result != (None, None)
+
+
+async def first_of(conditions, timeout=None):
+    """Race several conditions and return the first one that produces a result
+    
+    Conditions that finish without a result (None, False or the (None, None)
+    of a timed-out wait_for_any) drop out of the race. All other conditions
+    are cancelled as soon as one wins.
+    
+    Args:
+        conditions (dict): Awaitables keyed by a name
+        timeout (float, optional): Maximum time to wait in seconds
+        
+    Returns:
+        tuple: (name, result) of the winning condition, or (None, None) if none produced a result
+    """
+    tasks = {asyncio.ensure_future(awaitable): name for name, awaitable in conditions.items()}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout is not None else None
+    pending = set(tasks)
+    
+    try:
+        while pending:
+            remaining = deadline - loop.time() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if _has_result(result):
+                    logger.info(f"🏁 '{tasks[task]}' finished first")
+                    return tasks[task], result
+        return None, None
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
\ No newline at end of file
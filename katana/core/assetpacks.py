@@ -0,0 +1,320 @@
+"""
+Katana Game Benchmark Automation Framework - Core Asset Packs Module
+
+This module pre-renders template assets at the resolutions of a game's
+graphics presets. Templates are captured at a reference resolution (1920x1080)
+and would otherwise be resized on first use in every session; an asset pack
+holds the already scaled (and cropped, see crops.py) templates of one
+resolution so they are only decoded at startup.
+
+Packs are stored in a versioned on-disk cache:
+
+    results/cache/asset_packs/<game>/v<version>/<width>x<height>/
+
+Each pack has a manifest.json keyed by asset name with the content hash of
+the source asset, so edited assets are re-rendered and never served stale.
+
+Usage:
+    python -m katana.core.assetpacks --game cs2 [--resolution 2560x1440] [--force]
+"""
+import cv2
+import json
+import logging
+import argparse
+from pathlib import Path
+
+from .templates import Template, TemplateCache, COLOR_BGR
+from .crops import TemplateCropIndex
+
+logger = logging.getLogger("katana")
+
+# Version of the pack layout and rendering; bumping it invalidates all packs
+ASSET_PACK_VERSION = 1
+
+# Name of the manifest stored in every pack directory
+PACK_MANIFEST_FILE = "manifest.json"
+
+# Default root of the on-disk pack cache
+DEFAULT_PACK_ROOT = Path("results/cache/asset_packs")
+
+# Scale factors closer to 1.0 than this use the source assets directly
+SCALE_TOLERANCE = 0.05
+
+def resolution_scale(resolution, reference_resolution=(1920, 1080)):
+    """Compute the template scale factors of a resolution
+    
+    Args:
+        resolution (tuple): Target (width, height)
+        reference_resolution (tuple): Resolution at which templates were captured
+        
+    Returns:
+        tuple or None: (scale_x, scale_y), or None if templates are used unscaled
+    """
+    scale_x = resolution[0] / reference_resolution[0]
+    scale_y = resolution[1] / reference_resolution[1]
+    if abs(scale_x - 1.0) < SCALE_TOLERANCE and abs(scale_y - 1.0) < SCALE_TOLERANCE:
+        return None
+    return scale_x, scale_y
+
+
+def preset_resolutions(preset_manager, game_id):
+    """Collect the resolutions of a game's presets
+    
+    Args:
+        preset_manager (PresetManager): Preset manager
+        game_id (str): Game identifier
+        
+    Returns:
+        dict: (width, height) -> list of preset ids setting that resolution
+    """
+    resolutions = {}
+    for preset_id in preset_manager.get_available_presets(game_id):
+        if not (preset_manager.presets_dir / game_id / f"{preset_id}.json").is_file():
+            logger.debug(f"No preset file for {preset_id}, skipping")
+            continue
+        resolution = preset_manager.get_preset_resolution(game_id, preset_id)
+        if resolution is not None:
+            resolutions.setdefault(resolution, []).append(preset_id)
+    return resolutions
+
+
+class AssetPack:
+    """Pre-scaled templates of one game at one resolution"""
+    
+    def __init__(self, pack_dir, manifest):
+        """Initialize the asset pack
+        
+        Args:
+            pack_dir (Path): Directory holding the pack
+            manifest (dict): Parsed pack manifest
+        """
+        self.pack_dir = Path(pack_dir)
+        self.manifest = manifest
+    
+    @property
+    def resolution(self):
+        """tuple: (width, height) the pack was rendered for"""
+        return tuple(self.manifest["resolution"])
+    
+    @property
+    def scale(self):
+        """tuple: (scale_x, scale_y) applied to the source assets"""
+        return tuple(self.manifest["scale"])
+    
+    @property
+    def assets(self):
+        """dict: Asset name -> manifest entry"""
+        return self.manifest.get("assets", {})
+    
+    @classmethod
+    def load(cls, pack_dir):
+        """Load a pack from disk
+        
+        Args:
+            pack_dir (Path): Directory holding the pack
+            
+        Returns:
+            AssetPack or None: Pack, or None if it is missing or of another version
+        """
+        manifest_path = Path(pack_dir) / PACK_MANIFEST_FILE
+        if not manifest_path.is_file():
+            return None
+        try:
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load asset pack manifest {manifest_path}: {e}")
+            return None
+        if manifest.get("version") != ASSET_PACK_VERSION:
+            return None
+        return cls(pack_dir, manifest)
+    
+    def stale_assets(self, assets_dir):
+        """Find source assets the pack does not hold an up-to-date variant of
+        
+        Args:
+            assets_dir (Path): Directory holding the source assets
+            
+        Returns:
+            list: Names of missing or edited assets
+        """
+        stale = []
+        for asset in sorted(Path(assets_dir).glob("*.png")):
+            entry = self.assets.get(asset.name)
+            if entry is None or entry["hash"] != TemplateCropIndex.asset_hash(asset):
+                stale.append(asset.name)
+        return stale
+    
+    def templates(self, assets_dir):
+        """Decode the pack's templates
+        
+        Templates are attributed to their source asset path, so they are served
+        for the same lookups that would otherwise resize the source asset.
+        
+        Args:
+            assets_dir (Path): Directory holding the source assets
+            
+        Returns:
+            list: Decoded Template objects (entries of edited assets are skipped)
+        """
+        templates = []
+        stale = set(self.stale_assets(assets_dir))
+        for name, entry in sorted(self.assets.items()):
+            if name in stale:
+                continue
+            image = cv2.imread(str(self.pack_dir / entry["file"]), cv2.IMREAD_COLOR)
+            if image is None:
+                logger.warning(f"⚠️ Failed to load {entry['file']} from asset pack {self.pack_dir}")
+                continue
+            templates.append(Template(
+                Path(assets_dir) / name, image, self.scale, COLOR_BGR,
+                origin=tuple(entry["origin"]), full_size=tuple(entry["full_size"])
+            ))
+        return templates
+
+
+class AssetPackBuilder:
+    """Renders and caches asset packs of one game"""
+    
+    def __init__(self, game_id, assets_dir, pack_root=None, reference_resolution=(1920, 1080), crops=True):
+        """Initialize the builder
+        
+        Args:
+            game_id (str): Game identifier, used as the pack directory name
+            assets_dir (Path): Directory holding the source assets
+            pack_root (Path, optional): Root of the pack cache (default results/cache/asset_packs)
+            reference_resolution (tuple): Resolution at which templates were captured
+            crops (bool): Render distinctive crops of large assets, like the detector matches them
+        """
+        self.game_id = game_id
+        self.assets_dir = Path(assets_dir)
+        self.pack_root = Path(pack_root) if pack_root else DEFAULT_PACK_ROOT
+        self.reference_resolution = reference_resolution
+        # Rendering goes through the template cache so packs match runtime scaling exactly
+        self.template_cache = TemplateCache(crop_index=TemplateCropIndex() if crops else None)
+    
+    def pack_dir(self, resolution):
+        """Get the directory of the pack of a resolution
+        
+        Args:
+            resolution (tuple): (width, height)
+            
+        Returns:
+            Path: Pack directory
+        """
+        return self.pack_root / self.game_id / f"v{ASSET_PACK_VERSION}" / f"{resolution[0]}x{resolution[1]}"
+    
+    def build(self, resolution, force=False):
+        """Render the pack of a resolution, reusing up-to-date entries
+        
+        Args:
+            resolution (tuple): (width, height)
+            force (bool): Re-render every asset
+            
+        Returns:
+            AssetPack or None: Pack, or None if the resolution needs no scaling or rendering failed
+        """
+        scale = resolution_scale(resolution, self.reference_resolution)
+        if scale is None:
+            logger.info(f"📦 {resolution[0]}x{resolution[1]} matches the reference resolution, no asset pack needed")
+            return None
+        
+        pack_dir = self.pack_dir(resolution)
+        existing = None if force else AssetPack.load(pack_dir)
+        previous = existing.assets if existing is not None else {}
+        assets = {}
+        rendered = 0
+        
+        try:
+            pack_dir.mkdir(parents=True, exist_ok=True)
+            for asset in sorted(self.assets_dir.glob("*.png")):
+                asset_hash = TemplateCropIndex.asset_hash(asset)
+                entry = previous.get(asset.name)
+                if entry is not None and entry["hash"] == asset_hash and (pack_dir / entry["file"]).is_file():
+                    assets[asset.name] = entry
+                    continue
+                
+                template = self.template_cache.get(asset, scale=scale)
+                if template is None:
+                    continue
+                if not cv2.imwrite(str(pack_dir / asset.name), template.image):
+                    logger.error(f"❌ Failed to write {asset.name} to asset pack {pack_dir}")
+                    continue
+                assets[asset.name] = {
+                    "hash": asset_hash,
+                    "file": asset.name,
+                    "origin": list(template.origin),
+                    "full_size": list(template.full_size),
+                }
+                rendered += 1
+            
+            manifest = {
+                "version": ASSET_PACK_VERSION,
+                "game": self.game_id,
+                "resolution": list(resolution),
+                "reference_resolution": list(self.reference_resolution),
+                "scale": [round(scale[0], 4), round(scale[1], 4)],
+                "assets": assets,
+            }
+            with open(pack_dir / PACK_MANIFEST_FILE, "w") as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+        except Exception as e:
+            logger.error(f"❌ Failed to build asset pack {pack_dir}: {e}")
+            return None
+        
+        logger.info(f"📦 Asset pack {resolution[0]}x{resolution[1]}: {rendered} rendered, "
+                    f"{len(assets) - rendered} up to date")
+        return AssetPack(pack_dir, manifest)
+    
+    def load_or_build(self, resolution):
+        """Get an up-to-date pack of a resolution, rendering it if needed
+        
+        Args:
+            resolution (tuple): (width, height)
+            
+        Returns:
+            AssetPack or None: Pack, or None if the resolution needs no scaling or rendering failed
+        """
+        if resolution_scale(resolution, self.reference_resolution) is None:
+            return None
+        pack = AssetPack.load(self.pack_dir(resolution))
+        if pack is not None and not pack.stale_assets(self.assets_dir):
+            return pack
+        return self.build(resolution)
+
+
+def main(argv=None):
+    """Command line entry point for building a game's asset packs"""
+    from .presets import PresetManager
+    
+    parser = argparse.ArgumentParser(description="Pre-render template assets at preset resolutions")
+    parser.add_argument("--game", "-g", required=True, help="Game whose assets are rendered")
+    parser.add_argument("--resolution", "-r", help="Render one resolution (WIDTHxHEIGHT) instead of all preset ones")
+    parser.add_argument("--pack-root", type=Path, help="Root of the asset pack cache")
+    parser.add_argument("--force", action="store_true", help="Re-render packs even if up to date")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
+    if args.resolution:
+        width, height = (int(value) for value in args.resolution.lower().split("x"))
+        resolutions = {(width, height): []}
+    else:
+        resolutions = preset_resolutions(PresetManager(), args.game)
+        if not resolutions:
+            print(f"❌ No preset resolutions found for {args.game}")
+            return 1
+    
+    assets_dir = Path(__file__).parent.parent / "games" / args.game / "assets"
+    builder = AssetPackBuilder(args.game, assets_dir, pack_root=args.pack_root)
+    for resolution, preset_ids in sorted(resolutions.items()):
+        pack = builder.build(resolution, force=args.force)
+        label = f"{resolution[0]}x{resolution[1]}"
+        used_by = f" ({', '.join(preset_ids)})" if preset_ids else ""
+        print(f"{label:>10}{used_by}: {pack.pack_dir if pack else 'reference resolution, no pack'}")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
\ No newline at end of file
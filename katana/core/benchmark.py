@@ -11,6 +11,11 @@ from pathlib import Path
 import logging
 from abc import ABC, abstractmethod
 
+from .phases import Phase, PhasePipeline
+from .launch import LaunchTracker
+from .window import GameWindow
+from .durations import DurationStore, steam_build_id
+
 # Configure logger
 logging.basicConfig(
     level=logging.INFO,
@@ -31,11 +36,15 @@ class BenchmarkResult:
         self.run_id = run_id
         self.timestamp = time.strftime("%Y%m%d_%H%M%S")
         self.duration = None
+        self.duration_measured = False
         self.avg_fps = None
         self.min_fps = None
         self.max_fps = None
         self.screenshot_path = None
         self.raw_data = {}
+        self.status = "completed"
+        self.session = "cold"
+        self.phases = []
     
     def to_json(self):
         """Convert results to JSON format"""
@@ -45,11 +54,15 @@ class BenchmarkResult:
             "run_id": self.run_id,
             "timestamp": self.timestamp,
             "duration": self.duration,
+            "duration_measured": self.duration_measured,
             "avg_fps": self.avg_fps,
             "min_fps": self.min_fps,
             "max_fps": self.max_fps,
             "screenshot_path": str(self.screenshot_path) if self.screenshot_path else None,
-            "raw_data": self.raw_data
+            "raw_data": self.raw_data,
+            "status": self.status,
+            "session": self.session,
+            "phases": self.phases
         }, indent=2)
     
     def save(self, output_dir=None):
@@ -67,6 +80,9 @@ class BenchmarkResult:
 class GameBenchmark(ABC):
     """Base class for all game benchmark implementations"""
     
+    # Whether restart_benchmark can re-run the benchmark in a running game
+    supports_warm_session = False
+    
     def __init__(self, game_id, game_name, window_title=None, assets_dir=None, configs=None):
         """Initialize the benchmark with game-specific parameters
         
@@ -87,6 +103,17 @@ class GameBenchmark(ABC):
         self.benchmark_end_time = None
         self.benchmark_duration = None
         
+        # True while the game is kept running between the runs of a warm session
+        self.session_active = False
+        
+        # Graphics preset applied for this series (None = the game's current settings)
+        self.preset_id = None
+        self._duration_store = None
+        
+        # Launch tracking (created on first use) and the latest tracked launch
+        self._launch_tracker = None
+        self.last_launch = None
+        
         # Ensure assets directory exists
         self.assets_dir.mkdir(parents=True, exist_ok=True)
         
@@ -115,15 +142,67 @@ class GameBenchmark(ABC):
         logger.info(f"✅ All required assets found in {self.assets_dir}")
         return True
     
+    def launch_ready_check(self):
+        """Check run once the launched game renders stable frames - may be overridden by subclasses
+        
+        Returns:
+            callable or None: Called without arguments, True when the game is interactive
+        """
+        return None
+    
+    def launch_tracker(self):
+        """Get the tracker of the game's process and window
+        
+        Returns:
+            LaunchTracker or None: Tracker, or None without a 'process_name' config
+        """
+        process_name = self.configs.get("process_name")
+        if not process_name:
+            return None
+        
+        if self._launch_tracker is None:
+            detector = getattr(self, "detector", None)
+            interactor = getattr(self, "interactor", None)
+            window = interactor.get_window(self.window_title) if interactor else GameWindow(self.window_title)
+            self._launch_tracker = LaunchTracker(
+                process_name,
+                window=window,
+                detector=detector,
+                timeout=self.configs.get("launch_timeout", 180),
+                ready_check=self.launch_ready_check(),
+                history_path=self.configs.get("launch_history"),
+            )
+        return self._launch_tracker
+    
     def launch_steam_game(self):
-        """Launch the game via Steam"""
+        """Launch the game via Steam
+        
+        With a 'process_name' config, the launch is tracked until the game is
+        interactive (see LaunchTracker); otherwise a fixed launch_wait_time is waited.
+        
+        Returns:
+            bool: True if the game was launched (and became interactive, when tracked)
+        """
+        tracker = self.launch_tracker()
+        launched_at = time.monotonic()
+        
         logger.info(f"🚀 Launching {self.game_name} via Steam (ID: {self.game_id})...")
         subprocess.Popen(['start', f'steam://rungameid/{self.game_id}'], shell=True)
-        # Wait for game to start (adjustable in subclasses)
-        time.sleep(self.configs.get("launch_wait_time", 30))
+        
+        if tracker is None:
+            # Wait for game to start (adjustable in subclasses)
+            time.sleep(self.configs.get("launch_wait_time", 30))
+            return True
+        
+        self.last_launch = tracker.wait_until_interactive(launched_at)
+        return self.last_launch.ready
     
     def launch(self):
-        """Launch the game - default uses Steam"""
+        """Launch the game - default uses Steam
+        
+        Returns:
+            bool: True if the game was launched
+        """
         launcher = self.configs.get("launcher", "steam")
         if launcher == "steam":
             return self.launch_steam_game()
@@ -168,35 +247,225 @@ class GameBenchmark(ABC):
         """Clean up after benchmark completion"""
         pass
     
-    def execute_benchmark_run(self, run_id=0, is_dry_run=False):
+    def recover(self):
+        """Bring the game back to a known screen after a failed phase - may be overridden by subclasses
+        
+        Returns:
+            bool: True if the game is on a known screen again
+        """
+        return False
+    
+    def close_game(self, graceful=True):
+        """Close the game, terminating its process if it is still running afterwards
+        
+        Teardown drives the game's UI, so it only runs while the game's
+        process is known to be running; after a failed launch, or without a
+        'process_name' config, there is nothing it could safely close.
+        
+        Args:
+            graceful (bool): Run teardown (the game's exit sequence) first; without it the
+                process is terminated right away
+                
+        Returns:
+            bool: True if the game is no longer running (or its process is not tracked)
+        """
+        tracker = self.launch_tracker()
+        if tracker is None or not tracker.is_running():
+            logger.info(f"🧹 {self.game_name} is not running (or not tracked), skipping teardown")
+            return True
+        
+        if graceful:
+            try:
+                self.teardown()
+            except Exception as e:
+                logger.error(f"❌ Teardown failed: {e}")
+        return tracker.terminate(grace=10 if graceful else 0)
+    
+    def relaunch(self):
+        """Close the game and launch and focus it again after a failed phase
+        
+        A running game would only be brought to the front by a new launch,
+        so its process is terminated first.
+        
+        Returns:
+            bool: True if the game was launched and focused
+        """
+        logger.info(f"🔄 Relaunching {self.game_name}...")
+        if not self.close_game(graceful=False):
+            return False
+        return bool(self.launch()) and bool(self.focus_game_window())
+    
+    def restart_benchmark(self):
+        """Bring a running game from the benchmark results back to where start_benchmark
+        can start it again - must be implemented by subclasses supporting warm sessions
+        
+        Returns:
+            bool: True if the benchmark can be started again
+        """
+        return False
+    
+    def check_health(self):
+        """Check that a game kept running between runs is still usable - may be overridden by subclasses
+        
+        Returns:
+            bool: True if the next run can reuse the running game
+        """
+        tracker = self.launch_tracker()
+        if tracker is not None and not tracker.is_running():
+            logger.warning(f"⚠️ {tracker.process_name} is no longer running")
+            return False
+        return bool(self.focus_game_window())
+    
+    def use_preset(self, preset_id):
+        """Record the graphics preset applied for the series (part of the duration store key)
+        
+        Args:
+            preset_id (str): Applied preset
+        """
+        self.preset_id = preset_id
+    
+    def game_build(self):
+        """Get the installed build of the game - may be overridden by subclasses
+        
+        Returns:
+            str or None: Build identifier ('game_build' config, or the Steam build for Steam games)
+        """
+        if self.configs.get("game_build"):
+            return str(self.configs["game_build"])
+        if self.configs.get("launcher", "steam") == "steam":
+            return steam_build_id(self.game_id)
+        return None
+    
+    def duration_store(self):
+        """Get the persistent benchmark duration store
+        
+        Returns:
+            DurationStore or None: Store, or None without a 'duration_cache' config
+        """
+        if self._duration_store is None and self.configs.get("duration_cache"):
+            self._duration_store = DurationStore(self.configs["duration_cache"])
+        return self._duration_store
+    
+    def duration_key(self):
+        """Get the duration store key of this series' benchmark configuration
+        
+        Returns:
+            str or None: Key, or None if the game build is unknown
+        """
+        build = self.game_build()
+        if build is None:
+            logger.warning("⚠️ Game build unknown, benchmark durations are not cached")
+            return None
+        benchmark_map = self.configs.get("benchmark_map", "default")
+        return DurationStore.key(self.game_id, benchmark_map, self.preset_id, build)
+    
+    def invalidate_session(self, reason):
+        """End a warm session, closing the running game so the next run launches it fresh
+        
+        Args:
+            reason (str): Why the running game cannot be reused
+        """
+        if self.session_active:
+            logger.info(f"🔄 Warm session ended: {reason}")
+            self.session_active = False
+            self.close_game()
+    
+    def warm_phases(self, run_id=0):
+        """Declare the phases of a run in an already running game - may be overridden by subclasses
+        
+        Args:
+            run_id (int): ID of the current benchmark run
+            
+        Returns:
+            list: Phases in execution order (see katana.core.phases)
+        """
+        return [
+            Phase("restart", self.restart_benchmark, retries=1, recovery=self.recover),
+            Phase("start", self.start_benchmark, retries=1, recovery=self.recover),
+            Phase("collect", lambda: self.collect_results(run_id)),
+        ]
+    
+    def benchmark_phases(self, run_id=0):
+        """Declare the phases of a benchmark run - may be overridden by subclasses
+        
+        Args:
+            run_id (int): ID of the current benchmark run
+            
+        Returns:
+            list: Phases in execution order (see katana.core.phases)
+        """
+        return [
+            Phase("launch", self.launch),
+            Phase("focus", self.focus_game_window, retries=2, retry_delay=1),
+            Phase("ready", self.wait_until_ready, retries=1, recovery=self.relaunch),
+            Phase("navigate", self.navigate_to_benchmark, retries=1, recovery=self.recover),
+            Phase("start", self.start_benchmark, retries=1, recovery=self.recover),
+            Phase("collect", lambda: self.collect_results(run_id)),
+            Phase("teardown", self.close_game, required=False, cleanup=True),
+        ]
+    
+    def execute_benchmark_run(self, run_id=0, is_dry_run=False, keep_running=False):
         """Execute a complete benchmark run
         
+        The run is a pipeline of phases (see benchmark_phases); the first
+        phase that fails for good aborts the run, and only the teardown still
+        runs. Phase timings and outcomes are saved with the result, and with a
+        failure record for aborted runs.
+        
+        With keep_running, the game is not torn down after the run, and a run
+        following such a run restarts the benchmark in the running game (see
+        warm_phases) as long as its health check passes.
+        
         Args:
             run_id (int): ID of the current benchmark run
             is_dry_run (bool): Whether this is a dry run
+            keep_running (bool): Keep the game running for the next run
             
         Returns:
-            BenchmarkResult: Container with benchmark results
+            BenchmarkResult: Container with benchmark results, None if the run failed
         """
         try:
             logger.info(f"📊 ===== Starting Run {run_id} {'(Dry Run)' if is_dry_run else ''} =====")
             
-            self.launch()
-            self.focus_game_window()
-            self.wait_until_ready()
-            self.navigate_to_benchmark()
-            self.start_benchmark()
+            warm = self.session_active
+            if warm and not self.check_health():
+                logger.warning("⚠️ Health check failed, relaunching the game")
+                self.invalidate_session("health check failed")
+                warm = False
+            
+            if warm:
+                phases = self.warm_phases(run_id)
+            else:
+                phases = self.benchmark_phases(run_id)
+                if keep_running:
+                    phases = [phase for phase in phases if phase.name != "teardown"]
+            
+            pipeline = PhasePipeline(phases)
+            completed = pipeline.run()
+            result = pipeline.value("collect")
+            session = "warm" if warm else "cold"
             
-            result = self.collect_results(run_id)
+            if not completed or not result:
+                logger.error(f"❌ Run {run_id} aborted in phase '{pipeline.failed_phase}'")
+                # Runs keeping the game running have no teardown phase; close the game for the cold relaunch
+                self.session_active = False
+                if not any(phase.name == "teardown" for phase in phases):
+                    self.close_game()
+                failure = BenchmarkResult(self.game_id, run_id)
+                failure.status = "failed"
+                failure.session = session
+                failure.phases = pipeline.report()
+                failure.save()
+                return None
             
             if is_dry_run and hasattr(self, 'benchmark_duration'):
                 logger.info(f"⏱️ Measured benchmark duration: {self.benchmark_duration:.2f} seconds")
             
-            self.teardown()
-            
-            if result:
-                self.results.append(result)
-                result.save()
+            self.session_active = keep_running
+            result.session = session
+            result.phases = pipeline.report()
+            self.results.append(result)
+            result.save()
             
             return result
             
@@ -206,38 +475,91 @@ class GameBenchmark(ABC):
             logger.error(traceback.format_exc())
             return None
     
-    def run_benchmark_series(self, run_count=3, cooldown=120):
+    def run_benchmark_series(self, run_count=3, cooldown=120, warm=None):
         """Run a series of benchmark tests
         
         Args:
             run_count (int): Number of benchmark runs to perform
             cooldown (int): Cooldown time between runs in seconds
+            warm (bool, optional): Keep the game running between runs (default from the
+                'warm_session' config, ignored if the game does not support it)
             
         Returns:
             list: List of BenchmarkResult objects
         """
-        logger.info(f"📦 ======= Starting {self.game_name} Benchmark Series ========")
-        logger.info(f"📌 Config -> Total Runs: {run_count}, Cooldown: {cooldown}s")
+        if warm is None:
+            warm = self.configs.get("warm_session", False)
+        if warm and not self.supports_warm_session:
+            logger.warning(f"⚠️ {self.game_name} cannot restart its benchmark in place, relaunching for every run")
+            warm = False
         
-        # Run 0: Dry run for duration discovery
-        logger.info("\n⏱️ ===== Starting Run 0 (Duration Measurement) =====")
-        dry_run_result = self.execute_benchmark_run(run_id=0, is_dry_run=True)
-        
-        if not hasattr(self, 'benchmark_duration') or self.benchmark_duration is None:
-            logger.error("❌ Failed to determine benchmark duration in dry run")
-            return self.results
+        logger.info(f"📦 ======= Starting {self.game_name} Benchmark Series ========")
+        logger.info(f"📌 Config -> Total Runs: {run_count}, Cooldown: {cooldown}s, "
+                    f"Session: {'warm' if warm else 'cold'}")
         
-        known_duration = self.benchmark_duration
-        logger.info(f"🧊 Cooling down for {cooldown} seconds...\n")
-        time.sleep(cooldown)
+        store = self.duration_store()
+        duration_key = self.duration_key() if store is not None else None
+        cached_duration = store.lookup(duration_key) if duration_key else None
         
-        # Subsequent benchmark runs
-        for i in range(1, run_count + 1):
-            self.execute_benchmark_run(run_id=i, is_dry_run=False)
-            
-            if i < run_count:
+        try:
+            if cached_duration is not None:
+                # A trusted duration of the same map, preset and build makes the dry run unnecessary
+                self.benchmark_duration = cached_duration
+                logger.info(f"⏭️ Skipping dry run, cached benchmark duration: {cached_duration:.2f} seconds")
+            else:
+                # Run 0: Dry run for duration discovery
+                logger.info("\n⏱️ ===== Starting Run 0 (Duration Measurement) =====")
+                dry_run_result = self.execute_benchmark_run(run_id=0, is_dry_run=True, keep_running=warm)
+                self._record_duration(dry_run_result, store, duration_key)
+                
+                if not hasattr(self, 'benchmark_duration') or self.benchmark_duration is None:
+                    logger.error("❌ Failed to determine benchmark duration in dry run")
+                    return self.results
+                
                 logger.info(f"🧊 Cooling down for {cooldown} seconds...\n")
                 time.sleep(cooldown)
+            
+            # Subsequent benchmark runs
+            for i in range(1, run_count + 1):
+                result = self.execute_benchmark_run(run_id=i, is_dry_run=False, keep_running=warm)
+                self._record_duration(result, store, duration_key)
+                
+                if i < run_count:
+                    logger.info(f"🧊 Cooling down for {cooldown} seconds...\n")
+                    time.sleep(cooldown)
+        finally:
+            # A warm session is torn down once, after its last run
+            if self.session_active:
+                self.session_active = False
+                self.close_game()
         
+        self.log_session_overhead()
         logger.info(f"✅ All {run_count} runs completed for {self.game_name}.\n")
-        return self.results
\ No newline at end of file
+        return self.results
+    
+    def _record_duration(self, result, store, duration_key):
+        """Refresh the duration store with a duration measured from the end screen"""
+        if result is None or not result.duration_measured or store is None or duration_key is None:
+            return
+        store.record(duration_key, result.duration)
+        store.save()
+    
+    def log_session_overhead(self):
+        """Log the per-run overhead (everything but result collection) of cold and warm runs
+        
+        Returns:
+            dict: Session kind -> average overhead in seconds, plus 'saved' seconds over the warm runs
+        """
+        overheads = {}
+        for result in self.results:
+            overhead = sum(phase["duration"] for phase in result.phases if phase["name"] != "collect")
+            overheads.setdefault(result.session, []).append(overhead)
+        
+        summary = {session: sum(values) / len(values) for session, values in overheads.items()}
+        for session, average in summary.items():
+            logger.info(f"⏱️ {session.capitalize()} run overhead: {average:.1f}s average over "
+                        f"{len(overheads[session])} run(s)")
+        if "cold" in summary and "warm" in summary:
+            summary["saved"] = (summary["cold"] - summary["warm"]) * len(overheads["warm"])
+            logger.info(f"⚡ Warm session saved {summary['saved']:.1f}s of overhead")
+        return summary
\ No newline at end of file
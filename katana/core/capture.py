@@ -0,0 +1,546 @@
+"""
+Katana Game Benchmark Automation Framework - Core Capture Module
+
+This module provides pluggable screen capture backends for the detector.
+Backends return OpenCV BGR (or grayscale) numpy arrays and keep latency
+and allocation statistics so different capture paths can be compared.
+"""
+import cv2
+import numpy as np
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+logger = logging.getLogger("katana")
+
+class CaptureStats:
+    """Latency and allocation counters for a capture backend"""
+    
+    def __init__(self):
+        """Initialize empty counters"""
+        self.frames = 0
+        self.total_time = 0.0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self._lock = threading.Lock()
+    
+    def record_frame(self, latency):
+        """Record one captured frame
+        
+        Args:
+            latency (float): Time spent capturing the frame in seconds
+        """
+        with self._lock:
+            self.frames += 1
+            self.total_time += latency
+            self.last_latency = latency
+            self.max_latency = max(self.max_latency, latency)
+    
+    def record_allocation(self, nbytes, count=1):
+        """Record full-frame buffer allocations
+        
+        Args:
+            nbytes (int): Bytes allocated per buffer
+            count (int): Number of buffers allocated
+        """
+        with self._lock:
+            self.allocations += count
+            self.allocated_bytes += nbytes * count
+    
+    def report(self):
+        """Get a summary of the counters
+        
+        Returns:
+            dict: Frame count, latency figures (ms) and allocation totals
+        """
+        with self._lock:
+            return {
+                "frames": self.frames,
+                "avg_latency_ms": 1000 * self.total_time / self.frames if self.frames else 0.0,
+                "last_latency_ms": 1000 * self.last_latency,
+                "max_latency_ms": 1000 * self.max_latency,
+                "allocations": self.allocations,
+                "allocated_mb": self.allocated_bytes / (1024 * 1024),
+                "allocations_per_frame": self.allocations / self.frames if self.frames else 0.0,
+            }
+
+
+class CaptureBackend(ABC):
+    """Base class for screen capture backends"""
+    
+    name = "base"
+    
+    def __init__(self):
+        """Initialize the backend"""
+        self.stats = CaptureStats()
+        # Output buffers are per thread so concurrent captures never share memory
+        self._local_buffers = threading.local()
+    
+    def grab(self, region=None, grayscale=False):
+        """Capture the screen or a region of it
+        
+        Frames returned by backends that reuse buffers are overwritten by the
+        next capture of the same size; copy them if they must be kept.
+        
+        Args:
+            region (tuple, optional): Region to capture (left, top, width, height)
+            grayscale (bool): Return a single-channel image instead of BGR
+        
+        Returns:
+            numpy.ndarray: Captured frame
+        """
+        return self.grab_timestamped(region, grayscale)[0]
+    
+    def grab_timestamped(self, region=None, grayscale=False):
+        """Capture a frame together with its capture time
+        
+        Args:
+            region (tuple, optional): Region to capture (left, top, width, height)
+            grayscale (bool): Return a single-channel image instead of BGR
+            
+        Returns:
+            tuple: (frame, timestamp) with the wall-clock time of the capture
+        """
+        timestamp = time.time()
+        start = time.perf_counter()
+        frame = self._grab(region, grayscale)
+        self.stats.record_frame(time.perf_counter() - start)
+        return frame, timestamp
+    
+    @abstractmethod
+    def _grab(self, region, grayscale):
+        """Capture a frame - must be implemented by subclasses"""
+        pass
+    
+    @abstractmethod
+    def screen_size(self):
+        """Get the size of the captured screen
+        
+        Returns:
+            tuple: (width, height) in pixels
+        """
+        pass
+    
+    def _buffer(self, key, shape):
+        """Get a preallocated output buffer, allocating it on first use
+        
+        Args:
+            key (str): Buffer purpose (e.g. 'bgr' or 'gray')
+            shape (tuple): Required array shape
+        
+        Returns:
+            numpy.ndarray: Reusable uint8 buffer
+        """
+        buffers = getattr(self._local_buffers, "buffers", None)
+        if buffers is None:
+            buffers = self._local_buffers.buffers = {}
+        
+        buffer = buffers.get(key)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            buffers[key] = buffer
+            self.stats.record_allocation(buffer.nbytes)
+        return buffer
+    
+    def close(self):
+        """Release backend resources"""
+        self._local_buffers = threading.local()
+
+
+class PyAutoGUICapture(CaptureBackend):
+    """Capture through pyautogui (PIL image -> numpy -> BGR)"""
+    
+    name = "pyautogui"
+    
+    def __init__(self):
+        """Initialize the backend"""
+        super().__init__()
+        import pyautogui
+        self._pyautogui = pyautogui
+    
+    def _grab(self, region, grayscale):
+        if region:
+            screen = self._pyautogui.screenshot(region=region)
+        else:
+            screen = self._pyautogui.screenshot()
+        
+        # PIL image, its numpy copy and the converted frame are all new buffers
+        rgb = np.array(screen)
+        self.stats.record_allocation(rgb.nbytes, count=2)
+        
+        code = cv2.COLOR_RGB2GRAY if grayscale else cv2.COLOR_RGB2BGR
+        frame = cv2.cvtColor(rgb, code)
+        self.stats.record_allocation(frame.nbytes)
+        return frame
+    
+    def screen_size(self):
+        width, height = self._pyautogui.size()
+        return width, height
+
+
+class MSSCapture(CaptureBackend):
+    """Fast capture through mss (XShmGetImage on X11, BitBlt on Windows)
+    
+    The raw BGRA buffer from mss is wrapped without copying and converted
+    straight into a preallocated output array that is reused between frames.
+    """
+    
+    name = "mss"
+    
+    def __init__(self, monitor=1):
+        """Initialize the backend
+        
+        Args:
+            monitor (int): mss monitor index (1 = primary monitor)
+        """
+        super().__init__()
+        import mss
+        self._mss = mss
+        self.monitor = monitor
+        # mss handles are not shareable between threads
+        self._local = threading.local()
+    
+    def _session(self):
+        """Get the mss session of the calling thread"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._mss.mss()
+            self._local.session = session
+        return session
+    
+    def _grab(self, region, grayscale):
+        session = self._session()
+        monitor = session.monitors[self.monitor]
+        if region:
+            left, top, width, height = region
+            area = {"left": monitor["left"] + left, "top": monitor["top"] + top,
+                    "width": width, "height": height}
+        else:
+            area = monitor
+        
+        shot = session.grab(area)
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        
+        if grayscale:
+            out = self._buffer("gray", (shot.height, shot.width))
+            return cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY, dst=out)
+        out = self._buffer("bgr", (shot.height, shot.width, 3))
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=out)
+    
+    def screen_size(self):
+        monitor = self._session().monitors[self.monitor]
+        return monitor["width"], monitor["height"]
+
+
+class StaticCapture(CaptureBackend):
+    """Capture from an in-memory frame or an image file (for tests and offline use)"""
+    
+    name = "static"
+    
+    def __init__(self, source):
+        """Initialize the backend
+        
+        Args:
+            source (numpy.ndarray or str): BGR frame or path to an image file
+        """
+        super().__init__()
+        self.set_frame(source)
+    
+    def set_frame(self, source):
+        """Replace the frame returned by the backend
+        
+        Args:
+            source (numpy.ndarray or str): BGR frame or path to an image file
+        """
+        if isinstance(source, (str, Path)):
+            frame = cv2.imread(str(source), cv2.IMREAD_COLOR)
+            if frame is None:
+                raise ValueError(f"Could not read capture source: {source}")
+            source = frame
+        self.frame = source
+        self._gray = None
+    
+    def _grab(self, region, grayscale):
+        if grayscale:
+            if self._gray is None:
+                self._gray = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
+                self.stats.record_allocation(self._gray.nbytes)
+            frame = self._gray
+        else:
+            frame = self.frame
+        
+        # Regions are returned as views into the stored frame
+        if region:
+            left, top, width, height = region
+            return frame[top:top + height, left:left + width]
+        return frame
+    
+    def screen_size(self):
+        return self.frame.shape[1], self.frame.shape[0]
+
+
+class BackgroundCapture(CaptureBackend):
+    """Captures frames on a background thread into a ring buffer of reused arrays
+    
+    Callers read the latest frame (or wait for one newer than a given time)
+    instead of capturing themselves, so capture latency leaves the critical
+    path of each poll and callers polling at the same moment share a frame.
+    A reader leases the slot it reads while copying it into its thread's
+    output buffer, which is reused like MSSCapture's, so a returned frame is
+    overwritten by that thread's next capture. The writer only reuses slots
+    that are neither the latest nor leased, otherwise the ring grows by one slot.
+    
+    While paused (or before start()), reads fall back to synchronous captures
+    through the wrapped backend.
+    """
+    
+    name = "background"
+    
+    def __init__(self, backend, fps=10, buffer_size=3, max_age=None):
+        """Initialize the background capture service
+        
+        Args:
+            backend (CaptureBackend): Backend that performs the actual capture
+            fps (float): Capture rate of the background thread
+            buffer_size (int): Number of ring slots allocated up front
+            max_age (float, optional): Oldest frame (in seconds) served by grab(), defaults to one capture interval
+        """
+        super().__init__()
+        self.backend = backend
+        self.interval = 1.0 / fps
+        self.buffer_size = buffer_size
+        self.max_age = max_age if max_age is not None else self.interval
+        self.captured = 0
+        self.served = 0
+        self._slots = []
+        self._leases = []
+        self._monotonic = []
+        self._wall = []
+        self._latest = None
+        self._condition = threading.Condition()
+        self._running = threading.Event()
+        self._paused = threading.Event()
+        self._thread = None
+    
+    @property
+    def is_running(self):
+        """bool: True while the background thread is capturing"""
+        return self._running.is_set() and not self._paused.is_set()
+    
+    def start(self):
+        """Start the background capture thread"""
+        if self._thread is not None:
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name="katana-background-capture", daemon=True)
+        self._thread.start()
+        logger.info(f"📷 Background capture started at {1.0 / self.interval:.0f} fps ({self.backend.name})")
+    
+    def stop(self):
+        """Stop the background capture thread"""
+        if self._thread is None:
+            return
+        self._running.clear()
+        self._paused.clear()
+        self._thread.join()
+        self._thread = None
+        logger.info(f"📷 Background capture stopped ({self.captured} frames captured, {self.served} served)")
+    
+    def pause(self):
+        """Pause background capturing (e.g. while the benchmark is measured)"""
+        if self._thread is not None and not self._paused.is_set():
+            self._paused.set()
+            logger.info("⏸️ Background capture paused")
+    
+    def resume(self):
+        """Resume background capturing"""
+        if self._paused.is_set():
+            self._paused.clear()
+            with self._condition:
+                self._condition.notify_all()
+            logger.info("▶️ Background capture resumed")
+    
+    def _allocate_slot(self, shape, index=None):
+        """Allocate a ring slot, appending it or replacing an existing one (call with the condition held)"""
+        slot = np.empty(shape, dtype=np.uint8)
+        self.stats.record_allocation(slot.nbytes)
+        if index is None:
+            self._slots.append(slot)
+            self._leases.append(0)
+            self._monotonic.append(0.0)
+            self._wall.append(0.0)
+            return len(self._slots) - 1
+        self._slots[index] = slot
+        return index
+    
+    def _free_slot(self, shape):
+        """Pick a ring slot no reader is copying from (call with the condition held)"""
+        # Preallocate the whole ring once the frame size is known
+        while len(self._slots) < self.buffer_size:
+            self._allocate_slot(shape)
+        
+        count = len(self._slots)
+        start = (self._latest + 1) if self._latest is not None else 0
+        for offset in range(count):
+            index = (start + offset) % count
+            if index != self._latest and self._leases[index] == 0:
+                if self._slots[index].shape != shape:
+                    return self._allocate_slot(shape, index)
+                return index
+        
+        logger.debug(f"📷 All {count} capture slots in use, growing the ring")
+        return self._allocate_slot(shape)
+    
+    def _run(self):
+        """Capture frames into the ring until stopped (runs on the capture thread)"""
+        while self._running.is_set():
+            if self._paused.is_set():
+                with self._condition:
+                    self._condition.wait(timeout=self.interval)
+                continue
+            
+            started = time.monotonic()
+            try:
+                frame, wall = self.backend.grab_timestamped()
+                with self._condition:
+                    index = self._free_slot(frame.shape)
+                
+                np.copyto(self._slots[index], frame)
+                with self._condition:
+                    self._monotonic[index] = started
+                    self._wall[index] = wall
+                    self._latest = index
+                    self.captured += 1
+                    self._condition.notify_all()
+            except Exception as e:
+                logger.error(f"❌ Background capture failed: {e}")
+            
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+    
+    def latest(self, region=None, grayscale=False):
+        """Get the most recent frame without waiting for a new one
+        
+        Args:
+            region (tuple, optional): Region to return (left, top, width, height)
+            grayscale (bool): Return a single-channel image instead of BGR
+            
+        Returns:
+            tuple: (frame, timestamp) with the wall-clock time of the capture
+        """
+        return self.wait_newer(float("-inf"), region=region, grayscale=grayscale)
+    
+    def wait_newer(self, after, timeout=None, region=None, grayscale=False):
+        """Wait for a frame captured after a given monotonic time
+        
+        Args:
+            after (float): time.monotonic() value the frame must be newer than
+            timeout (float, optional): Maximum time to wait in seconds
+            region (tuple, optional): Region to return (left, top, width, height)
+            grayscale (bool): Return a single-channel image instead of BGR
+            
+        Returns:
+            tuple: (frame, timestamp), or (None, None) if no newer frame arrived in time
+        """
+        start = time.perf_counter()
+        if not self.is_running:
+            return self._grab_now(region, grayscale)
+        
+        with self._condition:
+            ready = self._condition.wait_for(
+                lambda: not self.is_running or (self._latest is not None and self._monotonic[self._latest] > after),
+                timeout=timeout)
+            if not ready:
+                return None, None
+            slot = None
+            if self.is_running:
+                # The lease keeps the writer off the slot until it is copied
+                index = self._latest
+                slot = self._slots[index]
+                self._leases[index] += 1
+                timestamp = self._wall[index]
+                self.served += 1
+        
+        if slot is None:
+            return self._grab_now(region, grayscale)
+        
+        try:
+            frame = self._read_slot(slot, region, grayscale)
+        finally:
+            with self._condition:
+                if index < len(self._slots) and self._slots[index] is slot:
+                    self._leases[index] -= 1
+        
+        self.stats.record_frame(time.perf_counter() - start)
+        return frame, timestamp
+    
+    def _read_slot(self, slot, region, grayscale):
+        """Copy (a region of) a leased slot into the calling thread's output buffer"""
+        if region:
+            left, top, width, height = region
+            slot = slot[top:top + height, left:left + width]
+        if grayscale:
+            return cv2.cvtColor(slot, cv2.COLOR_BGR2GRAY, dst=self._buffer("gray", slot.shape[:2]))
+        frame = self._buffer("bgr", slot.shape)
+        np.copyto(frame, slot)
+        return frame
+    
+    def _grab_now(self, region, grayscale):
+        """Capture synchronously through the wrapped backend"""
+        return self.backend.grab_timestamped(region, grayscale)
+    
+    def grab_timestamped(self, region=None, grayscale=False):
+        # Serve the latest frame unless it is older than max_age
+        frame, timestamp = self.wait_newer(time.monotonic() - self.max_age, timeout=max(1.0, 5 * self.interval),
+                                           region=region, grayscale=grayscale)
+        if frame is None:
+            logger.warning("⚠️ No fresh background frame, capturing synchronously")
+            return self._grab_now(region, grayscale)
+        return frame, timestamp
+    
+    def _grab(self, region, grayscale):
+        return self.grab_timestamped(region, grayscale)[0]
+    
+    def screen_size(self):
+        return self.backend.screen_size()
+    
+    def close(self):
+        """Stop the thread and release the ring and the wrapped backend"""
+        self.stop()
+        with self._condition:
+            self._slots, self._leases, self._monotonic, self._wall, self._latest = [], [], [], [], None
+        self.backend.close()
+        super().close()
+
+
+# Registry of capture backends by name
+CAPTURE_BACKENDS = {
+    PyAutoGUICapture.name: PyAutoGUICapture,
+    MSSCapture.name: MSSCapture,
+    StaticCapture.name: StaticCapture,
+}
+
+def create_capture_backend(name="pyautogui", **kwargs):
+    """Create a capture backend by name
+    
+    Args:
+        name (str): Backend name ('pyautogui', 'mss', 'static' or 'auto')
+        **kwargs: Additional arguments for the backend constructor
+    
+    Returns:
+        CaptureBackend: Capture backend instance
+    """
+    if name == "auto":
+        try:
+            return MSSCapture(**kwargs)
+        except ImportError:
+            logger.warning("⚠️ mss not installed, falling back to pyautogui capture")
+            return PyAutoGUICapture()
+    
+    if name not in CAPTURE_BACKENDS:
+        raise ValueError(f"Unknown capture backend: {name}")
+    
+    return CAPTURE_BACKENDS[name](**kwargs)
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""
+Katana Game Benchmark Automation Framework - Core Change Detection Module
+
+This module provides a cheap frame-change detector. Frames are reduced to a
+small grayscale signature so long waits can skip template matching while the
+screen (or the searched region) has not changed since the last negative match.
+"""
+import cv2
+import numpy as np
+import logging
+import threading
+
+logger = logging.getLogger("katana")
+
+class FrameChangeDetector:
+    """Detects screen changes by comparing downsampled frame signatures"""
+    
+    def __init__(self, signature_size=(320, 180), tolerance=4):
+        """Initialize the change detector
+        
+        Args:
+            signature_size (tuple): (width, height) of the downsampled signature
+            tolerance (int): Largest per-cell intensity difference still considered unchanged
+        """
+        self.signature_size = signature_size
+        self.tolerance = tolerance
+        self.checks = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+    
+    def signature(self, frame):
+        """Compute the signature of a frame
+        
+        Args:
+            frame (numpy.ndarray): BGR or grayscale frame
+            
+        Returns:
+            numpy.ndarray: Downsampled grayscale signature
+        """
+        width = min(self.signature_size[0], frame.shape[1])
+        height = min(self.signature_size[1], frame.shape[0])
+        
+        # Downsample first so the color conversion only touches the small image
+        small = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small.astype(np.int16)
+    
+    def has_changed(self, previous, current):
+        """Compare two signatures
+        
+        A single cell changing beyond the tolerance counts as a change, so small
+        UI elements appearing on a large frame are not averaged away.
+        
+        Args:
+            previous (numpy.ndarray or None): Signature of the earlier frame
+            current (numpy.ndarray): Signature of the new frame
+            
+        Returns:
+            bool: True if the frames differ (or there is nothing to compare against)
+        """
+        with self._lock:
+            self.checks += 1
+        if previous is None or previous.shape != current.shape:
+            return True
+        return int(np.abs(current - previous).max()) > self.tolerance
+    
+    def record_skip(self):
+        """Count a match skipped because the frame had not changed"""
+        with self._lock:
+            self.skipped += 1
+    
+    def stats(self):
+        """Get change detection statistics
+        
+        Returns:
+            dict: Number of comparisons and skipped matches
+        """
+        with self._lock:
+            return {
+                "checks": self.checks,
+                "skipped_matches": self.skipped,
+                "skip_rate": self.skipped / self.checks if self.checks else 0.0,
+            }
\ No newline at end of file
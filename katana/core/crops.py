@@ -0,0 +1,268 @@
+"""
+Katana Game Benchmark Automation Framework - Core Template Crops Module
+
+This module selects a distinctive sub-patch of large template assets (e.g.
+full menu screenshots). Matching the sub-patch is much cheaper than matching
+the whole asset; the crop offset is kept so matches still report the center
+and bounding box of the original asset.
+
+Crops are chosen by maximizing uniqueness: the patch must correlate poorly
+with every other part of the asset, with the game's other assets and with
+synthetic (or recorded) backgrounds. Selected crops are shipped in a
+template_crops.json file next to the assets, keyed by the asset's content
+hash so edited assets are re-evaluated. Only the command line below writes
+that file; at runtime, missing or stale crops are selected once per process
+and kept in memory, so installed assets are never modified.
+
+Usage:
+    python -m katana.core.crops --game cs2 [--archive RECORDING_DIR] [--force]
+"""
+import cv2
+import json
+import hashlib
+import logging
+import argparse
+import threading
+import numpy as np
+from pathlib import Path
+
+logger = logging.getLogger("katana")
+
+# Name of the crop cache file stored next to the assets
+CROP_INDEX_FILE = "template_crops.json"
+
+# Version of the crop selection; bumping it re-evaluates all cached crops
+CROP_VERSION = 1
+
+def synthetic_backgrounds(size, count=3, seed=0):
+    """Generate textured grayscale backgrounds for uniqueness scoring
+    
+    Args:
+        size (tuple): (width, height) of each background
+        count (int): Number of backgrounds
+        seed (int): Random seed
+        
+    Returns:
+        list: Grayscale background images
+    """
+    rng = np.random.default_rng(seed)
+    backgrounds = []
+    for index in range(count):
+        noise = rng.integers(0, 256, (size[1], size[0]), dtype=np.uint8)
+        backgrounds.append(cv2.GaussianBlur(noise, (0, 0), 1.5 + 2 * index))
+    return backgrounds
+
+
+def find_distinctive_crop(image, backgrounds=(), fraction=0.3, min_side=48, candidates=24, min_contrast=12):
+    """Find the most distinctive sub-patch of a template image
+    
+    Candidate patches on a grid are ranked by texture; the best textured
+    candidates are then scored by the highest correlation they reach anywhere
+    else (elsewhere in the image or on a background). The candidate with the
+    lowest such impostor score wins.
+    
+    Args:
+        image (numpy.ndarray): BGR or grayscale template pixels
+        backgrounds (list): Grayscale images the patch should not match
+        fraction (float): Patch size as a fraction of the image size
+        min_side (int): Smallest patch width and height in pixels
+        candidates (int): Number of best-textured candidates to score
+        min_contrast (float): Smallest gray standard deviation of a usable patch
+        
+    Returns:
+        dict or None: {'x', 'y', 'w', 'h', 'uniqueness'}, or None if no patch is usable
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    height, width = gray.shape
+    crop_width = min(width, max(min_side, int(width * fraction)))
+    crop_height = min(height, max(min_side, int(height * fraction)))
+    if crop_width == width and crop_height == height:
+        return None
+    
+    stride_x = max(1, crop_width // 4)
+    stride_y = max(1, crop_height // 4)
+    
+    # Rank grid positions by texture first; flat patches are never distinctive
+    textured = []
+    for y in range(0, height - crop_height + 1, stride_y):
+        for x in range(0, width - crop_width + 1, stride_x):
+            contrast = float(gray[y:y + crop_height, x:x + crop_width].std())
+            if contrast >= min_contrast:
+                textured.append((contrast, x, y))
+    textured.sort(reverse=True)
+    if not textured:
+        return None
+    
+    best = None
+    for _, x, y in textured[:candidates]:
+        patch = gray[y:y + crop_height, x:x + crop_width]
+        
+        # Correlation with the rest of the asset, ignoring the patch's own neighborhood
+        own = cv2.matchTemplate(gray, patch, cv2.TM_CCOEFF_NORMED)
+        own[max(0, y - stride_y):y + stride_y + 1, max(0, x - stride_x):x + stride_x + 1] = -1.0
+        impostor = float(own.max()) if own.size else -1.0
+        
+        for background in backgrounds:
+            if background.shape[0] >= crop_height and background.shape[1] >= crop_width:
+                impostor = max(impostor, float(cv2.matchTemplate(background, patch, cv2.TM_CCOEFF_NORMED).max()))
+        
+        uniqueness = 1.0 - max(0.0, impostor)
+        if best is None or uniqueness > best["uniqueness"]:
+            best = {"x": x, "y": y, "w": crop_width, "h": crop_height, "uniqueness": uniqueness}
+    
+    return best
+
+
+class TemplateCropIndex:
+    """Cache of distinctive crops per asset, loaded from next to the assets
+    
+    Only assets of at least min_area pixels are cropped. Missing or stale
+    crops are selected on first use; they are only written back to the
+    index next to the assets when write_index is set (by the crops command).
+    """
+    
+    def __init__(self, min_area=128 * 128, min_uniqueness=0.2, extra_backgrounds=(), write_index=False):
+        """Initialize the crop index
+        
+        Args:
+            min_area (int): Smallest asset area (in pixels) that gets a crop
+            min_uniqueness (float): Crops less unique than this are not used
+            extra_backgrounds (list): Additional grayscale backgrounds (e.g. recorded frames)
+            write_index (bool): Write newly selected crops to the index next to the assets
+                instead of keeping them in memory only
+        """
+        self.min_area = min_area
+        self.min_uniqueness = min_uniqueness
+        self.extra_backgrounds = list(extra_backgrounds)
+        self.write_index = write_index
+        self._indexes = {}
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def asset_hash(template_path):
+        """Compute the content hash of an asset file"""
+        with open(template_path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    
+    def _index(self, assets_dir):
+        """Load the crop index of an asset directory"""
+        index = self._indexes.get(assets_dir)
+        if index is None:
+            index = {}
+            index_path = assets_dir / CROP_INDEX_FILE
+            if index_path.is_file():
+                try:
+                    with open(index_path, "r") as f:
+                        data = json.load(f)
+                    if data.get("version") == CROP_VERSION:
+                        index = data.get("crops", {})
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to load template crops from {index_path}: {e}")
+            self._indexes[assets_dir] = index
+        return index
+    
+    def save(self, assets_dir):
+        """Write the crop index of an asset directory
+        
+        Args:
+            assets_dir (Path): Directory holding the assets
+        """
+        index_path = Path(assets_dir) / CROP_INDEX_FILE
+        try:
+            with self._lock:
+                data = json.dumps({"version": CROP_VERSION, "crops": self._index(Path(assets_dir))},
+                                  indent=2, sort_keys=True)
+            with open(index_path, "w") as f:
+                f.write(data)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to save template crops to {index_path}: {e}")
+    
+    def _backgrounds(self, template_path, image):
+        """Collect the backgrounds a crop of an asset must not match"""
+        backgrounds = synthetic_backgrounds((max(image.shape[1], 640), max(image.shape[0], 360)))
+        backgrounds.extend(self.extra_backgrounds)
+        # The game's other assets are real screen content the crop must not resemble
+        for other in sorted(template_path.parent.glob("*.png")):
+            if other != template_path:
+                other_image = cv2.imread(str(other), cv2.IMREAD_GRAYSCALE)
+                if other_image is not None:
+                    backgrounds.append(other_image)
+        return backgrounds
+    
+    def crop_for(self, template_path, image, force=False):
+        """Get the crop rectangle of an asset, selecting it if needed
+        
+        Args:
+            template_path (Path): Path of the asset
+            image (numpy.ndarray): Decoded asset pixels
+            force (bool): Re-select the crop even if a cached one is valid
+            
+        Returns:
+            tuple or None: (x, y, w, h) of the crop, or None if the asset is used whole
+        """
+        template_path = Path(template_path)
+        if image.shape[0] * image.shape[1] < self.min_area:
+            return None
+        
+        asset_hash = self.asset_hash(template_path)
+        with self._lock:
+            entry = self._index(template_path.parent).get(template_path.name)
+            if entry is None or entry.get("hash") != asset_hash or force:
+                logger.info(f"✂️ Selecting a distinctive crop for {template_path.name}...")
+                crop = find_distinctive_crop(image, self._backgrounds(template_path, image))
+                # Crops below the uniqueness cutoff are recorded, but never as usable
+                usable = crop is not None and crop["uniqueness"] >= self.min_uniqueness
+                entry = dict(crop or {}, hash=asset_hash, usable=usable)
+                self._index(template_path.parent)[template_path.name] = entry
+                if self.write_index:
+                    self.save(template_path.parent)
+                else:
+                    logger.warning(f"⚠️ {template_path.name} has no current crop in {CROP_INDEX_FILE}, keeping the "
+                                   f"selected crop in memory (update the index with python -m katana.core.crops)")
+                if usable:
+                    logger.info(f"✂️ {template_path.name}: using {crop['w']}x{crop['h']} crop at "
+                                f"({crop['x']}, {crop['y']}), uniqueness {crop['uniqueness']:.2f}")
+                elif crop is not None:
+                    logger.info(f"✂️ {template_path.name}: best crop is not distinctive enough "
+                                f"(uniqueness {crop['uniqueness']:.2f}), using the whole asset")
+        
+        if not entry.get("usable") or entry["uniqueness"] < self.min_uniqueness:
+            return None
+        return entry["x"], entry["y"], entry["w"], entry["h"]
+
+
+def main(argv=None):
+    """Command line entry point for (re)building the crop cache of a game's assets"""
+    from .replay import FrameArchive
+    
+    parser = argparse.ArgumentParser(description="Select distinctive crops of large template assets")
+    parser.add_argument("--game", "-g", required=True, help="Game whose assets are processed")
+    parser.add_argument("--archive", type=Path, help="Recorded frame archive used as extra backgrounds")
+    parser.add_argument("--force", action="store_true", help="Re-select crops even if cached")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
+    backgrounds = []
+    if args.archive:
+        archive = FrameArchive(args.archive)
+        unique_files = sorted({frame["file"] for frame in archive.frames})
+        for file_name in unique_files[:16]:
+            frame = cv2.imread(str(archive.archive_dir / file_name), cv2.IMREAD_GRAYSCALE)
+            if frame is not None:
+                backgrounds.append(frame)
+    
+    index = TemplateCropIndex(extra_backgrounds=backgrounds, write_index=True)
+    assets_dir = Path(__file__).parent.parent / "games" / args.game / "assets"
+    for asset in sorted(assets_dir.glob("*.png")):
+        image = cv2.imread(str(asset), cv2.IMREAD_COLOR)
+        crop = index.crop_for(asset, image, force=args.force) if image is not None else None
+        size = f"{image.shape[1]}x{image.shape[0]}" if image is not None else "unreadable"
+        used = f"{crop[2]}x{crop[3]} crop at ({crop[0]}, {crop[1]})" if crop else "whole asset"
+        print(f"{asset.name:<32} {size:>10} -> {used}")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
\ No newline at end of file
@@ -7,38 +7,375 @@ and reliability improvements like retries and regional matching.
 """
 import cv2
 import numpy as np
-import pyautogui
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
+from .templates import Template, TemplateCache, COLOR_BGR
+from .capture import CaptureBackend, BackgroundCapture, create_capture_backend
+from .hints import RegionHintIndex
+from .change import FrameChangeDetector
+from .probes import ProbeFilter
+from .crops import TemplateCropIndex
+from .keypoints import KeypointMatcher
+
 logger = logging.getLogger("katana")
 
+# Template matching modes
+MATCH_FULL = "full"  # Full-resolution search over the whole frame
+MATCH_PYRAMID = "pyramid"  # Coarse search on a downsampled frame, refined at full resolution
+MATCH_KEYPOINT = "keypoint"  # Scale-invariant ORB keypoint matching, correlation for small templates
+
+class MatchResult:
+    """Outcome of scoring one template against one frame"""
+    
+    def __init__(self, template_path, location, confidence, bbox=None, timestamp=None, complete=True):
+        """Initialize the match result
+        
+        Args:
+            template_path (Path): Path of the matched template
+            location (tuple or None): (x, y) screen coordinates of the best match center
+            confidence (float): Best match confidence (0.0-1.0)
+            bbox (tuple, optional): (left, top, width, height) of the best match on screen
+            timestamp (float, optional): Capture time of the frame that was scored
+            complete (bool): False if only the hinted window was searched, so polls search the frame again
+        """
+        self.template_path = Path(template_path)
+        self.location = location
+        self.confidence = confidence
+        self.bbox = bbox
+        self.timestamp = timestamp
+        self.complete = complete
+    
+    @property
+    def name(self):
+        """str: File name of the matched template"""
+        return self.template_path.name
+    
+    def passes(self, threshold):
+        """Check whether the match is accepted at a confidence threshold
+        
+        Args:
+            threshold (float): Confidence threshold (0.0-1.0)
+        
+        Returns:
+            bool: True if the match location is known and confidence reaches the threshold
+        """
+        return self.location is not None and self.confidence >= threshold
+    
+    def __repr__(self):
+        return f"MatchResult({self.name!r}, location={self.location}, confidence={self.confidence:.2f})"
+
 class ImageDetector:
     """Class for detecting UI elements using template matching"""
     
-    def __init__(self, assets_dir=None):
+    def __init__(self, assets_dir=None, template_cache=None, cache_size=64, capture=None,
+                 match_mode=MATCH_FULL, pyramid_scale=0.5, pyramid_candidates=3, region_hints=None,
+                 workers=0, probes=True, crops=True):
         """Initialize the detector
         
         Args:
             assets_dir (Path, optional): Directory containing image assets
+            template_cache (TemplateCache, optional): Shared template cache to use
+            cache_size (int): Maximum number of decoded templates kept in memory
+            capture (CaptureBackend or str, optional): Capture backend or backend name (default 'pyautogui')
+            match_mode (str): 'full', 'pyramid' or 'keypoint' template matching
+            pyramid_scale (float): Downsampling factor of the coarse pyramid level (lower is faster, less accurate)
+            pyramid_candidates (int): Number of coarse candidates refined at full resolution
+            region_hints (RegionHintIndex or str, optional): Hint index or path of a persistent hint file
+            workers (int): Threads used to score templates and regions in parallel (0 = score serially)
+            probes (bool): Reject regions and hinted windows with cheap probe checks before correlating
+            crops (bool): Match large assets by a distinctive crop (ignored for a given template_cache)
         """
         self.assets_dir = Path(assets_dir) if assets_dir else None
+        self.template_cache = template_cache or TemplateCache(
+            max_entries=cache_size, crop_index=TemplateCropIndex() if crops else None
+        )
+        self.match_mode = match_mode
+        self.pyramid_scale = pyramid_scale
+        self.pyramid_candidates = pyramid_candidates
+        if region_hints is not None and not isinstance(region_hints, RegionHintIndex):
+            region_hints = RegionHintIndex(region_hints)
+        self.region_hints = region_hints
+        self.change_detector = FrameChangeDetector()
+        self.probe_filter = ProbeFilter() if probes else None
+        self.keypoint_matcher = KeypointMatcher()
+        
+        # While polling, a probe-rejected hint window skips the full-frame search once the
+        # hint is stable, but every Nth consecutive rejection still searches the whole frame
+        self.probe_stable_matches = 3
+        self.probe_full_search_every = 4
+        self._probe_skips = {}
+        self._probe_lock = threading.Lock()
+        
+        # Callables invoked as observer(match, threshold, latency) after every scored template
+        self.match_observers = []
+        
+        # Scoring pool, created lazily; cv2.matchTemplate releases the GIL
+        self.workers = 0
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._worker_state = threading.local()
+        self.set_workers(workers)
+        
+        # Coarse templates smaller than this (in pixels) are matched at full resolution
+        self.pyramid_min_template_size = 8
+        
+        # Scale of the loaded asset pack; unscaled lookups use it (None = source assets)
+        self.asset_scale = None
+        
+        # Game window whose client area is captured (None = whole screen)
+        self.window = None
+        self.capture = None
+        self.set_capture(capture or "pyautogui")
     
-    def take_screenshot(self, region=None):
-        """Take a screenshot and convert it to OpenCV format
+    def set_capture(self, capture):
+        """Select the screen capture backend
+        
+        Args:
+            capture (CaptureBackend or str): Capture backend or backend name
+        """
+        if not isinstance(capture, CaptureBackend):
+            capture = create_capture_backend(capture)
+        self.capture = capture
+        logger.info(f"📷 Using '{capture.name}' capture backend")
+    
+    def enable_background_capture(self, fps=10, buffer_size=3):
+        """Serve frames from a background capture thread instead of capturing per call
+        
+        Args:
+            fps (float): Background capture rate
+            buffer_size (int): Number of reused ring buffer slots
+        """
+        if isinstance(self.capture, BackgroundCapture):
+            return
+        background = BackgroundCapture(self.capture, fps=fps, buffer_size=buffer_size)
+        self.set_capture(background)
+        background.start()
+    
+    def disable_background_capture(self):
+        """Stop the background capture thread and capture per call again"""
+        if not isinstance(self.capture, BackgroundCapture):
+            return
+        background = self.capture
+        background.stop()
+        self.set_capture(background.backend)
+    
+    def use_window(self, window):
+        """Capture only the client area of a game window
+        
+        Regions, match locations and the capture resolution become relative
+        to the client area; GameWindow.to_screen translates them for input.
+        
+        Args:
+            window (GameWindow): Window session whose client area is captured
+        """
+        from .window import WindowCapture
+        
+        if self.window is window:
+            return
+        
+        # The background thread must capture through the window, not around it
+        background = self.capture if isinstance(self.capture, BackgroundCapture) else None
+        if background is not None:
+            self.disable_background_capture()
+        
+        capture = self.capture.backend if isinstance(self.capture, WindowCapture) else self.capture
+        self.set_capture(WindowCapture(capture, window))
+        self.window = window
+        
+        if background is not None:
+            self.enable_background_capture(fps=1.0 / background.interval, buffer_size=background.buffer_size)
+    
+    @contextmanager
+    def capture_paused(self):
+        """Pause background capture for the duration of a measured phase
+        
+        Detector calls inside the block capture synchronously. Without
+        background capture this does nothing.
+        """
+        # Look through wrapping backends (e.g. a recorder) for the background service
+        background = self.capture
+        while background is not None and not isinstance(background, BackgroundCapture):
+            background = getattr(background, "backend", None)
+        if background is not None:
+            background.pause()
+        try:
+            yield
+        finally:
+            if background is not None:
+                background.resume()
+    
+    def add_match_observer(self, observer):
+        """Register a callable notified of every scored template
+        
+        Args:
+            observer (callable): Called as observer(match, threshold, latency_seconds)
+        """
+        self.match_observers.append(observer)
+    
+    def remove_match_observer(self, observer):
+        """Unregister a match observer
+        
+        Args:
+            observer (callable): Previously registered observer
+        """
+        if observer in self.match_observers:
+            self.match_observers.remove(observer)
+    
+    def set_workers(self, workers):
+        """Resize the scoring thread pool
+        
+        Use a small value (or 0) during measured benchmark phases so detection
+        does not compete with the game for CPU cores.
+        
+        Args:
+            workers (int): Number of scoring threads (0 or 1 scores serially)
+        """
+        with self._executor_lock:
+            if workers == self.workers:
+                return
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            self.workers = workers
+        if workers > 1:
+            logger.info(f"🧵 Scoring templates on {workers} threads")
+    
+    def close(self):
+        """Shut down the scoring thread pool and background capture"""
+        self.set_workers(0)
+        self.disable_background_capture()
+    
+    def _map(self, function, items):
+        """Apply a function to items, in parallel when a scoring pool is configured
+        
+        Calls made from inside a pool worker run serially so nested fan-out
+        (e.g. pyramid refinement inside a batched match) cannot starve the pool.
+        
+        Args:
+            function (callable): Function to apply
+            items (list): Items to apply it to
+            
+        Returns:
+            list: Results in the order of items
+        """
+        items = list(items)
+        if self.workers <= 1 or len(items) <= 1 or getattr(self._worker_state, "active", False):
+            return [function(item) for item in items]
+        
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="katana-match")
+            executor = self._executor
+        
+        def run(item):
+            self._worker_state.active = True
+            try:
+                return function(item)
+            finally:
+                self._worker_state.active = False
+        
+        return list(executor.map(run, items))
+    
+    def capture_stats(self):
+        """Get latency and allocation statistics of the capture backend
+        
+        Returns:
+            dict: Capture statistics
+        """
+        return self.capture.stats.report()
+    
+    def stats(self):
+        """Get statistics of the detector's capture, cache, hint and change-gating components
+        
+        Returns:
+            dict: Statistics per component
+        """
+        return {
+            "capture": self.capture_stats(),
+            "template_cache": self.template_cache.stats(),
+            "region_hints": self.region_hints.stats() if self.region_hints is not None else None,
+            "change_gating": self.change_detector.stats(),
+            "probes": self.probe_filter.stats() if self.probe_filter is not None else None,
+            "keypoints": self.keypoint_matcher.stats(),
+        }
+    
+    def resolve_template_path(self, template_path):
+        """Resolve a template path, falling back to the assets directory
+        
+        Args:
+            template_path (str): Path to template image
+        
+        Returns:
+            Path or None: Resolved path if the template exists, None otherwise
+        """
+        template_path = Path(template_path)
+        if template_path.is_file():
+            return template_path
+        if self.assets_dir and (self.assets_dir / template_path).is_file():
+            return self.assets_dir / template_path
+        logger.error(f"❌ Template not found: {template_path}")
+        return None
+    
+    def use_asset_pack(self, pack):
+        """Serve templates from a pre-scaled asset pack
+        
+        The pack's templates are pinned in the template cache and become the
+        default for lookups without an explicit scale, so templates match the
+        pack's resolution without being resized at runtime.
+        
+        Args:
+            pack (AssetPack or None): Pack to use, or None to match the source assets again
+            
+        Returns:
+            int: Number of templates loaded from the pack
+        """
+        self.template_cache.unpin_all()
+        if pack is None:
+            self.asset_scale = None
+            return 0
+        
+        templates = pack.templates(self.assets_dir)
+        for template in templates:
+            self.template_cache.pin(template)
+        self.asset_scale = pack.scale
+        width, height = pack.resolution
+        logger.info(f"📦 Loaded {len(templates)} templates from the {width}x{height} asset pack")
+        return len(templates)
+    
+    def load_template(self, template_path, scale=None, color_mode=COLOR_BGR):
+        """Load a template through the template cache
+        
+        Args:
+            template_path (str): Path to template image
+            scale (float or tuple, optional): Uniform or (x, y) scale factor (default: the asset pack's scale)
+            color_mode (str): 'bgr' or 'gray'
+        
+        Returns:
+            Template or None: Decoded template, or None if it could not be loaded
+        """
+        resolved_path = self.resolve_template_path(template_path)
+        if resolved_path is None:
+            return None
+        if scale is None:
+            scale = self.asset_scale
+        return self.template_cache.get(resolved_path, scale=scale, color_mode=color_mode)
+    
+    def take_screenshot(self, region=None, grayscale=False):
+        """Take a screenshot in OpenCV format through the capture backend
         
         Args:
             region (tuple, optional): Region to capture (left, top, width, height)
+            grayscale (bool): Capture a single-channel image instead of BGR
             
         Returns:
-            numpy.ndarray: Screenshot as OpenCV BGR image
+            numpy.ndarray: Screenshot as OpenCV BGR (or grayscale) image
         """
-        if region:
-            screen = pyautogui.screenshot(region=region)
-        else:
-            screen = pyautogui.screenshot()
-        return cv2.cvtColor(np.array(screen), cv2.COLOR_RGB2BGR)
+        return self.capture.grab(region, grayscale=grayscale)
     
     def find_template(self, template_path, threshold=0.8, region=None):
         """Find a template image on the screen
@@ -51,44 +388,391 @@ class ImageDetector:
         Returns:
             tuple or None: (x, y) coordinates of match center if found, None otherwise
         """
-        template_path = Path(template_path)
-        if not template_path.is_file():
-            if self.assets_dir and (self.assets_dir / template_path).is_file():
-                template_path = self.assets_dir / template_path
-            else:
-                logger.error(f"❌ Template not found: {template_path}")
-                return None
+        cached = self.load_template(template_path)
+        if cached is None:
+            return None
+        
+        # Take screenshot and perform template matching
+        screen, timestamp = self.capture.grab_timestamped(region)
+        return self._evaluate(screen, cached, threshold, region, timestamp)
+    
+    def find_template_match(self, template_path, threshold=0.8, region=None):
+        """Find a template image on the screen, keeping the full match result
+        
+        Args:
+            template_path (str): Path to template image
+            threshold (float): Confidence threshold (0.0-1.0)
+            region (tuple, optional): Region to search in (left, top, width, height)
+            
+        Returns:
+            MatchResult or None: Accepted match (with bounding box), None otherwise
+        """
+        cached = self.load_template(template_path)
+        if cached is None:
+            return None
+        
+        screen, timestamp = self.capture.grab_timestamped(region)
+        return self._evaluate_match(screen, cached, threshold, region, timestamp)
+    
+    def _evaluate(self, screen, cached, threshold, region=None, timestamp=None):
+        """Match a template in a captured frame and log the outcome
+        
+        Args:
+            screen (numpy.ndarray): Captured frame to search in
+            cached (Template): Template to match
+            threshold (float): Confidence threshold (0.0-1.0)
+            region (tuple, optional): Region the frame was captured from (left, top, width, height)
+            timestamp (float, optional): Capture time of the frame
+            
+        Returns:
+            tuple or None: (x, y) coordinates of match center if found, None otherwise
+        """
+        match = self._evaluate_match(screen, cached, threshold, region, timestamp)
+        return match.location if match is not None else None
+    
+    def _evaluate_match(self, screen, cached, threshold, region=None, timestamp=None):
+        """Match a template in a captured frame and log the outcome (see _evaluate)
+        
+        Returns:
+            MatchResult or None: Accepted match, None otherwise
+        """
+        match = self._locate(screen, cached, threshold, region, timestamp=timestamp)
+        return self._accept(match, cached, threshold)
+    
+    def _accept(self, match, cached, threshold):
+        """Log the outcome of a located match and keep it if it passes the threshold
+        
+        Args:
+            match (MatchResult or None): Result of _locate
+            cached (Template): Matched template
+            threshold (float): Confidence threshold (0.0-1.0)
+            
+        Returns:
+            MatchResult or None: Accepted match, None otherwise
+        """
+        if match is None:
+            return None
+        
+        label = "scaled " if cached.scale != (1.0, 1.0) else ""
+        
+        if match.location is None:
+            reason = "no keypoint placement" if self.match_mode == MATCH_KEYPOINT else "rejected by probes"
+            logger.warning(f"⚠️ No match found for {label}{cached.name} ({reason})")
+            return None
+        
+        # Check if match confidence is above threshold
+        if match.passes(threshold):
+            center_x, center_y = match.location
+            logger.info(f"✅ Match found for {label}{cached.name} at ({center_x}, {center_y}) with confidence {match.confidence:.2f}")
+            return match
+        else:
+            logger.warning(f"⚠️ No match found for {label}{cached.name} (max confidence {match.confidence:.2f})")
+            return None
+    
+    def _locate(self, screen, cached, threshold=None, region=None, template_path=None, coarse_screen=None,
+                timestamp=None, polling=False):
+        """Find a template in a frame, searching its hinted region first
+        
+        Without a caller-supplied region, a padded region around the last-known
+        location of the template is searched first. The full frame is only
+        searched when that misses, and successful matches update the hint.
+        While polling, a stable hint whose window the probes reject may skip
+        the full frame; the result is then marked incomplete and the poll
+        searches the frame again. Every result is reported to the registered
+        match observers.
+        
+        Args:
+            screen (numpy.ndarray): Captured frame to search in
+            cached (Template): Template to match
+            threshold (float, optional): Confidence threshold (0.0-1.0), hints are skipped without one
+            region (tuple, optional): Region the frame was captured from (left, top, width, height)
+            template_path (Path, optional): Template path to report, defaults to the cached path
+            coarse_screen (numpy.ndarray, optional): Frame already downsampled for pyramid mode
+            timestamp (float, optional): Capture time of the frame
+            polling (bool): Whether the caller polls again, allowing the full-frame search to be skipped
+            
+        Returns:
+            MatchResult or None: Best match in the frame, or None if the template does not fit
+        """
+        start = time.perf_counter()
+        match = self._locate_with_hints(screen, cached, threshold, region, template_path, coarse_screen, polling)
+        if match is not None:
+            match.timestamp = timestamp
+            for observer in self.match_observers:
+                observer(match, threshold, time.perf_counter() - start)
+        return match
+    
+    def _locate_with_hints(self, screen, cached, threshold, region, template_path, coarse_screen, polling=False):
+        """Match a template, trying the hinted region before the full frame (see _locate)
+        
+        With probes enabled, hinted windows and caller-supplied regions are
+        probed first and not correlated when the template is clearly absent.
+        """
+        # Hint windows are sized for the template's own scale, which keypoint mode does not assume
+        use_hints = (self.region_hints is not None and threshold is not None and not region
+                     and self.match_mode != MATCH_KEYPOINT)
+        resolution = (screen.shape[1], screen.shape[0])
         
-        # Take screenshot and prepare for matching
-        screen = self.take_screenshot(region)
-        template = cv2.imread(str(template_path))
+        if use_hints:
+            hint_region = self.region_hints.search_region(cached.name, resolution, cached.size)
+            if hint_region:
+                left, top, width, height = hint_region
+                roi = screen[top:top + height, left:left + width]
+                if self._probe_rejects(cached, roi):
+                    self.region_hints.record_miss()
+                    # One-shot lookups always fall back to the full frame, the template may have moved
+                    if polling and self._skip_full_search(cached, resolution):
+                        self.probe_filter.record_skipped_full_search()
+                        return MatchResult(template_path or cached.path, None, 0.0, complete=False)
+                else:
+                    match = self._match(roi, cached, hint_region, template_path, mode=MATCH_FULL)
+                    if match is not None and match.passes(threshold):
+                        self.region_hints.record_hit()
+                        self.region_hints.record(cached.name, resolution, match.bbox)
+                        self._reset_probe_skips(cached, resolution)
+                        return match
+                    self.region_hints.record_miss()
+        
+        # Caller-supplied regions are small windows searched as a whole
+        if region and self._probe_rejects(cached, screen):
+            return MatchResult(template_path or cached.path, None, 0.0)
+        
+        match = self._match(screen, cached, region, template_path, coarse_screen)
+        if use_hints and match is not None and match.passes(threshold):
+            self.region_hints.record(cached.name, resolution, match.bbox)
+        return match
+    
+    def _probe_rejects(self, cached, window):
+        """Check whether the probes of a template rule out a window
+        
+        Args:
+            cached (Template): Template about to be matched
+            window (numpy.ndarray): Window it would be matched in
+            
+        Returns:
+            bool: True if the correlation can be skipped
+        """
+        if self.probe_filter is None or not self.probe_filter.applies(cached, window.shape):
+            return False
+        # Probes assume the template's own scale
+        if self.match_mode == MATCH_KEYPOINT:
+            return False
+        return self.probe_filter.rejects_window(cached, window)
+    
+    def _skip_full_search(self, cached, resolution):
+        """Decide whether a poll may skip the full-frame search after a rejected hint window
+        
+        Args:
+            cached (Template): Template whose hint window was rejected
+            resolution (tuple): (width, height) of the searched frame
+            
+        Returns:
+            bool: True if the template is reliably found at its hint and no periodic full search is due
+        """
+        if self.region_hints.matches(cached.name, resolution) < self.probe_stable_matches:
+            return False
+        
+        key = (cached.name, cached.size, resolution)
+        with self._probe_lock:
+            skips = self._probe_skips.get(key, 0) + 1
+            if skips >= self.probe_full_search_every:
+                self._probe_skips[key] = 0
+                return False
+            self._probe_skips[key] = skips
+            return True
+    
+    def _reset_probe_skips(self, cached, resolution):
+        """Restart the periodic full-search count after a hinted match"""
+        with self._probe_lock:
+            self._probe_skips.pop((cached.name, cached.size, resolution), None)
+    
+    def _match(self, screen, cached, region=None, template_path=None, coarse_screen=None, mode=None):
+        """Score a cached template against a captured frame
+        
+        Args:
+            screen (numpy.ndarray): Captured frame to search in
+            cached (Template): Template to match
+            region (tuple, optional): Region the frame was captured from (left, top, width, height)
+            template_path (Path, optional): Template path to report, defaults to the cached path
+            coarse_screen (numpy.ndarray, optional): Frame already downsampled for pyramid mode
+            mode (str, optional): Matching mode overriding the detector's match_mode
+            
+        Returns:
+            MatchResult or None: Best match in the frame, or None if the template does not fit
+        """
+        mode = mode or self.match_mode
+        if mode == MATCH_KEYPOINT and self.keypoint_matcher.supports(cached):
+            return self._match_keypoints(screen, cached, region, template_path)
+        
+        template = cached.image
         
         # Check if template dimensions are larger than screenshot
         if template.shape[0] > screen.shape[0] or template.shape[1] > screen.shape[1]:
-            logger.error(f"❌ Template {template_path.name} ({template.shape[:2]}) is larger than screenshot ({screen.shape[:2]})")
+            logger.error(f"❌ Template {cached.name} ({template.shape[:2]}) is larger than screenshot ({screen.shape[:2]})")
             return None
         
         # Perform template matching
+        max_val, max_loc = None, None
+        if mode == MATCH_PYRAMID:
+            max_val, max_loc = self._match_pyramid(screen, cached, coarse_screen)
+        if max_val is None:
+            max_val, max_loc = self._match_full(screen, template)
+        
+        # Calculate bounding box and center of the match (of the whole asset for cropped templates)
+        w, h = cached.full_size
+        left = max_loc[0] - cached.origin[0]
+        top = max_loc[1] - cached.origin[1]
+        
+        # If search was in a region, adjust coordinates
+        if region:
+            left += region[0]
+            top += region[1]
+        
+        center = (left + w // 2, top + h // 2)
+        return MatchResult(template_path or cached.path, center, max_val, bbox=(left, top, w, h))
+    
+    def _match_keypoints(self, screen, cached, region=None, template_path=None):
+        """Locate a template by keypoint matching at whatever scale it is shown
+        
+        Args:
+            screen (numpy.ndarray): Captured frame to search in
+            cached (Template): Template to match (with a keypoint signature)
+            region (tuple, optional): Region the frame was captured from (left, top, width, height)
+            template_path (Path, optional): Template path to report, defaults to the cached path
+            
+        Returns:
+            MatchResult: Verified placement, or a result without location if none was found
+        """
+        located = self.keypoint_matcher.locate(screen, cached)
+        if located is None:
+            return MatchResult(template_path or cached.path, None, 0.0)
+        
+        confidence, (left, top, w, h) = located
+        if region:
+            left += region[0]
+            top += region[1]
+        center = (left + w // 2, top + h // 2)
+        return MatchResult(template_path or cached.path, center, confidence, bbox=(left, top, w, h))
+    
+    def _match_full(self, screen, template):
+        """Run full-resolution template matching
+        
+        Args:
+            screen (numpy.ndarray): Frame to search in
+            template (numpy.ndarray): Template pixels
+        
+        Returns:
+            tuple: (confidence, (x, y) top-left of the best match)
+        """
         result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
         _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        return max_val, max_loc
+    
+    def downsample(self, screen):
+        """Downsample a frame to the coarse pyramid level
         
-        # Check if match confidence is above threshold
-        if max_val >= threshold:
-            # Calculate center of the match
-            h, w = template.shape[:2]
-            center_x = max_loc[0] + w // 2
-            center_y = max_loc[1] + h // 2
-            
-            # If search was in a region, adjust coordinates
-            if region:
-                center_x += region[0]
-                center_y += region[1]
-            
-            logger.info(f"✅ Match found for {template_path.name} at ({center_x}, {center_y}) with confidence {max_val:.2f}")
-            return center_x, center_y
-        else:
-            logger.warning(f"⚠️ No match found for {template_path.name} (max confidence {max_val:.2f})")
-            return None
+        Args:
+            screen (numpy.ndarray): Frame to downsample
+        
+        Returns:
+            numpy.ndarray: Frame scaled by pyramid_scale
+        """
+        return cv2.resize(screen, None, fx=self.pyramid_scale, fy=self.pyramid_scale, interpolation=cv2.INTER_AREA)
+    
+    def _match_pyramid(self, screen, cached, coarse_screen=None):
+        """Run coarse-to-fine template matching
+        
+        The template is matched against a downsampled frame to find candidate
+        locations, which are then refined at full resolution in small regions
+        around each candidate. The reported confidence is the full-resolution
+        score, so thresholds keep their meaning.
+        
+        Args:
+            screen (numpy.ndarray): Frame to search in
+            cached (Template): Template to match
+            coarse_screen (numpy.ndarray, optional): Frame already downsampled by pyramid_scale
+        
+        Returns:
+            tuple: (confidence, (x, y) top-left of the best match), or (None, None) if the
+                template is too small for the coarse level or no candidate could be refined
+        """
+        scale = self.pyramid_scale
+        coarse_template = self.template_cache.get(
+            cached.path, scale=(cached.scale[0] * scale, cached.scale[1] * scale), color_mode=cached.color_mode
+        )
+        if coarse_template is None or min(coarse_template.size) < self.pyramid_min_template_size:
+            return None, None
+        
+        if coarse_screen is None:
+            coarse_screen = self.downsample(screen)
+        ch, cw = coarse_template.image.shape[:2]
+        if ch > coarse_screen.shape[0] or cw > coarse_screen.shape[1]:
+            return None, None
+        
+        coarse = cv2.matchTemplate(coarse_screen, coarse_template.image, cv2.TM_CCOEFF_NORMED)
+        
+        h, w = cached.image.shape[:2]
+        screen_h, screen_w = screen.shape[:2]
+        margin = int(np.ceil(1.0 / scale)) + 2
+        rois = []
+        
+        for _ in range(max(1, self.pyramid_candidates)):
+            _, coarse_val, _, coarse_loc = cv2.minMaxLoc(coarse)
+            if coarse_val <= -1.0:
+                break
+            
+            # Suppress this peak so the next iteration finds a different candidate
+            cx, cy = coarse_loc
+            coarse[max(0, cy - ch // 2):cy + ch // 2 + 1, max(0, cx - cw // 2):cx + cw // 2 + 1] = -1.0
+            
+            # Refine at full resolution inside a small region around the candidate
+            x0 = max(0, int(cx / scale) - margin)
+            y0 = max(0, int(cy / scale) - margin)
+            x1 = min(screen_w, int(cx / scale) + w + margin)
+            y1 = min(screen_h, int(cy / scale) + h + margin)
+            if x1 - x0 >= w and y1 - y0 >= h:
+                rois.append((x0, y0, x1, y1))
+        
+        def refine(roi):
+            x0, y0, x1, y1 = roi
+            val, loc = self._match_full(screen[y0:y1, x0:x1], cached.image)
+            return val, (x0 + loc[0], y0 + loc[1])
+        
+        refined = self._map(refine, rois)
+        if not refined:
+            return None, None
+        return max(refined, key=lambda candidate: candidate[0])
+    
+    def find_templates(self, frame, templates, region=None, threshold=None, timestamp=None, polling=False):
+        """Score several templates against a single captured frame
+        
+        Args:
+            frame (numpy.ndarray or None): Frame to search in, captured once if None
+            templates (list): List of paths to template images
+            region (tuple, optional): Region the frame covers (left, top, width, height)
+            threshold (float, optional): Acceptance threshold, enables region hints when given
+            timestamp (float, optional): Capture time of the given frame
+            polling (bool): Whether the caller polls again (see _locate), results may then be incomplete
+            
+        Returns:
+            list: MatchResult per template, in the order given (location None if not scored)
+        """
+        if frame is None:
+            frame, timestamp = self.capture.grab_timestamped(region)
+        
+        # Downsample once for all templates when matching coarse-to-fine
+        coarse_frame = self.downsample(frame) if self.match_mode == MATCH_PYRAMID else None
+        
+        def score(template_path):
+            template_path = Path(template_path)
+            cached = self.load_template(template_path)
+            match = None
+            if cached is not None:
+                match = self._locate(frame, cached, threshold, region, template_path, coarse_frame, timestamp, polling)
+            return match or MatchResult(template_path, None, 0.0, timestamp=timestamp)
+        
+        # All templates share the one captured frame, scored in parallel when a pool is configured
+        return self._map(score, templates)
     
     def find_template_with_scaling(self, template_path, current_resolution=None, reference_resolution=(1920, 1080), threshold=0.8, region=None):
         """Find a template image on the screen with resolution scaling
@@ -103,23 +787,28 @@ class ImageDetector:
         Returns:
             tuple or None: (x, y) coordinates of match center if found, None otherwise
         """
-        template_path = Path(template_path)
-        if not template_path.is_file():
-            if self.assets_dir and (self.assets_dir / template_path).is_file():
-                template_path = self.assets_dir / template_path
-            else:
-                logger.error(f"❌ Template not found: {template_path}")
-                return None
-        
-        # Load template
-        template = cv2.imread(str(template_path))
-        if template is None:
-            logger.error(f"❌ Failed to load template: {template_path}")
+        cached = self.load_scaled_template(template_path, current_resolution, reference_resolution)
+        if cached is None:
             return None
         
+        # Take screenshot and perform template matching
+        screen, timestamp = self.capture.grab_timestamped(region)
+        return self._evaluate(screen, cached, threshold, region, timestamp)
+    
+    def load_scaled_template(self, template_path, current_resolution=None, reference_resolution=(1920, 1080)):
+        """Load a template resized from its reference resolution to the current one
+        
+        Args:
+            template_path (str): Path to template image
+            current_resolution (tuple): Current game resolution (width, height)
+            reference_resolution (tuple): Resolution at which templates were captured
+            
+        Returns:
+            Template or None: Scaled template (unscaled if the factors are about 1.0)
+        """
         # Use current screen resolution if not specified
         if current_resolution is None:
-            screen_width, screen_height = pyautogui.size()
+            screen_width, screen_height = self.capture.screen_size()
             current_resolution = (screen_width, screen_height)
         
         # Calculate scaling factors
@@ -128,94 +817,45 @@ class ImageDetector:
         
         # Skip scaling if the factors are approximately 1.0
         if abs(scale_x - 1.0) < 0.05 and abs(scale_y - 1.0) < 0.05:
-            return self.find_template(template_path, threshold=threshold, region=region)
-        
-        # Resize template
-        new_width = int(template.shape[1] * scale_x)
-        new_height = int(template.shape[0] * scale_y)
-        
-        # Choose appropriate interpolation method
-        interpolation = cv2.INTER_AREA if scale_x < 1.0 else cv2.INTER_LINEAR
-        
-        try:
-            scaled_template = cv2.resize(template, (new_width, new_height), interpolation=interpolation)
-        except Exception as e:
-            logger.error(f"❌ Failed to resize template: {e}")
-            return None
-        
-        # Take screenshot
-        screen = self.take_screenshot(region)
+            return self.load_template(template_path, scale=(1.0, 1.0))
         
-        # Check if scaled template is larger than screenshot
-        if scaled_template.shape[0] > screen.shape[0] or scaled_template.shape[1] > screen.shape[1]:
-            logger.error(f"❌ Scaled template ({scaled_template.shape[:2]}) is larger than screenshot ({screen.shape[:2]})")
-            return None
-        
-        # Perform template matching
-        result = cv2.matchTemplate(screen, scaled_template, cv2.TM_CCOEFF_NORMED)
-        _, max_val, _, max_loc = cv2.minMaxLoc(result)
-        
-        # Check if match confidence is above threshold
-        if max_val >= threshold:
-            # Calculate center of the match
-            h, w = scaled_template.shape[:2]
-            center_x = max_loc[0] + w // 2
-            center_y = max_loc[1] + h // 2
-            
-            # If search was in a region, adjust coordinates
-            if region:
-                center_x += region[0]
-                center_y += region[1]
-            
-            logger.info(f"✅ Match found for scaled {template_path.name} at ({center_x}, {center_y}) with confidence {max_val:.2f}")
-            return center_x, center_y
-        else:
-            logger.warning(f"⚠️ No match found for scaled {template_path.name} (max confidence {max_val:.2f})")
-            return None
+        # Get the resized template from the cache (resized once per scale)
+        return self.load_template(template_path, scale=(scale_x, scale_y))
     
     def find_template_with_retry(self, template_path, initial_threshold=0.8, min_threshold=0.6, 
-                                max_retries=3, region=None, check_interval=1):
+                                max_retries=3, region=None, check_interval=1, recapture=False):
         """Find a template with progressively lower thresholds
         
+        The threshold ladder is evaluated against a single match score. A new
+        frame is only captured for the next step when recapture is set.
+        
         Args:
             template_path (str): Path to template image
             initial_threshold (float): Initial confidence threshold
             min_threshold (float): Minimum acceptable threshold
             max_retries (int): Maximum number of retry attempts
             region (tuple, optional): Region to search in (left, top, width, height)
-            check_interval (float): Time between retry attempts in seconds
+            check_interval (float): Time between retry attempts in seconds (only with recapture)
+            recapture (bool): Capture a newer frame for each step of the ladder
             
         Returns:
             tuple or None: (x, y) coordinates of match center if found, None otherwise
         """
-        template_path = Path(template_path)
-        template_name = template_path.name
-        
-        # Calculate threshold step based on range and retries
-        threshold_step = (initial_threshold - min_threshold) / max_retries if max_retries > 0 else 0
-        
-        for attempt in range(max_retries + 1):
-            current_threshold = initial_threshold - (attempt * threshold_step)
-            
-            logger.info(f"🔍 Looking for {template_name} (attempt {attempt+1}/{max_retries+1}, threshold: {current_threshold:.2f})")
-            match = self.find_template(template_path, threshold=current_threshold, region=region)
-            
-            if match:
-                if attempt > 0:
-                    logger.info(f"✅ Found {template_name} on retry attempt {attempt+1} with threshold {current_threshold:.2f}")
-                return match
-            
-            if attempt < max_retries:
-                time.sleep(check_interval)
+        cached = self.load_template(template_path)
+        if cached is None:
+            return None
         
-        logger.warning(f"❌ Failed to find {template_name} after {max_retries+1} attempts")
-        return None
+        thresholds = self._threshold_ladder(initial_threshold, min_threshold, max_retries)
+        return self._find_with_ladder(cached, thresholds, region, check_interval, recapture)
     
     def find_template_with_scaling_retry(self, template_path, current_resolution=None, reference_resolution=(1920, 1080),
                                        initial_threshold=0.8, min_threshold=0.6, max_retries=3, 
-                                       region=None, check_interval=1):
+                                       region=None, check_interval=1, recapture=False):
         """Find a template with scaling and progressively lower thresholds
         
+        The threshold ladder is evaluated against a single match score. A new
+        frame is only captured for the next step when recapture is set.
+        
         Args:
             template_path (str): Path to template image
             current_resolution (tuple): Current game resolution (width, height)
@@ -224,41 +864,100 @@ class ImageDetector:
             min_threshold (float): Minimum acceptable threshold
             max_retries (int): Maximum number of retry attempts
             region (tuple, optional): Region to search in (left, top, width, height)
-            check_interval (float): Time between retry attempts in seconds
+            check_interval (float): Time between retry attempts in seconds (only with recapture)
+            recapture (bool): Capture a newer frame for each step of the ladder
             
         Returns:
             tuple or None: (x, y) coordinates of match center if found, None otherwise
         """
-        template_path = Path(template_path)
-        template_name = template_path.name
+        cached = self.load_scaled_template(template_path, current_resolution, reference_resolution)
+        if cached is None:
+            return None
         
+        thresholds = self._threshold_ladder(initial_threshold, min_threshold, max_retries)
+        return self._find_with_ladder(cached, thresholds, region, check_interval, recapture)
+    
+    @staticmethod
+    def _threshold_ladder(initial_threshold, min_threshold, max_retries):
+        """Build a descending list of thresholds
+        
+        Args:
+            initial_threshold (float): Initial confidence threshold
+            min_threshold (float): Minimum acceptable threshold
+            max_retries (int): Number of steps below the initial threshold
+            
+        Returns:
+            list: Thresholds from initial_threshold down to min_threshold
+        """
         # Calculate threshold step based on range and retries
         threshold_step = (initial_threshold - min_threshold) / max_retries if max_retries > 0 else 0
+        return [initial_threshold - (attempt * threshold_step) for attempt in range(max_retries + 1)]
+    
+    def _find_with_ladder(self, cached, thresholds, region, check_interval, recapture):
+        """Evaluate a threshold ladder against as few captures as possible
         
-        for attempt in range(max_retries + 1):
-            current_threshold = initial_threshold - (attempt * threshold_step)
+        Args:
+            cached (Template): Template to match
+            thresholds (list): Descending confidence thresholds
+            region (tuple, optional): Region to search in (left, top, width, height)
+            check_interval (float): Time between captures in seconds
+            recapture (bool): Capture a newer frame for each step of the ladder
             
-            logger.info(f"🔍 Looking for scaled {template_name} (attempt {attempt+1}/{max_retries+1}, threshold: {current_threshold:.2f})")
-            match = self.find_template_with_scaling(
-                template_path, 
-                current_resolution=current_resolution,
-                reference_resolution=reference_resolution,
-                threshold=current_threshold, 
-                region=region
-            )
+        Returns:
+            tuple or None: (x, y) coordinates of match center if found, None otherwise
+        """
+        label = "scaled " if cached.scale != (1.0, 1.0) else ""
+        template_name = cached.name
+        steps = len(thresholds)
+        match = None
+        
+        logger.info(f"🔍 Looking for {label}{template_name} (thresholds {thresholds[0]:.2f}-{thresholds[-1]:.2f}, {steps} steps)")
+        
+        for attempt, current_threshold in enumerate(thresholds):
+            if match is None or recapture:
+                if match is not None:
+                    time.sleep(check_interval)
+                # A single frame is scored once and judged against the rest of the ladder
+                match = self.match_template(cached, region=region,
+                                            threshold=current_threshold if recapture else thresholds[-1])
+                if match is None:
+                    return None
             
-            if match:
+            if match.passes(current_threshold):
                 if attempt > 0:
-                    logger.info(f"✅ Found scaled {template_name} on retry attempt {attempt+1} with threshold {current_threshold:.2f}")
-                return match
-            
-            if attempt < max_retries:
-                time.sleep(check_interval)
+                    logger.info(f"✅ Found {label}{template_name} on step {attempt+1}/{steps} with threshold {current_threshold:.2f} (confidence {match.confidence:.2f})")
+                else:
+                    logger.info(f"✅ Found {label}{template_name} at {match.location} with confidence {match.confidence:.2f}")
+                return match.location
         
-        logger.warning(f"❌ Failed to find scaled {template_name} after {max_retries+1} attempts")
+        logger.warning(f"❌ Failed to find {label}{template_name} (best confidence {match.confidence:.2f}, lowest threshold {thresholds[-1]:.2f})")
         return None
     
-    def wait_for_template(self, template_path, timeout=30, check_interval=1, threshold=0.8, region=None):
+    def match_template(self, template, region=None, frame=None, threshold=None, timestamp=None):
+        """Score a template once and return the full match result
+        
+        Args:
+            template (str or Template): Path to template image, or an already loaded template
+            region (tuple, optional): Region to search in (left, top, width, height)
+            frame (numpy.ndarray, optional): Frame to search in, captured if None
+            threshold (float, optional): Threshold used to accept region hints
+            timestamp (float, optional): Capture time of the given frame
+            
+        Returns:
+            MatchResult or None: Best match (with bbox and frame timestamp), or None if the
+                template could not be loaded or does not fit the frame
+        """
+        cached = template if isinstance(template, Template) else self.load_template(template)
+        if cached is None:
+            return None
+        
+        if frame is None:
+            frame, timestamp = self.capture.grab_timestamped(region)
+        
+        return self._locate(frame, cached, threshold, region, timestamp=timestamp)
+    
+    def wait_for_template(self, template_path, timeout=30, check_interval=1, threshold=0.8, region=None,
+                          skip_unchanged=True):
         """Wait until a template appears on screen or timeout
         
         Args:
@@ -267,31 +966,149 @@ class ImageDetector:
             check_interval (float): Time between checks in seconds
             threshold (float): Confidence threshold (0.0-1.0)
             region (tuple, optional): Region to search in (left, top, width, height)
+            skip_unchanged (bool): Skip matching while the frame has not changed
             
         Returns:
             tuple or None: (x, y) coordinates of match center if found, None otherwise
         """
-        template_path = Path(template_path)
-        template_name = template_path.name
+        cached = self.load_template(template_path)
+        if cached is None:
+            return None
+        
+        return self._wait_for(cached, timeout, check_interval, threshold, region, skip_unchanged)
+    
+    def _wait_for(self, cached, timeout, check_interval, threshold, region, skip_unchanged):
+        """Poll for a loaded template until it is found or the timeout expires
+        
+        With skip_unchanged, each poll compares the new frame to the last frame
+        that was matched and reuses that negative result if nothing changed.
+        
+        Args:
+            cached (Template): Template to wait for
+            timeout (int): Maximum time to wait in seconds
+            check_interval (float): Time between checks in seconds
+            threshold (float): Confidence threshold (0.0-1.0)
+            region (tuple, optional): Region to search in (left, top, width, height)
+            skip_unchanged (bool): Skip matching while the frame has not changed
+            
+        Returns:
+            tuple or None: (x, y) coordinates of match center if found, None otherwise
+        """
+        label = "scaled " if cached.scale != (1.0, 1.0) else ""
+        template_name = cached.name
         start_time = time.time()
+        last_signature = None
         
-        logger.info(f"⏳ Waiting for {template_name} (timeout: {timeout}s)...")
+        logger.info(f"⏳ Waiting for {label}{template_name} (timeout: {timeout}s)...")
         
         while time.time() - start_time < timeout:
-            match = self.find_template(template_path, threshold=threshold, region=region)
+            screen, timestamp = self.capture.grab_timestamped(region)
+            
+            if skip_unchanged:
+                signature = self.change_detector.signature(screen)
+                if not self.change_detector.has_changed(last_signature, signature):
+                    self.change_detector.record_skip()
+                    time.sleep(check_interval)
+                    continue
+                last_signature = signature
+            
+            match = self._locate(screen, cached, threshold, region, timestamp=timestamp, polling=True)
+            if match is not None and not match.complete:
+                # Only the hinted window was searched, so the same frame still has to be searched in full
+                last_signature = None
+            match = self._accept(match, cached, threshold)
             if match:
                 elapsed = time.time() - start_time
-                logger.info(f"✅ Found {template_name} after {elapsed:.1f}s")
-                return match
+                logger.info(f"✅ Found {label}{template_name} after {elapsed:.1f}s")
+                return match.location
             
             time.sleep(check_interval)
         
         elapsed = time.time() - start_time
-        logger.warning(f"⌛ Timeout after {elapsed:.1f}s waiting for {template_name}")
+        logger.warning(f"⌛ Timeout after {elapsed:.1f}s waiting for {label}{template_name}")
         return None
     
+    def element_region(self, match, padding=None):
+        """Get the screen region around a matched element
+        
+        Args:
+            match (MatchResult): Match with a bounding box
+            padding (int, optional): Pixels added on every side, defaults to 10% of the larger side (at least 4)
+            
+        Returns:
+            tuple or None: (left, top, width, height) clipped to the screen, None without a bounding box
+        """
+        if match is None or match.bbox is None:
+            return None
+        
+        left, top, width, height = match.bbox
+        if padding is None:
+            padding = max(4, int(max(width, height) * 0.1))
+        screen_width, screen_height = self.capture.screen_size()
+        x1, y1 = max(0, left - padding), max(0, top - padding)
+        x2 = min(screen_width, left + width + padding)
+        y2 = min(screen_height, top + height + padding)
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return (x1, y1, x2 - x1, y2 - y1)
+    
+    def wait_until_gone(self, match, timeout=10, threshold=0.8, padding=None, min_interval=0.005, max_interval=0.1):
+        """Wait until a matched element is no longer shown where it was found
+        
+        Only a padded box around the match's bounding box is captured. While
+        the box is unchanged the element is still there and nothing is matched;
+        once it changes, the template (at the size it was found at) is matched
+        within the box only. The poll interval follows the measured cost of a
+        check, so cheap checks are repeated every few milliseconds.
+        
+        Args:
+            match (MatchResult): Accepted match of the element
+            timeout (float): Maximum time to wait in seconds
+            threshold (float): Confidence threshold (0.0-1.0) below which the element is gone
+            padding (int, optional): Pixels around the bounding box (see element_region)
+            min_interval (float): Shortest time between checks in seconds
+            max_interval (float): Longest time between checks in seconds
+            
+        Returns:
+            bool: True if the element disappeared within the timeout
+        """
+        region = self.element_region(match, padding)
+        cached = self.load_template(match.template_path) if region else None
+        if cached is None:
+            return False
+        
+        # Keypoint matches may have been found at another size than the loaded template
+        width, height = match.bbox[2], match.bbox[3]
+        if abs(width - cached.full_size[0]) > 1 or abs(height - cached.full_size[1]) > 1:
+            asset_width = cached.full_size[0] / cached.scale[0]
+            asset_height = cached.full_size[1] / cached.scale[1]
+            cached = self.load_template(match.template_path, scale=(width / asset_width, height / asset_height))
+            if cached is None:
+                return False
+        
+        start_time = time.time()
+        last_signature = None
+        while True:
+            check_start = time.perf_counter()
+            roi = self.capture.grab(region)
+            signature = self.change_detector.signature(roi)
+            if self.change_detector.has_changed(last_signature, signature):
+                last_signature = signature
+                result = self._match(roi, cached, region, mode=MATCH_FULL)
+                if result is None or not result.passes(threshold):
+                    logger.info(f"✅ {cached.name} disappeared after {time.time() - start_time:.3f}s")
+                    return True
+            else:
+                self.change_detector.record_skip()
+            
+            if time.time() - start_time >= timeout:
+                logger.warning(f"⌛ {cached.name} still visible after {timeout}s")
+                return False
+            cost = time.perf_counter() - check_start
+            time.sleep(min(max_interval, max(min_interval, 2 * cost)))
+    
     def wait_for_scaled_template(self, template_path, current_resolution=None, reference_resolution=(1920, 1080),
-                               timeout=30, check_interval=1, threshold=0.8, region=None):
+                               timeout=30, check_interval=1, threshold=0.8, region=None, skip_unchanged=True):
         """Wait until a scaled template appears on screen or timeout
         
         Args:
@@ -302,45 +1119,28 @@ class ImageDetector:
             check_interval (float): Time between checks in seconds
             threshold (float): Confidence threshold (0.0-1.0)
             region (tuple, optional): Region to search in (left, top, width, height)
+            skip_unchanged (bool): Skip matching while the frame has not changed
             
         Returns:
             tuple or None: (x, y) coordinates of match center if found, None otherwise
         """
-        template_path = Path(template_path)
-        template_name = template_path.name
-        start_time = time.time()
-        
-        logger.info(f"⏳ Waiting for scaled {template_name} (timeout: {timeout}s)...")
-        
-        while time.time() - start_time < timeout:
-            match = self.find_template_with_scaling(
-                template_path, 
-                current_resolution=current_resolution,
-                reference_resolution=reference_resolution,
-                threshold=threshold, 
-                region=region
-            )
-            
-            if match:
-                elapsed = time.time() - start_time
-                logger.info(f"✅ Found scaled {template_name} after {elapsed:.1f}s")
-                return match
-            
-            time.sleep(check_interval)
+        cached = self.load_scaled_template(template_path, current_resolution, reference_resolution)
+        if cached is None:
+            return None
         
-        elapsed = time.time() - start_time
-        logger.warning(f"⌛ Timeout after {elapsed:.1f}s waiting for scaled {template_name}")
-        return None
+        return self._wait_for(cached, timeout, check_interval, threshold, region, skip_unchanged)
     
-    def wait_for_any_template(self, template_paths, timeout=30, check_interval=1, threshold=0.8, region=None):
+    def wait_for_any_template(self, template_paths, timeout=30, check_interval=1, threshold=0.8, region=None,
+                              skip_unchanged=True):
         """Wait until any of the templates appears on screen or timeout
         
         Args:
             template_paths (list): List of paths to template images
-            timeout (int): Maximum time to wait in seconds
+            timeout (int): Maximum time to wait in seconds (0 checks the screen once)
             check_interval (float): Time between checks in seconds
             threshold (float): Confidence threshold (0.0-1.0)
             region (tuple, optional): Region to search in (left, top, width, height)
+            skip_unchanged (bool): Skip matching while the frame has not changed
             
         Returns:
             tuple: (template_path, (x, y)) of the first template found, or (None, None) on timeout
@@ -348,20 +1148,36 @@ class ImageDetector:
         template_paths = [Path(p) for p in template_paths]
         template_names = [p.name for p in template_paths]
         start_time = time.time()
+        last_signature = None
         
         logger.info(f"⏳ Waiting for any of {template_names} (timeout: {timeout}s)...")
         
-        while time.time() - start_time < timeout:
-            for template_path in template_paths:
-                match = self.find_template(template_path, threshold=threshold, region=region)
-                if match:
-                    elapsed = time.time() - start_time
-                    logger.info(f"✅ Found {template_path.name} after {elapsed:.1f}s")
-                    return template_path, match
+        while True:
+            # One capture per iteration, scored against every template
+            screen, timestamp = self.capture.grab_timestamped(region)
+            signature = self.change_detector.signature(screen) if skip_unchanged else None
+            
+            if skip_unchanged and not self.change_detector.has_changed(last_signature, signature):
+                self.change_detector.record_skip()
+            else:
+                last_signature = signature
+                # A single check searches every template in full
+                matches = self.find_templates(screen, template_paths, region=region, threshold=threshold,
+                                              timestamp=timestamp, polling=timeout > 0)
+                for match in matches:
+                    if match.passes(threshold):
+                        elapsed = time.time() - start_time
+                        logger.info(f"✅ Found {match.name} at {match.location} with confidence {match.confidence:.2f} after {elapsed:.1f}s")
+                        return match.template_path, match.location
+                
+                # A template searched only in its hinted window keeps the same frame from being skipped
+                if not all(match.complete for match in matches):
+                    last_signature = None
             
+            if time.time() - start_time >= timeout:
+                break
             time.sleep(check_interval)
         
         elapsed = time.time() - start_time
         logger.warning(f"⌛ Timeout after {elapsed:.1f}s waiting for any of {template_names}")
-        return None, None
         return None, None
\ No newline at end of file
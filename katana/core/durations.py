@@ -0,0 +1,162 @@
+"""
+Katana Game Benchmark Automation Framework - Core Durations Module
+
+This module persists measured benchmark durations keyed by game, benchmark
+map, graphics preset and game build. A series can skip its duration-
+measuring dry run when the store holds a trusted duration for the same key:
+enough recent samples that agree closely (a small coefficient of variation).
+Measured runs keep refreshing the entry, and a new game build starts a new
+key, so a changed benchmark is measured again.
+"""
+import re
+import json
+import time
+import logging
+import threading
+import statistics
+from pathlib import Path
+
+from .presets import find_steam_path
+
+logger = logging.getLogger("katana")
+
+# Version of the store format; bumping it ignores older store files
+DURATION_VERSION = 1
+
+def steam_build_id(app_id, steam_path=None):
+    """Read the installed build of a Steam game from its app manifest
+    
+    Args:
+        app_id (str): Steam application ID
+        steam_path (Path, optional): Steam installation directory (found automatically if None)
+        
+    Returns:
+        str or None: Build ID, or None if the manifest was not found
+    """
+    steam_path = Path(steam_path) if steam_path else find_steam_path()
+    if not steam_path:
+        return None
+    
+    # Games may be installed in any of the Steam library folders
+    libraries = [steam_path]
+    library_file = steam_path / "steamapps" / "libraryfolders.vdf"
+    try:
+        if library_file.is_file():
+            text = library_file.read_text(encoding="utf-8", errors="ignore")
+            libraries += [Path(path.replace("\\\\", "\\")) for path in re.findall(r'"path"\s+"([^"]+)"', text)]
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to read Steam library folders: {e}")
+    
+    for library in libraries:
+        manifest = library / "steamapps" / f"appmanifest_{app_id}.acf"
+        try:
+            if manifest.is_file():
+                match = re.search(r'"buildid"\s+"(\d+)"', manifest.read_text(encoding="utf-8", errors="ignore"))
+                if match:
+                    return match.group(1)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to read {manifest}: {e}")
+    return None
+
+
+class DurationStore:
+    """Persistent benchmark durations per (game, map, preset, build)"""
+    
+    def __init__(self, store_path=None, min_samples=2, max_variation=0.03, max_samples=10):
+        """Initialize the duration store
+        
+        Args:
+            store_path (Path, optional): JSON file the durations are persisted to (in-memory only if None)
+            min_samples (int): Smallest number of samples of a trusted entry
+            max_variation (float): Largest coefficient of variation (stdev / mean) of a trusted entry
+            max_samples (int): Number of most recent samples kept per entry
+        """
+        self.store_path = Path(store_path) if store_path else None
+        self.min_samples = min_samples
+        self.max_variation = max_variation
+        self.max_samples = max_samples
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.load()
+    
+    @staticmethod
+    def key(game_id, benchmark_map, preset_id, build):
+        """Build the key of a benchmark configuration
+        
+        Args:
+            game_id (str): Game identifier
+            benchmark_map (str): Benchmark map or mode
+            preset_id (str, optional): Graphics preset (None for the game's current settings)
+            build (str): Game build
+            
+        Returns:
+            str: Store key
+        """
+        return "|".join(str(part) for part in (game_id, benchmark_map, preset_id or "current", build))
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def load(self):
+        """Load durations from the store file, if it exists"""
+        if not self.store_path or not self.store_path.is_file():
+            return
+        
+        try:
+            with open(self.store_path, "r") as f:
+                data = json.load(f)
+            if data.get("version") != DURATION_VERSION:
+                logger.warning(f"⚠️ Ignoring benchmark durations in {self.store_path} (different format)")
+                return
+            with self._lock:
+                self._entries = data.get("entries", {})
+            logger.info(f"⏱️ Loaded {len(self._entries)} benchmark durations from {self.store_path}")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load benchmark durations from {self.store_path}: {e}")
+    
+    def save(self):
+        """Write durations to the store file"""
+        if not self.store_path:
+            return
+        
+        try:
+            with self._lock:
+                data = json.dumps({"version": DURATION_VERSION, "entries": self._entries}, indent=2)
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.store_path, "w") as f:
+                f.write(data)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to save benchmark durations to {self.store_path}: {e}")
+    
+    def record(self, key, duration):
+        """Add a measured duration to an entry
+        
+        Args:
+            key (str): Store key (see key)
+            duration (float): Measured benchmark duration in seconds
+        """
+        with self._lock:
+            entry = self._entries.setdefault(key, {"samples": []})
+            entry["samples"] = (entry["samples"] + [round(duration, 3)])[-self.max_samples:]
+            entry["updated"] = time.time()
+    
+    def lookup(self, key):
+        """Get the trusted duration of an entry
+        
+        Args:
+            key (str): Store key (see key)
+            
+        Returns:
+            float or None: Mean duration in seconds, or None if the entry is missing or not trusted
+        """
+        with self._lock:
+            samples = list(self._entries.get(key, {}).get("samples", []))
+        if len(samples) < self.min_samples:
+            return None
+        
+        mean = statistics.mean(samples)
+        variation = statistics.pstdev(samples) / mean if mean > 0 else float("inf")
+        if variation > self.max_variation:
+            logger.info(f"⏱️ Benchmark durations for {key} vary too much ({variation:.1%}), measuring again")
+            return None
+        return mean
\ No newline at end of file
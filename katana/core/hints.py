@@ -0,0 +1,152 @@
+"""
+Katana Game Benchmark Automation Framework - Core Region Hints Module
+
+This module provides a small persistent index of where templates were last
+found on screen. The detector searches a padded region around the last-known
+location first and only falls back to a full-frame search on a miss.
+"""
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger("katana")
+
+class RegionHintIndex:
+    """Persistent index of last-known match locations per (template, resolution)"""
+    
+    def __init__(self, index_path=None, padding=48, autosave=True):
+        """Initialize the hint index
+        
+        Args:
+            index_path (Path, optional): JSON file to persist hints to (in-memory only if None)
+            padding (int): Pixels added around the last-known bounding box when searching
+            autosave (bool): Save the index to disk whenever a hint changes
+        """
+        self.index_path = Path(index_path) if index_path else None
+        self.padding = padding
+        self.autosave = autosave
+        self.hits = 0
+        self.misses = 0
+        self._hints = {}
+        self._lock = threading.Lock()
+        self.load()
+    
+    @staticmethod
+    def _key(template_name, resolution):
+        """Build the index key for a template at a screen resolution"""
+        return f"{template_name}@{resolution[0]}x{resolution[1]}"
+    
+    def load(self):
+        """Load hints from the index file, if it exists"""
+        if not self.index_path or not self.index_path.is_file():
+            return
+        
+        try:
+            with open(self.index_path, "r") as f:
+                self._hints = json.load(f).get("hints", {})
+            logger.info(f"📍 Loaded {len(self._hints)} region hints from {self.index_path}")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load region hints from {self.index_path}: {e}")
+            self._hints = {}
+    
+    def save(self):
+        """Write hints to the index file"""
+        if not self.index_path:
+            return
+        
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                data = json.dumps({"hints": self._hints}, indent=2)
+            with open(self.index_path, "w") as f:
+                f.write(data)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to save region hints to {self.index_path}: {e}")
+    
+    def search_region(self, template_name, resolution, template_size):
+        """Get the padded search region around the last-known location of a template
+        
+        Args:
+            template_name (str): Template file name
+            resolution (tuple): (width, height) of the searched frame
+            template_size (tuple): (width, height) of the template being matched
+            
+        Returns:
+            tuple or None: (left, top, width, height) within the frame, or None without a hint
+        """
+        with self._lock:
+            hint = self._hints.get(self._key(template_name, resolution))
+        if hint is None:
+            return None
+        
+        # Pad around the hinted box, large enough for the current template size
+        width = max(hint["w"], template_size[0])
+        height = max(hint["h"], template_size[1])
+        left = max(0, hint["x"] - self.padding)
+        top = max(0, hint["y"] - self.padding)
+        right = min(resolution[0], hint["x"] + width + self.padding)
+        bottom = min(resolution[1], hint["y"] + height + self.padding)
+        
+        if right - left < template_size[0] or bottom - top < template_size[1]:
+            return None
+        return left, top, right - left, bottom - top
+    
+    def matches(self, template_name, resolution):
+        """Get how often a template was found at its hinted location
+        
+        Args:
+            template_name (str): Template file name
+            resolution (tuple): (width, height) of the searched frame
+            
+        Returns:
+            int: Number of recorded matches (0 without a hint)
+        """
+        with self._lock:
+            hint = self._hints.get(self._key(template_name, resolution))
+        return hint["matches"] if hint else 0
+    
+    def record(self, template_name, resolution, bbox):
+        """Record a successful match location
+        
+        Args:
+            template_name (str): Template file name
+            resolution (tuple): (width, height) of the searched frame
+            bbox (tuple): (left, top, width, height) of the match within the frame
+        """
+        key = self._key(template_name, resolution)
+        with self._lock:
+            previous = self._hints.get(key)
+            unchanged = previous is not None and (previous["x"], previous["y"], previous["w"], previous["h"]) == tuple(bbox)
+            self._hints[key] = {
+                "x": int(bbox[0]),
+                "y": int(bbox[1]),
+                "w": int(bbox[2]),
+                "h": int(bbox[3]),
+                "matches": (previous or {}).get("matches", 0) + 1,
+                "updated": time.strftime("%Y%m%d_%H%M%S"),
+            }
+        
+        # Only touch the disk when the location actually moved
+        if self.autosave and not unchanged:
+            self.save()
+    
+    def record_hit(self):
+        """Count a search answered from the hinted region"""
+        with self._lock:
+            self.hits += 1
+    
+    def record_miss(self):
+        """Count a hinted search that fell back to the full frame"""
+        with self._lock:
+            self.misses += 1
+    
+    def stats(self):
+        """Get hint statistics
+        
+        Returns:
+            dict: Number of hints and hit/miss counters
+        """
+        with self._lock:
+            return {"hints": len(self._hints), "hits": self.hits, "misses": self.misses}
\ No newline at end of file
@@ -4,12 +4,14 @@ Katana Game Benchmark Automation Framework - Core Interaction Module
 This module provides user interface interaction capabilities using PyAutoGUI.
 It includes functions for clicking, typing, and other interactions.
 """
+import cv2
 import pyautogui
-import pygetwindow as gw
 import time
 import logging
+import threading
 from pathlib import Path
 from .detection import ImageDetector
+from .window import GameWindow
 
 logger = logging.getLogger("katana")
 
@@ -17,18 +19,171 @@ logger = logging.getLogger("katana")
 pyautogui.FAILSAFE = True  # Move mouse to corner to abort
 pyautogui.PAUSE = 0.1  # Small pause between PyAutoGUI actions
 
+class InputProfile:
+    """Timing of input actions and how their effect is confirmed"""
+    
+    def __init__(self, name, pause=0.1, move_duration=0.25, post_click_delay=0.5, key_interval=0.1,
+                 confirm=False, confirm_timeout=1.0, confirm_interval=0.01, roi_padding=32):
+        """Initialize the input profile
+        
+        Args:
+            name (str): Profile name
+            pause (float): PyAutoGUI pause after every call in seconds
+            move_duration (float): Mouse move duration in seconds
+            post_click_delay (float): Fixed wait after every click in seconds
+            key_interval (float): Default time between key presses in seconds
+            confirm (bool): Wait for a visual change after each action instead of fixed delays
+            confirm_timeout (float): Longest wait for the visual change of an action in seconds
+            confirm_interval (float): Time between change checks in seconds
+            roi_padding (int): Pixels around a click watched for its visual change
+        """
+        self.name = name
+        self.pause = pause
+        self.move_duration = move_duration
+        self.post_click_delay = post_click_delay
+        self.key_interval = key_interval
+        self.confirm = confirm
+        self.confirm_timeout = confirm_timeout
+        self.confirm_interval = confirm_interval
+        self.roi_padding = roi_padding
+
+
+# Input profiles: 'safe' keeps the original fixed delays, 'fast' moves instantly and
+# confirms every action by watching for its visual change (key presses only when given
+# a watch region or an expected template, otherwise they keep a short key interval)
+INPUT_PROFILES = {
+    "safe": InputProfile("safe"),
+    "fast": InputProfile("fast", pause=0.0, move_duration=0.0, post_click_delay=0.0, key_interval=0.05, confirm=True),
+}
+
 class GameInteractor:
     """Class for interacting with game UI elements"""
     
-    def __init__(self, assets_dir=None, detector=None):
+    def __init__(self, assets_dir=None, detector=None, capture=None, profile="safe"):
         """Initialize the interactor
         
         Args:
             assets_dir (Path, optional): Directory containing image assets
             detector (ImageDetector, optional): Image detector instance to use
+            capture (CaptureBackend or str, optional): Capture backend for a newly created detector
+            profile (InputProfile or str): Input profile or profile name ('safe' or 'fast')
         """
         self.assets_dir = Path(assets_dir) if assets_dir else None
-        self.detector = detector or ImageDetector(assets_dir)
+        self.detector = detector or ImageDetector(assets_dir, capture=capture)
+        
+        # When simulating, input actions are logged but not sent (used for offline replays)
+        self.simulate = False
+        
+        # Window sessions by title, resolved once and revalidated cheaply
+        self._windows = {}
+        
+        # Per-action latencies: action -> list of (latency, confirmed)
+        self._timings = {}
+        self._timings_lock = threading.Lock()
+        self.set_profile(profile)
+    
+    def set_profile(self, profile):
+        """Switch the input profile
+        
+        Args:
+            profile (InputProfile or str): Input profile or profile name ('safe' or 'fast')
+        """
+        if not isinstance(profile, InputProfile):
+            if profile not in INPUT_PROFILES:
+                raise ValueError(f"Unknown input profile '{profile}'")
+            profile = INPUT_PROFILES[profile]
+        self.profile = profile
+        # PyAutoGUI's pause is process-wide
+        pyautogui.PAUSE = profile.pause
+        logger.info(f"⌨️ Using '{profile.name}' input profile")
+    
+    def _record_timing(self, action, latency, confirmed):
+        """Record the latency of an action"""
+        with self._timings_lock:
+            self._timings.setdefault(action, []).append((latency, confirmed))
+    
+    def action_stats(self):
+        """Get per-action latency statistics
+        
+        Returns:
+            dict: Action -> count, unconfirmed count and average/maximum latency in milliseconds
+        """
+        with self._timings_lock:
+            timings = {action: list(entries) for action, entries in self._timings.items()}
+        stats = {}
+        for action, entries in timings.items():
+            latencies = [latency for latency, _ in entries]
+            stats[action] = {
+                "count": len(entries),
+                "unconfirmed": sum(1 for _, confirmed in entries if not confirmed),
+                "avg_ms": 1000 * sum(latencies) / len(latencies),
+                "max_ms": 1000 * max(latencies),
+            }
+        return stats
+    
+    def _watch_region(self, region):
+        """Clip a watch region to the screen
+        
+        Args:
+            region (tuple or None): (left, top, width, height), None watches the whole screen
+            
+        Returns:
+            tuple or None: Region within the screen, or None for the whole screen
+        """
+        if region is None:
+            return None
+        screen_width, screen_height = self.detector.capture.screen_size()
+        left, top = max(0, int(region[0])), max(0, int(region[1]))
+        right = min(screen_width, int(region[0] + region[2]))
+        bottom = min(screen_height, int(region[1] + region[3]))
+        if right <= left or bottom <= top:
+            return None
+        return (left, top, right - left, bottom - top)
+    
+    def _signature(self, region):
+        """Capture the change signature of a watch region"""
+        return self.detector.change_detector.signature(self.detector.capture.grab(region))
+    
+    def _wait_for_change(self, region, before, timeout):
+        """Wait until a watch region differs from an earlier signature
+        
+        Args:
+            region (tuple or None): Clipped watch region, None for the whole screen
+            before (numpy.ndarray): Signature captured before the action
+            timeout (float): Longest wait in seconds
+            
+        Returns:
+            bool: True if the region changed within the timeout
+        """
+        change_detector = self.detector.change_detector
+        deadline = time.perf_counter() + timeout
+        while True:
+            if change_detector.has_changed(before, self._signature(region)):
+                return True
+            if time.perf_counter() >= deadline:
+                return False
+            time.sleep(self.profile.confirm_interval)
+    
+    def get_window(self, window_title):
+        """Get the session of a window, creating it on first use
+        
+        Args:
+            window_title (str): Title of the window
+            
+        Returns:
+            GameWindow: Window session (shared with the detector if it captures that window)
+        """
+        if self.detector.window is not None and self.detector.window.title == window_title:
+            return self.detector.window
+        if window_title not in self._windows:
+            self._windows[window_title] = GameWindow(window_title)
+        return self._windows[window_title]
+    
+    def _to_screen(self, x, y):
+        """Translate detector coordinates to screen coordinates for input"""
+        if self.detector.window is None:
+            return x, y
+        return self.detector.window.to_screen(x, y)
     
     def focus_window(self, window_title):
         """Focus a window by its title
@@ -40,51 +195,62 @@ class GameInteractor:
             bool: True if window was focused, False otherwise
         """
         logger.info(f"🪟 Trying to focus window: '{window_title}'")
+        if self.simulate:
+            return True
         
-        # Look for any window containing the title
-        windows = gw.getWindowsWithTitle(window_title)
-        
-        if not windows:
-            logger.error(f"❌ No window with title '{window_title}' found")
-            return False
-        
-        try:
-            # Use the first window found
-            window = windows[0]
-            window.activate()
-            time.sleep(1)  # Wait for window to become active
-            
-            # Confirm if the window became active
-            if window.isActive:
-                logger.info(f"✅ Window '{window_title}' is now active")
-                return True
-            else:
-                logger.warning(f"⚠️ Tried to activate '{window_title}', but it's not in focus")
-                return False
-        except Exception as e:
-            logger.error(f"⚠️ Window activation error: {e}")
-            return False
+        return self.get_window(window_title).focus()
     
-    def click(self, x, y, button='left', clicks=1, interval=0.0, duration=0.25):
+    def click(self, x, y, button='left', clicks=1, interval=0.0, duration=None, watch_region=None):
         """Click at the specified coordinates
         
+        With a confirming profile the pixels around the click are watched
+        until they change instead of waiting a fixed delay. Elements may react
+        late or not visibly at all, and clicking again could toggle them back,
+        so a click without a change within the profile's timeout still counts
+        as sent; it is logged and counted as unconfirmed.
+        
         Args:
-            x (int): X coordinate
-            y (int): Y coordinate
+            x (int): X coordinate (relative to the detector's window, if any)
+            y (int): Y coordinate (relative to the detector's window, if any)
             button (str): Mouse button ('left', 'middle', 'right')
             clicks (int): Number of clicks
             interval (float): Time between clicks in seconds
-            duration (float): Move duration in seconds
+            duration (float, optional): Move duration in seconds (default: the profile's)
+            watch_region (tuple, optional): Region confirming the click (default: a box around the click)
             
         Returns:
             bool: True if click was performed
         """
         logger.info(f"🖱️ Clicking at ({x}, {y}) with {button} button")
+        if self.simulate:
+            return True
         
+        profile = self.profile
+        screen_x, screen_y = self._to_screen(x, y)
         try:
-            pyautogui.moveTo(x, y, duration=duration)
-            pyautogui.click(x=x, y=y, button=button, clicks=clicks, interval=interval)
-            time.sleep(0.5)  # Wait for click to register
+            pyautogui.moveTo(screen_x, screen_y, duration=profile.move_duration if duration is None else duration)
+            
+            # Watch the clicked element after the move, so hover effects do not count as the click's change
+            if profile.confirm:
+                padding = profile.roi_padding
+                region = self._watch_region(watch_region or (x - padding, y - padding, 2 * padding, 2 * padding))
+                before = self._signature(region)
+            
+            start = time.perf_counter()
+            pyautogui.click(x=screen_x, y=screen_y, button=button, clicks=clicks, interval=interval)
+            if not profile.confirm:
+                time.sleep(profile.post_click_delay)  # Wait for click to register
+                self._record_timing("click", time.perf_counter() - start, True)
+                return True
+            
+            confirmed = self._wait_for_change(region, before, profile.confirm_timeout)
+            latency = time.perf_counter() - start
+            self._record_timing("click", latency, confirmed)
+            if confirmed:
+                logger.info(f"⚡ Click confirmed after {latency * 1000:.0f} ms")
+            else:
+                logger.warning(f"⚠️ No visual change within {profile.confirm_timeout:.1f}s of the click, "
+                               f"treating it as sent")
             return True
         except Exception as e:
             logger.error(f"❌ Click failed: {e}")
@@ -110,30 +276,27 @@ class GameInteractor:
         logger.info(f"🖱️ Searching and clicking: {template_path.name}")
         
         # Find the template
-        match = self.detector.find_template(template_path, threshold=threshold, region=region)
+        match = self.detector.find_template_match(template_path, threshold=threshold, region=region)
         
         if not match:
             logger.error(f"❌ Failed to find template: {template_path.name}")
             return False
         
         # Apply click offset
-        x, y = match
+        x, y = match.location
         x += click_offset[0]
         y += click_offset[1]
         
-        # Perform the click
+        # Perform the click, confirming it on the matched element
+        click_kwargs.setdefault("watch_region", self.detector.element_region(match))
         success = self.click(x, y, **click_kwargs)
         
-        # Wait for template to disappear if requested
+        # Wait for template to disappear if requested, watching only the matched element
         if success and wait_disappear:
-            start_time = time.time()
             logger.info(f"⏳ Waiting for {template_path.name} to disappear...")
-            
-            while time.time() - start_time < disappear_timeout:
-                if self.detector.find_template(template_path, threshold=threshold, region=region) is None:
-                    logger.info(f"✅ Template {template_path.name} disappeared after click")
-                    return True
-                time.sleep(0.5)
+            if self.detector.wait_until_gone(match, timeout=disappear_timeout, threshold=threshold):
+                logger.info(f"✅ Template {template_path.name} disappeared after click")
+                return True
             
             logger.warning(f"⚠️ Template {template_path.name} did not disappear after click")
         
@@ -177,6 +340,8 @@ class GameInteractor:
             bool: True if typing was performed
         """
         logger.info(f"⌨️ Typing: {text}")
+        if self.simulate:
+            return True
         
         try:
             pyautogui.write(text, interval=interval)
@@ -185,21 +350,62 @@ class GameInteractor:
             logger.error(f"❌ Typing failed: {e}")
             return False
     
-    def press_key(self, key, presses=1, interval=0.1):
+    def press_key(self, key, presses=1, interval=None, watch_region=None, expect=None, threshold=0.8):
         """Press a keyboard key
         
+        With a confirming profile, a press can be confirmed by a change in a
+        watch region or by an expected template appearing after the last
+        press, instead of sleeping for the interval. Menus animate on their
+        own, so without either the whole screen would change regardless and
+        the presses keep the interval (or the profile's key interval) instead.
+        Keys may legitimately have no visible effect, so an unconfirmed press
+        is only logged.
+        
         Args:
             key (str): Key to press (e.g., 'enter', 'esc', 'f1')
             presses (int): Number of presses
-            interval (float): Time between presses in seconds
+            interval (float, optional): Time between presses in seconds, or the longest wait
+                                        for a confirmation (default: the profile's)
+            watch_region (tuple, optional): Region expected to change after each press (left, top, width, height)
+            expect (str, optional): Path to a template expected to appear after the last press
+            threshold (float): Confidence threshold for the expected template (0.0-1.0)
             
         Returns:
             bool: True if key press was performed
         """
         logger.info(f"⌨️ Pressing key: {key} ({presses} times)")
+        if self.simulate:
+            return True
         
+        profile = self.profile
+        region = self._watch_region(watch_region)
         try:
-            pyautogui.press(key, presses=presses, interval=interval)
+            if not profile.confirm or (region is None and expect is None):
+                start = time.perf_counter()
+                pyautogui.press(key, presses=presses, interval=profile.key_interval if interval is None else interval)
+                self._record_timing("key", time.perf_counter() - start, True)
+                return True
+            
+            timeout = profile.confirm_timeout if interval is None else interval
+            for press in range(presses):
+                before = self._signature(region) if region is not None else None
+                start = time.perf_counter()
+                pyautogui.press(key)
+                if expect is not None and press == presses - 1:
+                    confirmed = self.detector.wait_for_template(expect, timeout=timeout, check_interval=profile.confirm_interval,
+                                                                threshold=threshold) is not None
+                elif region is not None:
+                    confirmed = self._wait_for_change(region, before, timeout)
+                else:
+                    # Only the last press is confirmed by the expected template
+                    time.sleep(profile.key_interval if interval is None else interval)
+                    continue
+                latency = time.perf_counter() - start
+                self._record_timing("key", latency, confirmed)
+                if confirmed:
+                    logger.info(f"⚡ Key {key} confirmed after {latency * 1000:.0f} ms")
+                else:
+                    logger.info(f"⌨️ No visual change within {timeout:.1f}s of key {key}")
             return True
         except Exception as e:
             logger.error(f"❌ Key press failed: {e}")
@@ -223,7 +429,10 @@ class GameInteractor:
             screenshot_path = Path("results/screenshots") / filename
             screenshot_path.parent.mkdir(parents=True, exist_ok=True)
             
-            pyautogui.screenshot(str(screenshot_path), region=region)
+            # Capture through the detector's backend so both share one capture path
+            frame = self.detector.take_screenshot(region)
+            if not cv2.imwrite(str(screenshot_path), frame):
+                raise IOError(f"could not write {screenshot_path}")
             logger.info(f"📸 Screenshot saved to: {screenshot_path}")
             return str(screenshot_path)
         except Exception as e:
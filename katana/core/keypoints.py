@@ -0,0 +1,261 @@
+"""
+Katana Game Benchmark Automation Framework - Core Keypoints Module
+
+This module provides scale-invariant template detection with ORB keypoint
+descriptors. Descriptors of each asset are computed once; matching them
+against the descriptors of a frame recovers where the asset is and at which
+(per-axis) scale in a single pass, so a HUD or UI scale that differs from
+the reference resolution does not need threshold or scale retries.
+
+The recovered placement is verified with one small normalized correlation
+at the recovered scale, so confidences are comparable to the other matching
+modes. Assets too small or flat to carry enough keypoints are not supported
+and the detector falls back to correlation matching for them.
+"""
+import cv2
+import numpy as np
+import logging
+import threading
+
+logger = logging.getLogger("katana")
+
+def _gray(image):
+    """Convert an image to grayscale if needed"""
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+
+class KeypointSignature:
+    """ORB keypoints and descriptors of one (whole) template asset"""
+    
+    def __init__(self, size, points, descriptors):
+        """Initialize the signature
+        
+        Args:
+            size (tuple): (width, height) of the asset
+            points (numpy.ndarray): (N, 2) float32 keypoint coordinates within the asset
+            descriptors (numpy.ndarray): (N, 32) uint8 ORB descriptors
+        """
+        self.size = size
+        self.points = points
+        self.descriptors = descriptors
+    
+    def __len__(self):
+        return len(self.points)
+    
+    @classmethod
+    def from_image(cls, image, orb, min_keypoints=12, min_size=40):
+        """Compute the signature of an asset
+        
+        Args:
+            image (numpy.ndarray): BGR or grayscale asset pixels
+            orb (cv2.ORB): Feature extractor
+            min_keypoints (int): Smallest number of keypoints of a usable signature
+            min_size (int): Smallest asset width and height that gets a signature
+            
+        Returns:
+            KeypointSignature or None: Signature, or None if the asset is too small or flat
+        """
+        gray = _gray(image)
+        height, width = gray.shape
+        if height < min_size or width < min_size:
+            return None
+        
+        keypoints, descriptors = orb.detectAndCompute(gray, None)
+        if descriptors is None or len(keypoints) < min_keypoints:
+            return None
+        points = np.array([keypoint.pt for keypoint in keypoints], dtype=np.float32)
+        return cls((width, height), points, descriptors)
+
+
+class KeypointMatcher:
+    """Locates templates in frames by keypoint descriptor matching"""
+    
+    def __init__(self, features=500, frame_features=10000, ratio=0.75, min_inliers=8, ransac_threshold=3.0,
+                 scale_range=(0.25, 4.0), max_shear=0.05):
+        """Initialize the keypoint matcher
+        
+        Args:
+            features (int): Maximum keypoints per asset
+            frame_features (int): Maximum keypoints per frame
+            ratio (float): Lowe ratio test threshold for descriptor matches
+            min_inliers (int): Smallest number of geometrically consistent matches of a placement
+            ransac_threshold (float): Largest reprojection error (in pixels) of an inlier
+            scale_range (tuple): Smallest and largest accepted scale relative to the template
+            max_shear (float): Largest rotation or shear term, relative to the scale, of a placement
+        """
+        self.features = features
+        self.frame_features = frame_features
+        self.ratio = ratio
+        self.min_inliers = min_inliers
+        self.ransac_threshold = ransac_threshold
+        self.scale_range = scale_range
+        self.max_shear = max_shear
+        self.unsupported = 0
+        self.locates = 0
+        self.placements = 0
+        self._signatures = {}
+        self._frame = None
+        self._lock = threading.Lock()
+        self._frame_lock = threading.Lock()
+        self._matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+    
+    def signature(self, template):
+        """Get the keypoint signature of a template's whole asset, computing it once
+        
+        Args:
+            template (Template): Template whose source asset is described
+            
+        Returns:
+            KeypointSignature or None: Signature, or None if the asset is not supported
+        """
+        key = (str(template.path), template.scale)
+        with self._lock:
+            if key in self._signatures:
+                return self._signatures[key]
+        
+        # Cropped templates only hold a part of the asset; describe the whole asset
+        if template.cropped:
+            image = cv2.imread(str(template.path), cv2.IMREAD_GRAYSCALE)
+            if image is not None and template.scale != (1.0, 1.0):
+                interpolation = cv2.INTER_AREA if template.scale[0] < 1.0 else cv2.INTER_LINEAR
+                image = cv2.resize(image, template.full_size, interpolation=interpolation)
+        else:
+            image = template.image
+        
+        signature = None
+        if image is not None:
+            signature = KeypointSignature.from_image(image, cv2.ORB_create(nfeatures=self.features))
+        
+        with self._lock:
+            self._signatures[key] = signature
+        return signature
+    
+    def supports(self, template):
+        """Check whether a template can be located by keypoints
+        
+        Args:
+            template (Template): Template to check
+            
+        Returns:
+            bool: True if the asset has a usable signature
+        """
+        supported = self.signature(template) is not None
+        if not supported:
+            with self._lock:
+                self.unsupported += 1
+        return supported
+    
+    def _frame_features(self, screen):
+        """Get the keypoints of a frame, reusing them for every template scored on it"""
+        with self._frame_lock:
+            # Capture backends reuse their output buffers, so the same array can hold a newer
+            # frame; compare the pixels against a private copy instead of the array identity
+            if self._frame is not None and self._frame[0].shape == screen.shape and \
+                    np.array_equal(self._frame[0], screen):
+                return self._frame[1], self._frame[2]
+            orb = cv2.ORB_create(nfeatures=self.frame_features)
+            keypoints, descriptors = orb.detectAndCompute(_gray(screen), None)
+            points = np.array([keypoint.pt for keypoint in keypoints], dtype=np.float32)
+            self._frame = (screen.copy(), points, descriptors)
+            return points, descriptors
+    
+    def locate(self, screen, template):
+        """Locate a template in a frame
+        
+        Args:
+            screen (numpy.ndarray): Frame to search in
+            template (Template): Template to locate (see supports)
+            
+        Returns:
+            tuple or None: (confidence, (left, top, width, height)) of the whole asset in the frame,
+                or None if no consistent placement was found
+        """
+        with self._lock:
+            self.locates += 1
+        signature = self.signature(template)
+        frame_points, frame_descriptors = self._frame_features(screen)
+        if frame_descriptors is None or len(frame_points) < self.min_inliers:
+            return None
+        
+        # Keep only distinctive descriptor matches (Lowe ratio test)
+        source, target = [], []
+        for pair in self._matcher.knnMatch(signature.descriptors, frame_descriptors, k=2):
+            if len(pair) == 2 and pair[0].distance < self.ratio * pair[1].distance:
+                source.append(signature.points[pair[0].queryIdx])
+                target.append(frame_points[pair[0].trainIdx])
+        if len(source) < self.min_inliers:
+            return None
+        
+        # Geometrically consistent matches; UI elements are scaled but never rotated or sheared
+        source, target = np.array(source), np.array(target)
+        transform, inliers = cv2.estimateAffine2D(source, target, method=cv2.RANSAC,
+                                                  ransacReprojThreshold=self.ransac_threshold)
+        if transform is None or int(inliers.sum()) < self.min_inliers:
+            return None
+        if abs(transform[0, 1]) > self.max_shear * transform[1, 1] or abs(transform[1, 0]) > self.max_shear * transform[0, 0]:
+            return None
+        
+        # Refit per-axis scale and offset of the asset on the inliers
+        inliers = inliers.ravel().astype(bool)
+        scale_x, offset_x = np.polyfit(source[inliers, 0], target[inliers, 0], 1)
+        scale_y, offset_y = np.polyfit(source[inliers, 1], target[inliers, 1], 1)
+        if not all(self.scale_range[0] <= scale <= self.scale_range[1] for scale in (scale_x, scale_y)):
+            return None
+        
+        confidence, position = self._verify(screen, template, (offset_x, offset_y), (scale_x, scale_y))
+        if position is None:
+            return None
+        with self._lock:
+            self.placements += 1
+        width = int(round(template.full_size[0] * scale_x))
+        height = int(round(template.full_size[1] * scale_y))
+        return confidence, (position[0], position[1], width, height)
+    
+    def _verify(self, screen, template, offset, scale, pad=6):
+        """Correlate the template at a recovered placement
+        
+        Args:
+            screen (numpy.ndarray): Frame to search in
+            template (Template): Located template
+            offset (tuple): Recovered (x, y) of the asset's top-left corner
+            scale (tuple): Recovered (scale_x, scale_y) of the asset
+            pad (int): Pixels searched around the recovered placement
+            
+        Returns:
+            tuple: (confidence, (left, top) of the whole asset), or (0.0, None) if it does not fit the frame
+        """
+        width = max(1, int(round(template.size[0] * scale[0])))
+        height = max(1, int(round(template.size[1] * scale[1])))
+        interpolation = cv2.INTER_AREA if scale[0] < 1.0 else cv2.INTER_LINEAR
+        pixels = cv2.resize(template.image, (width, height), interpolation=interpolation)
+        
+        # Cropped templates sit at their (scaled) origin within the asset
+        origin_x = int(round(template.origin[0] * scale[0]))
+        origin_y = int(round(template.origin[1] * scale[1]))
+        left = int(round(offset[0])) + origin_x - pad
+        top = int(round(offset[1])) + origin_y - pad
+        right, bottom = left + width + 2 * pad, top + height + 2 * pad
+        left, top = max(0, left), max(0, top)
+        right, bottom = min(screen.shape[1], right), min(screen.shape[0], bottom)
+        if right - left < width or bottom - top < height:
+            return 0.0, None
+        
+        window = screen[top:bottom, left:right]
+        if pixels.ndim != window.ndim:
+            pixels = _gray(pixels) if window.ndim == 2 else cv2.cvtColor(pixels, cv2.COLOR_GRAY2BGR)
+        result = cv2.matchTemplate(window, pixels, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        return max_val, (left + max_loc[0] - origin_x, top + max_loc[1] - origin_y)
+    
+    def stats(self):
+        """Get keypoint matching statistics
+        
+        Returns:
+            dict: Locate calls, placements found and lookups of unsupported templates
+        """
+        with self._lock:
+            return {
+                "locates": self.locates,
+                "placements": self.placements,
+                "unsupported": self.unsupported,
+            }
\ No newline at end of file
@@ -0,0 +1,275 @@
+"""
+Katana Game Benchmark Automation Framework - Core Launch Module
+
+This module tracks a game launch until the game is interactive instead of
+sleeping for a fixed time. It polls for the game process, then for its
+window, then for the first stable rendered frame (not blank and no longer
+changing beyond animation noise), optionally followed by a game-specific
+readiness check, all under one hard timeout.
+
+Every launch is appended to a history file with the latency of each stage.
+A launch is cold when it is the first recorded launch since the machine
+booted and warm otherwise, so cold and warm start times can be tracked
+separately.
+"""
+import json
+import time
+import logging
+import numpy as np
+import psutil
+from pathlib import Path
+
+logger = logging.getLogger("katana")
+
+# Launch stages, in the order they are waited for
+STAGE_PROCESS = "process"
+STAGE_WINDOW = "window"
+STAGE_FRAME = "frame"
+STAGE_READY = "ready"
+
+class LaunchRecord:
+    """Latencies of one tracked launch"""
+    
+    def __init__(self, process_name, cold):
+        """Initialize the record
+        
+        Args:
+            process_name (str): Tracked process name
+            cold (bool): Whether this is the first launch since boot
+        """
+        self.process_name = process_name
+        self.cold = cold
+        self.started = time.time()
+        self.stages = {}
+        self.failed_stage = None
+        self.already_running = False
+    
+    @property
+    def ready(self):
+        """bool: True if every stage completed"""
+        return self.failed_stage is None
+    
+    @property
+    def latency(self):
+        """float: Seconds from the launch to the last completed stage"""
+        return max(self.stages.values(), default=0.0)
+    
+    def to_dict(self):
+        """Convert the record to a JSON-serializable dict"""
+        return {
+            "process_name": self.process_name,
+            "timestamp": self.started,
+            "start": "cold" if self.cold else "warm",
+            "already_running": self.already_running,
+            "ready": self.ready,
+            "failed_stage": self.failed_stage,
+            "latency": round(self.latency, 3),
+            "stages": {stage: round(elapsed, 3) for stage, elapsed in self.stages.items()},
+        }
+
+
+class LaunchTracker:
+    """Waits for a launched game to become interactive"""
+    
+    def __init__(self, process_name, window=None, detector=None, timeout=180, check_interval=0.5,
+                 stable_frames=3, max_motion=3.0, min_contrast=8.0, ready_check=None, history_path=None):
+        """Initialize the launch tracker
+        
+        Args:
+            process_name (str): Executable name of the game (e.g. 'cs2.exe')
+            window (GameWindow, optional): Game window session, the window stage is skipped without one
+            detector (ImageDetector, optional): Detector whose capture backend grabs frames, the frame
+                stage is skipped without one
+            timeout (float): Hard upper limit of the whole launch in seconds
+            check_interval (float): Time between checks in seconds
+            stable_frames (int): Consecutive captures without large changes that make a frame stable
+            max_motion (float): Largest mean intensity change between stable captures
+            min_contrast (float): Smallest intensity standard deviation of a rendered (not blank) frame
+            ready_check (callable, optional): Called without arguments once the frame is stable,
+                True when the game is interactive
+            history_path (Path, optional): JSON lines file launches are appended to
+        """
+        self.process_name = process_name
+        self.window = window
+        self.detector = detector
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.stable_frames = stable_frames
+        self.max_motion = max_motion
+        self.min_contrast = min_contrast
+        self.ready_check = ready_check
+        self.history_path = Path(history_path) if history_path else None
+        self.history = self._load_history()
+    
+    def _load_history(self):
+        """Load the recorded launches"""
+        if not self.history_path or not self.history_path.is_file():
+            return []
+        try:
+            with open(self.history_path, "r") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load launch history from {self.history_path}: {e}")
+            return []
+    
+    def _save(self, record):
+        """Append a launch to the history"""
+        entry = record.to_dict()
+        self.history.append(entry)
+        if not self.history_path:
+            return
+        try:
+            self.history_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.history_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to save launch history to {self.history_path}: {e}")
+    
+    def find_process(self):
+        """Find the running game process
+        
+        Returns:
+            psutil.Process or None: First process with the tracked name
+        """
+        name = self.process_name.lower()
+        for process in psutil.process_iter(["name"]):
+            if (process.info.get("name") or "").lower() == name:
+                return process
+        return None
+    
+    def is_running(self):
+        """Check whether the game process is running
+        
+        Returns:
+            bool: True if the process exists
+        """
+        return self.find_process() is not None
+    
+    def terminate(self, grace=10, timeout=10):
+        """Make sure the game process has exited, terminating (and finally killing) it if needed
+        
+        Args:
+            grace (float): Seconds the process gets to exit by itself (e.g. after its exit menu)
+            timeout (float): Seconds to wait for the process to exit after terminating it
+            
+        Returns:
+            bool: True if the game process is no longer running
+        """
+        process = self.find_process()
+        if process is None:
+            return True
+        
+        try:
+            process.wait(grace)
+            return True
+        except psutil.TimeoutExpired:
+            pass
+        except psutil.NoSuchProcess:
+            return True
+        
+        logger.warning(f"⚠️ {self.process_name} still running, terminating it")
+        try:
+            process.terminate()
+            try:
+                process.wait(timeout)
+            except psutil.TimeoutExpired:
+                logger.warning(f"⚠️ {self.process_name} did not exit, killing it")
+                process.kill()
+                process.wait(timeout)
+        except psutil.NoSuchProcess:
+            pass
+        except Exception as e:
+            logger.error(f"❌ Failed to terminate {self.process_name}: {e}")
+            return False
+        return not self.is_running()
+    
+    def is_cold_start(self):
+        """Check whether a launch now would be the first since boot
+        
+        Returns:
+            bool: True if no launch of the process was recorded since the machine booted
+        """
+        boot_time = psutil.boot_time()
+        return not any(entry.get("process_name") == self.process_name and entry.get("timestamp", 0) > boot_time
+                       for entry in self.history)
+    
+    def _poll(self, check, deadline):
+        """Poll a check until it succeeds or the deadline passes"""
+        while True:
+            if check():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.check_interval)
+    
+    def _frame_stable(self, state):
+        """Capture the window and check whether it shows a stable rendered frame"""
+        region = None
+        if self.window is not None and self.detector.window is not self.window:
+            region = self.window.region
+        frame = self.detector.capture.grab(region)
+        signature = self.detector.change_detector.signature(frame)
+        
+        previous = state.get("signature")
+        state["signature"] = signature
+        if float(np.std(signature)) < self.min_contrast:
+            state["stable"] = 0
+        elif previous is not None and previous.shape == signature.shape and \
+                float(np.mean(np.abs(signature - previous))) <= self.max_motion:
+            state["stable"] = state.get("stable", 0) + 1
+        else:
+            state["stable"] = 0
+        return state["stable"] >= self.stable_frames
+    
+    def wait_until_interactive(self, launched_at=None):
+        """Wait for the process, its window, a stable frame and the readiness check in turn
+        
+        Args:
+            launched_at (float, optional): time.monotonic() of the launch request (default: now)
+            
+        Returns:
+            LaunchRecord: Latency of every completed stage; record.ready is False on timeout
+        """
+        launched_at = launched_at if launched_at is not None else time.monotonic()
+        deadline = launched_at + self.timeout
+        record = LaunchRecord(self.process_name, self.is_cold_start())
+        record.already_running = self.is_running()
+        
+        stages = [(STAGE_PROCESS, self.is_running)]
+        if self.window is not None:
+            stages.append((STAGE_WINDOW, lambda: self.window.region is not None))
+        if self.detector is not None:
+            state = {}
+            stages.append((STAGE_FRAME, lambda: self._frame_stable(state)))
+        if self.ready_check is not None:
+            stages.append((STAGE_READY, self.ready_check))
+        
+        for stage, check in stages:
+            if not self._poll(check, deadline):
+                record.failed_stage = stage
+                logger.error(f"❌ {self.process_name} not past the {stage} stage within {self.timeout}s")
+                break
+            record.stages[stage] = time.monotonic() - launched_at
+            logger.info(f"🚀 {self.process_name} {stage} stage reached after {record.stages[stage]:.1f}s")
+        
+        if record.ready:
+            logger.info(f"✅ {self.process_name} interactive after {record.latency:.1f}s "
+                        f"({'cold' if record.cold else 'warm'} start)")
+        self._save(record)
+        return record
+    
+    def stats(self):
+        """Summarize the recorded launch latencies
+        
+        Returns:
+            dict: 'cold'/'warm' -> count and average/maximum latency in seconds of ready launches
+        """
+        latencies = {}
+        for entry in self.history:
+            if entry.get("process_name") == self.process_name and entry.get("ready") \
+                    and not entry.get("already_running"):
+                latencies.setdefault(entry["start"], []).append(entry["latency"])
+        return {
+            start: {"count": len(values), "avg_s": sum(values) / len(values), "max_s": max(values)}
+            for start, values in latencies.items()
+        }
\ No newline at end of file
@@ -0,0 +1,398 @@
+"""
+Katana Game Benchmark Automation Framework - Core Navigation Module
+
+This module runs declared navigation graphs. A game describes its screens
+(what is visible on each one), the transitions between them and the action
+that performs each transition; the navigator detects the current screen,
+plans the shortest path to a target screen and, after every action, waits
+only until the next screen is visually confirmed instead of sleeping for a
+fixed time. When a transition lands somewhere unexpected, the navigator
+re-plans from the screen it actually reached.
+
+Example:
+    graph = NavigationGraph()
+    graph.add_screen("main_menu", templates=["play_tab.png"])
+    graph.add_screen("play_menu", templates=["workshop_tab.png"])
+    graph.add_transition("main_menu", "play_menu", click("play_tab.png"))
+    Navigator(graph, detector, interactor).navigate("play_menu")
+"""
+import time
+import logging
+from collections import deque
+
+logger = logging.getLogger("katana")
+
+def click(template_path, retries=3, threshold=0.8):
+    """Action that clicks a template
+    
+    Args:
+        template_path (str): Template to click
+        retries (int): Retries if the template is not found
+        threshold (float): Confidence threshold (0.0-1.0)
+        
+    Returns:
+        callable: Action taking the navigator and returning True on success
+    """
+    def action(navigator):
+        return navigator.interactor.click_template_with_retry(template_path, max_retries=retries, threshold=threshold)
+    action.description = f"click {template_path}"
+    return action
+
+
+def press(key, presses=1, interval=0.1, watch_region=None, expect=None):
+    """Action that presses a key
+    
+    Args:
+        key (str): Key to press
+        presses (int): Number of presses
+        interval (float): Time between presses in seconds
+        watch_region (tuple, optional): Region confirming each press (see GameInteractor.press_key)
+        expect (str, optional): Template confirming the last press
+        
+    Returns:
+        callable: Action taking the navigator and returning True on success
+    """
+    def action(navigator):
+        return navigator.interactor.press_key(key, presses=presses, interval=interval, watch_region=watch_region,
+                                              expect=expect)
+    action.description = f"press {key}" + (f" x{presses}" if presses > 1 else "")
+    return action
+
+
+def write(text, interval=0.05):
+    """Action that types text
+    
+    Args:
+        text (str): Text to type
+        interval (float): Time between keypresses in seconds
+        
+    Returns:
+        callable: Action taking the navigator and returning True on success
+    """
+    def action(navigator):
+        return navigator.interactor.type_text(text, interval=interval)
+    action.description = f"type '{text}'"
+    return action
+
+
+def sequence(*actions):
+    """Action that runs several actions in order, stopping at the first failure
+    
+    Args:
+        *actions: Actions to run
+        
+    Returns:
+        callable: Action taking the navigator and returning True if every action succeeded
+    """
+    def action(navigator):
+        return all(step(navigator) for step in actions)
+    action.description = ", then ".join(getattr(step, "description", step.__name__) for step in actions)
+    return action
+
+
+class Screen:
+    """A screen of a navigation graph and the visual condition confirming it"""
+    
+    def __init__(self, name, templates=(), absent=(), state=None, threshold=0.8):
+        """Initialize the screen
+        
+        Args:
+            name (str): Screen name
+            templates (list): Templates of which at least one is visible on the screen
+            absent (list): Templates none of which is visible on the screen
+            state (str, optional): Name of the screen in a ScreenStateIndex
+            threshold (float): Confidence threshold of the templates (0.0-1.0)
+        """
+        self.name = name
+        self.templates = list(templates)
+        self.absent = list(absent)
+        self.state = state
+        self.threshold = threshold
+    
+    def is_shown(self, visible):
+        """Check the screen's condition against the templates visible in a frame
+        
+        Args:
+            visible (set): Names of the templates visible in the frame
+            
+        Returns:
+            bool: True if the frame shows this screen
+        """
+        if self.templates and not visible.intersection(self.templates):
+            return False
+        return not visible.intersection(self.absent)
+
+
+class Transition:
+    """A declared move from one screen to another"""
+    
+    def __init__(self, source, target, action, timeout=20, check_interval=0.5):
+        """Initialize the transition
+        
+        Args:
+            source (str): Screen the action is performed on
+            target (str): Screen the action leads to
+            action (callable): Action taking the navigator and returning True on success
+            timeout (float): Seconds to wait for the target screen after the action
+            check_interval (float): Time between checks for the target screen in seconds
+        """
+        self.source = source
+        self.target = target
+        self.action = action
+        self.timeout = timeout
+        self.check_interval = check_interval
+    
+    @property
+    def description(self):
+        """str: Human-readable description of the action"""
+        return getattr(self.action, "description", getattr(self.action, "__name__", "action"))
+
+
+class NavigationGraph:
+    """Screens and transitions of a game's menus"""
+    
+    def __init__(self, reset_action=None):
+        """Initialize the graph
+        
+        Args:
+            reset_action (callable, optional): Action that brings an unrecognized screen to a known one
+                (e.g. closing dialogs)
+        """
+        self.screens = {}
+        self.transitions = {}
+        self.reset_action = reset_action
+    
+    def add_screen(self, name, templates=(), absent=(), state=None, threshold=0.8):
+        """Declare a screen (see Screen)
+        
+        Returns:
+            Screen: The declared screen
+        """
+        screen = Screen(name, templates, absent, state, threshold)
+        self.screens[name] = screen
+        self.transitions.setdefault(name, [])
+        return screen
+    
+    def add_transition(self, source, target, action, timeout=20, check_interval=0.5):
+        """Declare a transition between two declared screens (see Transition)
+        
+        Returns:
+            Transition: The declared transition
+        """
+        for name in (source, target):
+            if name not in self.screens:
+                raise ValueError(f"Unknown screen '{name}'")
+        transition = Transition(source, target, action, timeout, check_interval)
+        self.transitions[source].append(transition)
+        return transition
+    
+    def shortest_path(self, source, target):
+        """Find the transitions leading from one screen to another
+        
+        Args:
+            source (str): Current screen
+            target (str): Target screen
+            
+        Returns:
+            list or None: Transitions in order (empty if already there), or None if the target is unreachable
+        """
+        previous = {source: None}
+        queue = deque([source])
+        while queue:
+            name = queue.popleft()
+            if name == target:
+                path = []
+                while previous[name] is not None:
+                    path.append(previous[name])
+                    name = previous[name].source
+                return path[::-1]
+            for transition in self.transitions.get(name, []):
+                if transition.target not in previous:
+                    previous[transition.target] = transition
+                    queue.append(transition.target)
+        return None
+
+
+class Navigator:
+    """Drives a game through a navigation graph"""
+    
+    def __init__(self, graph, detector, interactor, state_index=None, max_replans=2):
+        """Initialize the navigator
+        
+        Args:
+            graph (NavigationGraph): Declared screens and transitions
+            detector (ImageDetector): Detector used to confirm screens
+            interactor (GameInteractor): Interactor used by the actions
+            state_index (ScreenStateIndex, optional): Whole-screen classifier tried before templates
+            max_replans (int): Times a navigation may re-plan after landing on an unexpected screen
+        """
+        self.graph = graph
+        self.detector = detector
+        self.interactor = interactor
+        self.state_index = state_index
+        self.max_replans = max_replans
+    
+    def _visible(self, frame, screens, polling=False):
+        """Get the names of the screens' templates visible in a frame
+        
+        Returns:
+            tuple: (visible, unsettled) name sets, unsettled templates were only searched
+                   in their hinted window while polling (see ImageDetector._locate)
+        """
+        templates = []
+        for screen in screens:
+            templates.extend(name for name in screen.templates + screen.absent if name not in templates)
+        if not templates:
+            return set(), set()
+        thresholds = {name: min(screen.threshold for screen in screens if name in screen.templates + screen.absent)
+                      for name in templates}
+        matches = self.detector.find_templates(frame, templates, threshold=min(thresholds.values()), polling=polling)
+        visible = {match.name for match in matches if match.passes(thresholds[match.name])}
+        unsettled = {match.name for match in matches if not match.complete}
+        return visible, unsettled
+    
+    def _shown(self, screen, visible, unsettled):
+        """Check a screen against the visible templates, allowing for unsettled ones
+        
+        Returns:
+            bool or None: Whether the screen is shown, None if that depends on an unsettled template
+        """
+        if screen.is_shown(visible) and not unsettled.intersection(screen.absent):
+            return True
+        if unsettled and screen.is_shown(visible | unsettled.intersection(screen.templates)):
+            return None
+        return False
+    
+    def _classify(self, frame, polling=False):
+        """Recognize the screen a frame shows, whole-screen states first
+        
+        Returns:
+            tuple: (name or None, settled) where settled is False if an unsettled template
+                   kept an earlier screen from being ruled out
+        """
+        if self.state_index is not None and len(self.state_index):
+            state, _ = self.state_index.classify(frame)
+            for screen in self.graph.screens.values():
+                if state is not None and screen.state == state:
+                    return screen.name, True
+        
+        # Screens are tried in declaration order; screens without templates are never recognized on their own
+        screens = [screen for screen in self.graph.screens.values() if screen.templates]
+        if not screens:
+            return None, True
+        visible, unsettled = self._visible(frame, screens, polling)
+        for screen in screens:
+            shown = self._shown(screen, visible, unsettled)
+            if shown is None:
+                return None, False
+            if shown:
+                return screen.name, True
+        return None, True
+    
+    def detect(self, timeout=0, check_interval=0.5):
+        """Detect the current screen
+        
+        Args:
+            timeout (float): Seconds to keep trying while no declared screen is recognized
+            check_interval (float): Time between attempts in seconds
+            
+        Returns:
+            str or None: Name of the current screen, or None if it was not recognized
+        """
+        deadline = time.time() + timeout
+        last_signature = None
+        while True:
+            frame = self.detector.take_screenshot()
+            signature = self.detector.change_detector.signature(frame)
+            if self.detector.change_detector.has_changed(last_signature, signature):
+                last_signature = signature
+                # A single attempt searches every template in full
+                name, settled = self._classify(frame, polling=timeout > 0)
+                if name is not None:
+                    logger.info(f"🧭 Current screen: {name}")
+                    return name
+                if not settled:
+                    last_signature = None
+            if time.time() >= deadline:
+                return None
+            time.sleep(check_interval)
+    
+    def wait_for_screen(self, name, timeout=20, check_interval=0.5):
+        """Wait until a screen is visually confirmed
+        
+        Args:
+            name (str): Screen name
+            timeout (float): Maximum time to wait in seconds
+            check_interval (float): Time between checks in seconds
+            
+        Returns:
+            bool: True if the screen was confirmed within the timeout
+        """
+        screen = self.graph.screens[name]
+        start_time = time.time()
+        last_signature = None
+        while True:
+            frame = self.detector.take_screenshot()
+            signature = self.detector.change_detector.signature(frame)
+            if self.detector.change_detector.has_changed(last_signature, signature):
+                last_signature = signature
+                shown = self._shown(screen, *self._visible(frame, [screen], polling=True))
+                if shown:
+                    logger.info(f"✅ Screen {name} confirmed after {time.time() - start_time:.1f}s")
+                    return True
+                if shown is None:
+                    last_signature = None
+            else:
+                self.detector.change_detector.record_skip()
+            if time.time() - start_time >= timeout:
+                logger.warning(f"⌛ Screen {name} not confirmed within {timeout}s")
+                return False
+            time.sleep(check_interval)
+    
+    def navigate(self, target, start=None, detect_timeout=0):
+        """Navigate to a screen along the shortest declared path
+        
+        Args:
+            target (str): Target screen
+            start (str, optional): Screen assumed if the current one is not recognized
+            detect_timeout (float): Seconds to keep trying to recognize the current screen
+            
+        Returns:
+            bool: True if the target screen was reached and confirmed
+        """
+        current = self.detect(timeout=detect_timeout)
+        if current is None and self.graph.reset_action is not None:
+            logger.info("🔄 Screen not recognized, resetting")
+            self.graph.reset_action(self)
+            current = self.detect(timeout=detect_timeout)
+        if current is None:
+            current = start
+        if current is None:
+            logger.error(f"❌ Current screen not recognized, cannot navigate to {target}")
+            return False
+        
+        replans = 0
+        while current != target:
+            path = self.graph.shortest_path(current, target)
+            if path is None:
+                logger.error(f"❌ No path from {current} to {target}")
+                return False
+            logger.info(f"🧭 Route to {target}: {' -> '.join([current] + [t.target for t in path])}")
+            
+            for transition in path:
+                logger.info(f"🧭 {transition.source} -> {transition.target}: {transition.description}")
+                if transition.action(self) and self.wait_for_screen(transition.target, transition.timeout,
+                                                                    transition.check_interval):
+                    current = transition.target
+                    continue
+                
+                # Landed somewhere unexpected; re-plan from wherever the game actually is
+                current = self.detect()
+                if current is None or replans >= self.max_replans:
+                    logger.error(f"❌ Transition {transition.source} -> {transition.target} failed")
+                    return False
+                replans += 1
+                logger.warning(f"⚠️ Expected {transition.target} but found {current}, re-planning")
+                break
+        
+        return True
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+Katana Game Benchmark Automation Framework - Core Phases Module
+
+This module runs a benchmark run as a pipeline of phases. Each phase
+declares its success condition, how often it is retried and which recovery
+action (e.g. closing dialogs and re-detecting the screen, or relaunching the
+game) runs before a retry. A phase that fails for good aborts the run right
+away instead of letting the following phases run into their own timeouts;
+only cleanup phases (e.g. closing the game) still run after an abort, like a
+finally block. Wall time, attempts and outcome of every phase are recorded.
+
+Example:
+    pipeline = PhasePipeline([
+        Phase("launch", benchmark.launch),
+        Phase("ready", benchmark.wait_until_ready, retries=1, recovery=benchmark.relaunch),
+        Phase("teardown", benchmark.teardown, required=False, cleanup=True),
+    ])
+    if not pipeline.run():
+        logger.error(pipeline.failed_phase)
+"""
+import time
+import logging
+
+logger = logging.getLogger("katana")
+
+# Phase outcomes
+PHASE_OK = "ok"  # Succeeded on the first attempt
+PHASE_RECOVERED = "recovered"  # Succeeded after a retry
+PHASE_FAILED = "failed"  # Failed on every attempt
+PHASE_SKIPPED = "skipped"  # Not run because an earlier required phase failed
+
+def succeeded(value):
+    """Default success condition: the phase returned something other than None or False"""
+    return value is not None and value is not False
+
+
+class Phase:
+    """One step of a benchmark run"""
+    
+    def __init__(self, name, action, retries=0, recovery=None, retry_delay=0, success=succeeded, required=True,
+                 cleanup=False):
+        """Initialize the phase
+        
+        Args:
+            name (str): Phase name
+            action (callable): Called without arguments to perform the phase
+            retries (int): Additional attempts after a failed one
+            recovery (callable, optional): Called before every retry, the retries stop unless it succeeds
+            retry_delay (float): Seconds to wait before every retry
+            success (callable): Called with the action's return value, True if the phase succeeded
+            required (bool): Whether a failure aborts the pipeline
+            cleanup (bool): Whether the phase also runs after the pipeline was aborted
+        """
+        self.name = name
+        self.action = action
+        self.retries = retries
+        self.recovery = recovery
+        self.retry_delay = retry_delay
+        self.success = success
+        self.required = required
+        self.cleanup = cleanup
+
+
+class PhaseRecord:
+    """Outcome of one phase of a pipeline run"""
+    
+    def __init__(self, name):
+        """Initialize the record
+        
+        Args:
+            name (str): Phase name
+        """
+        self.name = name
+        self.outcome = PHASE_SKIPPED
+        self.attempts = 0
+        self.duration = 0.0
+        self.error = None
+        self.value = None
+    
+    def to_dict(self):
+        """Convert the record to a JSON-serializable dict"""
+        return {
+            "name": self.name,
+            "outcome": self.outcome,
+            "attempts": self.attempts,
+            "duration": round(self.duration, 3),
+            "error": self.error,
+        }
+
+
+class PhasePipeline:
+    """Runs phases in order; after the first required phase that fails, only cleanup phases run"""
+    
+    def __init__(self, phases):
+        """Initialize the pipeline
+        
+        Args:
+            phases (list): Phases in execution order
+        """
+        self.phases = list(phases)
+        self.records = [PhaseRecord(phase.name) for phase in self.phases]
+    
+    @property
+    def failed_phase(self):
+        """str or None: Name of the required phase that aborted the pipeline"""
+        for phase, record in zip(self.phases, self.records):
+            if phase.required and record.outcome == PHASE_FAILED:
+                return phase.name
+        return None
+    
+    def value(self, name):
+        """Get the return value of a phase's successful attempt
+        
+        Args:
+            name (str): Phase name
+            
+        Returns:
+            Any: Return value, None if the phase did not succeed
+        """
+        for record in self.records:
+            if record.name == name:
+                return record.value
+        return None
+    
+    def report(self):
+        """Get the records of all phases
+        
+        Returns:
+            list: One dict per phase (see PhaseRecord.to_dict)
+        """
+        return [record.to_dict() for record in self.records]
+    
+    def run(self):
+        """Run the phases
+        
+        Returns:
+            bool: True if every required phase succeeded
+        """
+        aborted = False
+        for phase, record in zip(self.phases, self.records):
+            if aborted and not phase.cleanup:
+                continue
+            
+            start = time.perf_counter()
+            self._run_phase(phase, record)
+            record.duration = time.perf_counter() - start
+            
+            if record.outcome == PHASE_FAILED:
+                logger.error(f"❌ Phase '{phase.name}' failed after {record.attempts} attempt(s) "
+                             f"in {record.duration:.1f}s" + (f": {record.error}" if record.error else ""))
+                aborted = aborted or phase.required
+            else:
+                logger.info(f"✅ Phase '{phase.name}' {record.outcome} in {record.duration:.1f}s")
+        return not aborted
+    
+    def _run_phase(self, phase, record):
+        """Attempt a phase until it succeeds or its retries are used up"""
+        for attempt in range(phase.retries + 1):
+            if attempt > 0:
+                if phase.recovery is not None:
+                    logger.info(f"🔄 Recovering before retry {attempt}/{phase.retries} of phase '{phase.name}'")
+                    if not self._call(phase.recovery, record):
+                        logger.warning(f"⚠️ Recovery for phase '{phase.name}' failed")
+                        break
+                if phase.retry_delay:
+                    time.sleep(phase.retry_delay)
+            
+            record.attempts += 1
+            try:
+                value = phase.action()
+            except Exception as e:
+                record.error = f"{type(e).__name__}: {e}"
+                logger.error(f"❌ Phase '{phase.name}' raised {record.error}")
+                continue
+            
+            if phase.success(value):
+                record.value = value
+                record.outcome = PHASE_OK if attempt == 0 else PHASE_RECOVERED
+                return
+        
+        record.outcome = PHASE_FAILED
+    
+    @staticmethod
+    def _call(action, record):
+        """Run a recovery action, treating exceptions as failure"""
+        try:
+            return succeeded(action())
+        except Exception as e:
+            record.error = f"{type(e).__name__}: {e}"
+            return False
\ No newline at end of file
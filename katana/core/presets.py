@@ -11,6 +11,45 @@ from abc import ABC, abstractmethod
 
 logger = logging.getLogger("katana")
 
+def find_steam_path():
+    """Find the Steam installation path
+    
+    Returns:
+        Path: Path to the Steam directory, or None if it was not found
+    """
+    try:
+        # Try to get from registry on Windows
+        import os
+        if os.name == 'nt':
+            try:
+                import winreg
+                hkey = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Valve\Steam")
+                steam_path = winreg.QueryValueEx(hkey, "SteamPath")[0]
+                winreg.CloseKey(hkey)
+                return Path(steam_path)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not find Steam path in registry: {e}")
+        
+        # Check common locations
+        common_paths = [
+            Path.home() / ".steam/steam" if hasattr(Path, 'home') else None,  # Linux
+            Path.home() / "Library/Application Support/Steam" if hasattr(Path, 'home') else None,  # macOS
+            Path("C:/Program Files (x86)/Steam"),  # Windows
+            Path("C:/Program Files/Steam"),  # Windows
+            Path("D:/Program Files (x86)/Steam"),  # Windows on D: drive
+            Path("D:/Program Files/Steam")  # Windows on D: drive
+        ]
+        
+        for path in common_paths:
+            if path and path.exists():
+                return path
+        
+        return None
+    except Exception as e:
+        logger.error(f"❌ Error finding Steam path: {e}")
+        return None
+
+
 class PresetManager:
     """Manages graphics presets for games"""
     
@@ -83,6 +122,21 @@ class PresetManager:
             logger.error(f"❌ Failed to load preset data: {e}")
             return {}
     
+    def get_preset_resolution(self, game_id, preset_id):
+        """Get the resolution a preset sets
+        
+        Args:
+            game_id (str): Game identifier
+            preset_id (str): Preset identifier
+            
+        Returns:
+            tuple or None: (width, height), or None if the preset does not set a resolution
+        """
+        preset_data = self.get_preset_data(game_id, preset_id)
+        if "setting.defaultres" in preset_data and "setting.defaultresheight" in preset_data:
+            return int(preset_data["setting.defaultres"]), int(preset_data["setting.defaultresheight"])
+        return None
+    
     def apply_preset(self, game_id, preset_id, backup=True):
         """Apply a preset to a game
         
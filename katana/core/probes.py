@@ -0,0 +1,204 @@
+"""
+Katana Game Benchmark Automation Framework - Core Probes Module
+
+This module provides cheap early-reject checks for template matching. Each
+template carries a signature of high-contrast probe pairs (a brighter and a
+darker point of the smoothed template). Before a small window is correlated,
+the detector checks at every offset how many pairs are still clearly ordered
+the same way; if no offset comes close to agreeing, the template is clearly
+not in the window and the full correlation is skipped.
+
+Comparing brightness order (with a margin relative to the template's own
+contrast) instead of values keeps the check tolerant of the brightness and
+contrast changes TM_CCOEFF_NORMED ignores.
+"""
+import cv2
+import numpy as np
+import logging
+import threading
+
+logger = logging.getLogger("katana")
+
+def smooth_gray(image):
+    """Convert an image to the smoothed grayscale form probes are compared on
+    
+    Args:
+        image (numpy.ndarray): BGR or grayscale image
+        
+    Returns:
+        numpy.ndarray: 3x3 box-filtered grayscale image
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return cv2.blur(image, (3, 3))
+
+
+class ProbeSignature:
+    """High-contrast probe pairs of one template image"""
+    
+    def __init__(self, size, bright, dark, margins):
+        """Initialize the signature
+        
+        Args:
+            size (tuple): (width, height) of the template
+            bright (numpy.ndarray): (y, x) coordinates of the brighter point of each pair
+            dark (numpy.ndarray): (y, x) coordinates of the darker point of each pair
+            margins (numpy.ndarray): Brightness difference each pair must keep to agree
+        """
+        self.size = size
+        self.bright = bright
+        self.dark = dark
+        self.margins = margins
+    
+    def __len__(self):
+        return len(self.bright)
+    
+    @classmethod
+    def from_image(cls, image, pairs=64, min_contrast=24, reach=6, min_size=10, seed=0):
+        """Select probe pairs from a template image
+        
+        The template is split into a grid and the highest-contrast short pair
+        of each cell is kept, so the pairs test independent local edges
+        spread over the whole template instead of one strong edge many times.
+        The outer pixel ring is skipped since smoothing mixes it with whatever
+        surrounds the template on screen.
+        
+        Args:
+            image (numpy.ndarray): BGR or grayscale template pixels
+            pairs (int): Maximum number of probe pairs (one per grid cell)
+            min_contrast (int): Smallest brightness difference of a usable pair
+            reach (int): Largest offset in pixels between the points of a pair
+            min_size (int): Smallest template width and height that gets probes
+            seed (int): Seed of the candidate sampling
+            
+        Returns:
+            ProbeSignature or None: Signature, or None if the template is too small or flat
+        """
+        gray = smooth_gray(image).astype(np.int16)
+        height, width = gray.shape
+        if height < min_size or width < min_size:
+            return None
+        
+        rng = np.random.default_rng(seed)
+        grid = int(np.sqrt(pairs))
+        cell_height, cell_width = (height - 2) / grid, (width - 2) / grid
+        
+        chosen = []
+        for row in range(grid):
+            for col in range(grid):
+                top, left = 1 + int(row * cell_height), 1 + int(col * cell_width)
+                bottom = max(top + 1, 1 + int((row + 1) * cell_height))
+                right = max(left + 1, 1 + int((col + 1) * cell_width))
+                
+                first = np.stack([rng.integers(top, bottom, 32), rng.integers(left, right, 32)], axis=1)
+                offset = rng.integers(-reach, reach + 1, size=(32, 2))
+                second = np.clip(first + offset, 1, (height - 2, width - 2))
+                contrast = gray[first[:, 0], first[:, 1]] - gray[second[:, 0], second[:, 1]]
+                
+                best = int(np.abs(contrast).argmax())
+                if abs(contrast[best]) >= min_contrast:
+                    chosen.append((abs(contrast[best]), first[best], second[best], contrast[best] < 0))
+        
+        if len(chosen) < pairs // 4:
+            return None
+        
+        # Orient every pair so the first point is the brighter one
+        bright = np.array([b if swap else a for _, a, b, swap in chosen])
+        dark = np.array([a if swap else b for _, a, b, swap in chosen])
+        # A pair agrees when a quarter of its contrast survives (tolerates dimming and rescaling)
+        margins = np.array([max(6, contrast // 4) for contrast, _, _, _ in chosen], dtype=np.int16)
+        return cls((width, height), bright, dark, margins)
+    
+    def best_agreement(self, window):
+        """Find the best fraction of agreeing pairs over all offsets
+        
+        Args:
+            window (numpy.ndarray): Smoothed grayscale window (see smooth_gray)
+            
+        Returns:
+            tuple: (agreement, (x, y)) with the best fraction (0.0-1.0) and its offset, or (None, None)
+                if the template does not fit the window
+        """
+        out_height = window.shape[0] - self.size[1] + 1
+        out_width = window.shape[1] - self.size[0] + 1
+        if out_height <= 0 or out_width <= 0:
+            return None, None
+        
+        window = window.astype(np.int16)
+        votes = np.zeros((out_height, out_width), dtype=np.uint8)
+        for (by, bx), (dy, dx), margin in zip(self.bright, self.dark, self.margins):
+            difference = window[by:by + out_height, bx:bx + out_width] - window[dy:dy + out_height, dx:dx + out_width]
+            votes += difference >= margin
+        
+        best = np.unravel_index(int(votes.argmax()), votes.shape)
+        return float(votes[best]) / len(self), (int(best[1]), int(best[0]))
+
+
+class ProbeFilter:
+    """Early-reject policy and counters for probe checks"""
+    
+    def __init__(self, reject_below=0.7, max_offsets=400000):
+        """Initialize the probe filter
+        
+        Args:
+            reject_below (float): Best pair agreement under which a window is rejected
+            max_offsets (int): Largest number of candidate offsets a window may have to be probed
+        """
+        self.reject_below = reject_below
+        self.max_offsets = max_offsets
+        self.checks = 0
+        self.rejects = 0
+        self.skipped_full_searches = 0
+        self._lock = threading.Lock()
+    
+    def applies(self, template, window_shape):
+        """Check whether probing a window is worthwhile
+        
+        Args:
+            template (Template): Template about to be matched
+            window_shape (tuple): Shape of the window it would be matched in
+            
+        Returns:
+            bool: True if the template has probes and the window is small enough
+        """
+        if template.probes is None:
+            return False
+        offsets = (window_shape[0] - template.size[1] + 1) * (window_shape[1] - template.size[0] + 1)
+        return 0 < offsets <= self.max_offsets
+    
+    def rejects_window(self, template, window):
+        """Run the probe check of a template against a window
+        
+        Args:
+            template (Template): Template about to be matched
+            window (numpy.ndarray): BGR or grayscale window it would be matched in
+            
+        Returns:
+            bool: True if the template is clearly not in the window
+        """
+        agreement, _ = template.probes.best_agreement(smooth_gray(window))
+        rejected = agreement is not None and agreement < self.reject_below
+        with self._lock:
+            self.checks += 1
+            if rejected:
+                self.rejects += 1
+        return rejected
+    
+    def record_skipped_full_search(self):
+        """Count a full-frame search skipped after a rejected hint window"""
+        with self._lock:
+            self.skipped_full_searches += 1
+    
+    def stats(self):
+        """Get probe statistics
+        
+        Returns:
+            dict: Number of checks, rejected windows (each one a saved correlation) and skipped full searches
+        """
+        with self._lock:
+            return {
+                "checks": self.checks,
+                "rejects": self.rejects,
+                "reject_rate": self.rejects / self.checks if self.checks else 0.0,
+                "skipped_full_searches": self.skipped_full_searches,
+            }
\ No newline at end of file
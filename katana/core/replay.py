@@ -0,0 +1,513 @@
+"""
+Katana Game Benchmark Automation Framework - Core Replay Module
+
+This module records captured frames from a live run to an on-disk archive
+and replays them through the detector, so detection speed and accuracy can be
+measured offline and reproducibly (e.g. on Linux CI machines).
+
+An archive is a directory of PNG frames plus an index.json listing each
+frame's capture timestamp, capture region and optional ground-truth labels
+(the templates visible in that frame).
+
+Usage:
+    python -m katana.core.replay info ARCHIVE
+    python -m katana.core.replay label ARCHIVE --frames 10-42 --templates play_tab.png
+    python -m katana.core.replay evaluate ARCHIVE --game cs2 [--templates ...] [--output report.json]
+    python -m katana.core.replay steps ARCHIVE --game cs2 [--speed 4]
+"""
+import cv2
+import json
+import time
+import queue
+import bisect
+import itertools
+import logging
+import argparse
+import threading
+from pathlib import Path
+
+from .capture import CaptureBackend
+from .change import FrameChangeDetector
+
+logger = logging.getLogger("katana")
+
+# Version of the archive index format
+ARCHIVE_VERSION = 1
+
+class FrameArchive:
+    """On-disk archive of recorded frames and their index"""
+    
+    def __init__(self, archive_dir):
+        """Open (or prepare) an archive
+        
+        Args:
+            archive_dir (Path): Directory holding the frames and index.json
+        """
+        self.archive_dir = Path(archive_dir)
+        self.index_path = self.archive_dir / "index.json"
+        self.screen_size = None
+        self.frames = []
+        self._timestamps = []
+        if self.index_path.is_file():
+            self.load()
+    
+    def load(self):
+        """Load the archive index"""
+        with open(self.index_path, "r") as f:
+            data = json.load(f)
+        if data.get("version") != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported archive version {data.get('version')} in {self.index_path}")
+        self.screen_size = tuple(data["screen_size"]) if data.get("screen_size") else None
+        self.frames = data["frames"]
+        self._timestamps = []
+    
+    def save(self):
+        """Write the archive index"""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, "w") as f:
+            json.dump({
+                "version": ARCHIVE_VERSION,
+                "screen_size": list(self.screen_size) if self.screen_size else None,
+                "frames": self.frames,
+            }, f, indent=1)
+    
+    @property
+    def timestamps(self):
+        """list: Capture timestamps of all frames"""
+        # Frames are only ever appended (while recording), so the cached list is extended, not rebuilt
+        if len(self._timestamps) < len(self.frames):
+            self._timestamps.extend(frame["timestamp"] for frame in self.frames[len(self._timestamps):])
+        return self._timestamps
+    
+    @property
+    def duration(self):
+        """float: Time between the first and last frame in seconds"""
+        return self.frames[-1]["timestamp"] - self.frames[0]["timestamp"] if self.frames else 0.0
+    
+    def read_frame(self, index):
+        """Decode a recorded frame
+        
+        Args:
+            index (int): Frame index
+            
+        Returns:
+            numpy.ndarray: BGR frame
+        """
+        return cv2.imread(str(self.archive_dir / self.frames[index]["file"]), cv2.IMREAD_COLOR)
+    
+    def frame_at(self, timestamp):
+        """Find the frame that was on screen at a given time
+        
+        Args:
+            timestamp (float): Capture timestamp
+            
+        Returns:
+            int: Index of the latest frame captured at or before the timestamp
+        """
+        return max(0, bisect.bisect_right(self.timestamps, timestamp) - 1)
+    
+    def labels_at(self, timestamp):
+        """Get the ground-truth labels of the frame shown at a given time
+        
+        Args:
+            timestamp (float): Capture timestamp
+            
+        Returns:
+            list or None: Names of templates visible in the frame, or None if unlabeled
+        """
+        if not self.frames:
+            return None
+        return self.frames[self.frame_at(timestamp)].get("labels")
+    
+    def set_labels(self, first, last, templates):
+        """Set the ground-truth labels of a range of frames
+        
+        Args:
+            first (int): First frame index (inclusive)
+            last (int): Last frame index (inclusive)
+            templates (list): Names of templates visible in those frames
+        """
+        for frame in self.frames[first:last + 1]:
+            frame["labels"] = sorted(set(frame.get("labels", [])) | set(templates))
+
+
+class RecordingCapture(CaptureBackend):
+    """Capture backend that records every captured frame of another backend
+    
+    Frames are written by a background thread. Frames that did not change
+    since the previous recording of the same region reuse its file, which
+    keeps archives of long waits compact.
+    """
+    
+    name = "recording"
+    
+    def __init__(self, backend, archive_dir, compression=1):
+        """Initialize the recorder
+        
+        Args:
+            backend (CaptureBackend): Backend that performs the actual capture
+            archive_dir (Path): Directory to write the archive to
+            compression (int): PNG compression level (0-9, lower is faster)
+        """
+        super().__init__()
+        self.backend = backend
+        self.archive = FrameArchive(archive_dir)
+        self.archive.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.archive.screen_size = backend.screen_size()
+        self.compression = compression
+        self.change_detector = FrameChangeDetector()
+        self._last = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_frames, name="katana-recorder", daemon=True)
+        self._writer.start()
+        logger.info(f"⏺️ Recording captured frames to {self.archive.archive_dir}")
+    
+    def grab_timestamped(self, region=None, grayscale=False):
+        frame, timestamp = self.backend.grab_timestamped(region, grayscale)
+        if not grayscale:
+            self._record(frame, timestamp, region)
+        return frame, timestamp
+    
+    def _grab(self, region, grayscale):
+        return self.grab_timestamped(region, grayscale)[0]
+    
+    def _record(self, frame, timestamp, region):
+        """Queue a frame for writing, reusing the previous file if unchanged"""
+        key = tuple(region) if region else None
+        signature = self.change_detector.signature(frame)
+        
+        with self._lock:
+            previous = self._last.get(key)
+            if previous is not None and not self.change_detector.has_changed(previous[0], signature):
+                file_name = previous[1]
+            else:
+                file_name = f"frame_{len(self.archive.frames):06d}.png"
+                # The backend may reuse its buffer, so the writer gets its own copy
+                self._queue.put((file_name, frame.copy()))
+                self._last[key] = (signature, file_name)
+            self.archive.frames.append({
+                "file": file_name,
+                "timestamp": timestamp,
+                "region": list(region) if region else None,
+            })
+    
+    def _write_frames(self):
+        """Write queued frames to disk (runs on the writer thread)"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            file_name, frame = item
+            cv2.imwrite(str(self.archive.archive_dir / file_name), frame,
+                        [cv2.IMWRITE_PNG_COMPRESSION, self.compression])
+    
+    def screen_size(self):
+        return self.backend.screen_size()
+    
+    def close(self):
+        """Flush pending frames and write the archive index"""
+        self._queue.put(None)
+        self._writer.join()
+        with self._lock:
+            self.archive.save()
+        logger.info(f"⏹️ Recorded {len(self.archive.frames)} frames to {self.archive.archive_dir}")
+        self.backend.close()
+
+
+class ReplayCapture(CaptureBackend):
+    """Capture backend that plays back a recorded archive
+    
+    With a speed, frames are served according to their original timing
+    (speed 2.0 plays twice as fast). Without a speed, every capture returns
+    the next recorded frame, which is useful for deterministic evaluation.
+    """
+    
+    name = "replay"
+    
+    def __init__(self, archive, speed=1.0, loop=False):
+        """Initialize the replay
+        
+        Args:
+            archive (FrameArchive or Path): Archive to replay
+            speed (float, optional): Playback speed factor, None to step one frame per capture
+            loop (bool): Restart from the first frame after the last one
+        """
+        super().__init__()
+        self.archive = archive if isinstance(archive, FrameArchive) else FrameArchive(archive)
+        if not self.archive.frames:
+            raise ValueError(f"Archive {self.archive.archive_dir} contains no frames")
+        self.speed = speed
+        self.loop = loop
+        self.position = 0
+        self.finished = False
+        self._start = None
+        self._decoded = (None, None)
+        self._lock = threading.Lock()
+    
+    def _next_index(self, region):
+        """Pick the frame to serve for the next capture"""
+        frames = self.archive.frames
+        if self.speed is None:
+            index = self.position
+            self.position += 1
+            if self.loop:
+                index %= len(frames)
+        else:
+            if self._start is None:
+                self._start = time.time()
+            elapsed = (time.time() - self._start) * self.speed
+            if self.loop and self.archive.duration > 0:
+                elapsed %= self.archive.duration
+            index = self.archive.frame_at(frames[0]["timestamp"] + elapsed)
+        
+        self.finished = not self.loop and index >= len(frames) - 1
+        index = min(index, len(frames) - 1)
+        
+        # Serve the latest frame that covers the requested region (full frames cover everything),
+        # or skip ahead to the next one; frames recorded for other regions are never served
+        wanted = list(region) if region else None
+        for candidate in itertools.chain(range(index, -1, -1), range(index + 1, len(frames))):
+            recorded = frames[candidate]["region"]
+            if recorded is None or recorded == wanted:
+                return candidate
+        raise ValueError(f"No frame in {self.archive.archive_dir} covers the region {region}")
+    
+    def grab_timestamped(self, region=None, grayscale=False):
+        start = time.perf_counter()
+        with self._lock:
+            index = self._next_index(region)
+            entry = self.archive.frames[index]
+            if self._decoded[0] != entry["file"]:
+                self._decoded = (entry["file"], self.archive.read_frame(index))
+            frame = self._decoded[1]
+        
+        # Crop full recorded frames to the requested region
+        if region and entry["region"] is None:
+            left, top, width, height = region
+            frame = frame[top:top + height, left:left + width]
+        if grayscale:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+        self.stats.record_frame(time.perf_counter() - start)
+        return frame, entry["timestamp"]
+    
+    def _grab(self, region, grayscale):
+        return self.grab_timestamped(region, grayscale)[0]
+    
+    def screen_size(self):
+        if self.archive.screen_size:
+            return self.archive.screen_size
+        frame = self.archive.read_frame(0)
+        return frame.shape[1], frame.shape[0]
+    
+    def rewind(self):
+        """Restart playback from the first frame"""
+        with self._lock:
+            self.position = 0
+            self.finished = False
+            self._start = None
+
+
+class ReplayReport:
+    """Collects per-template latency, confidence and correctness during a replay"""
+    
+    def __init__(self, archive):
+        """Initialize the report
+        
+        Args:
+            archive (FrameArchive): Archive providing ground-truth labels
+        """
+        self.archive = archive
+        self.templates = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, match, threshold, latency):
+        """Match observer callback (see ImageDetector.add_match_observer)
+        
+        Args:
+            match (MatchResult): Scored match
+            threshold (float or None): Threshold the match was judged against
+            latency (float): Time spent scoring in seconds
+        """
+        labels = self.archive.labels_at(match.timestamp) if match.timestamp is not None else None
+        with self._lock:
+            entry = self.templates.setdefault(match.name, {
+                "latencies": [], "confidences": [], "tp": 0, "fp": 0, "tn": 0, "fn": 0, "unlabeled": 0,
+            })
+            entry["latencies"].append(latency)
+            entry["confidences"].append(match.confidence)
+            
+            if labels is None or threshold is None:
+                entry["unlabeled"] += 1
+                return
+            
+            predicted = match.passes(threshold)
+            actual = match.name in labels
+            outcome = ("tp" if actual else "fp") if predicted else ("fn" if actual else "tn")
+            entry[outcome] += 1
+    
+    def summary(self):
+        """Summarize the collected observations
+        
+        Returns:
+            dict: Per-template statistics (latency in ms, confidence, accuracy)
+        """
+        summary = {}
+        with self._lock:
+            for name, entry in sorted(self.templates.items()):
+                latencies = sorted(entry["latencies"])
+                labeled = entry["tp"] + entry["fp"] + entry["tn"] + entry["fn"]
+                summary[name] = {
+                    "samples": len(latencies),
+                    "latency_p50_ms": 1000 * latencies[len(latencies) // 2],
+                    "latency_max_ms": 1000 * latencies[-1],
+                    "confidence_max": max(entry["confidences"]),
+                    "confidence_mean": sum(entry["confidences"]) / len(entry["confidences"]),
+                    "true_positives": entry["tp"],
+                    "false_positives": entry["fp"],
+                    "true_negatives": entry["tn"],
+                    "false_negatives": entry["fn"],
+                    "unlabeled": entry["unlabeled"],
+                    "accuracy": (entry["tp"] + entry["tn"]) / labeled if labeled else None,
+                }
+        return summary
+    
+    def save(self, output_path):
+        """Write the summary as JSON
+        
+        Args:
+            output_path (Path): File to write
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "w") as f:
+            json.dump({"archive": str(self.archive.archive_dir), "templates": self.summary()}, f, indent=2)
+        logger.info(f"✅ Replay report saved to: {output_path}")
+
+
+def evaluate_archive(detector, archive, templates, threshold=0.8):
+    """Score templates against every recorded frame
+    
+    Args:
+        detector (ImageDetector): Detector to evaluate (its capture backend is replaced)
+        archive (FrameArchive): Archive to replay
+        templates (list): Template paths to score on each frame
+        threshold (float): Confidence threshold
+        
+    Returns:
+        ReplayReport: Collected statistics
+    """
+    replay = ReplayCapture(archive, speed=None)
+    detector.set_capture(replay)
+    report = ReplayReport(archive)
+    detector.add_match_observer(report.observe)
+    try:
+        for _ in archive.frames:
+            detector.find_templates(None, templates, threshold=threshold)
+    finally:
+        detector.remove_match_observer(report.observe)
+    return report
+
+
+def replay_benchmark_steps(benchmark, archive, speed=1.0):
+    """Run a game's detection steps against a recorded archive
+    
+    Input actions are simulated, so only the detection side of each step runs.
+    
+    Args:
+        benchmark (GameBenchmark): Benchmark whose detector and interactor to use
+        archive (FrameArchive): Archive to replay
+        speed (float): Playback speed factor
+        
+    Returns:
+        ReplayReport: Collected statistics
+    """
+    benchmark.detector.set_capture(ReplayCapture(archive, speed=speed))
+    benchmark.interactor.simulate = True
+    report = ReplayReport(archive)
+    benchmark.detector.add_match_observer(report.observe)
+    try:
+        for step in (benchmark.wait_until_ready, benchmark.navigate_to_benchmark, benchmark.start_benchmark):
+            start = time.time()
+            ok = step()
+            logger.info(f"🎞️ Replayed {step.__name__}: {'ok' if ok else 'failed'} in {time.time() - start:.1f}s")
+    finally:
+        benchmark.detector.remove_match_observer(report.observe)
+    return report
+
+
+def _print_summary(summary):
+    """Print a replay summary table"""
+    print(f"{'template':<28} {'n':>5} {'p50 ms':>8} {'max conf':>9} {'accuracy':>9}")
+    for name, entry in summary.items():
+        accuracy = f"{entry['accuracy']:.2%}" if entry["accuracy"] is not None else "-"
+        print(f"{name:<28} {entry['samples']:>5} {entry['latency_p50_ms']:>8.1f} "
+              f"{entry['confidence_max']:>9.2f} {accuracy:>9}")
+
+
+def main(argv=None):
+    """Command line entry point for inspecting, labeling and evaluating archives"""
+    from ..factory import GameFactory
+    from .detection import ImageDetector
+    
+    parser = argparse.ArgumentParser(description="Katana frame archive replay")
+    sub = parser.add_subparsers(dest="command", required=True)
+    
+    info = sub.add_parser("info", help="Show archive information")
+    info.add_argument("archive", type=Path)
+    
+    label = sub.add_parser("label", help="Mark templates as visible in a range of frames")
+    label.add_argument("archive", type=Path)
+    label.add_argument("--frames", required=True, help="Frame range, e.g. 10-42")
+    label.add_argument("--templates", nargs="+", required=True)
+    
+    evaluate = sub.add_parser("evaluate", help="Score templates against every recorded frame")
+    evaluate.add_argument("archive", type=Path)
+    evaluate.add_argument("--game", "-g", required=True)
+    evaluate.add_argument("--templates", nargs="+", help="Templates to score (default: all game assets)")
+    evaluate.add_argument("--threshold", type=float, default=0.8)
+    evaluate.add_argument("--match-mode", default="full")
+    evaluate.add_argument("--output", "-o", type=Path)
+    
+    steps = sub.add_parser("steps", help="Run the game's detection steps against the archive")
+    steps.add_argument("archive", type=Path)
+    steps.add_argument("--game", "-g", required=True)
+    steps.add_argument("--speed", type=float, default=1.0)
+    steps.add_argument("--output", "-o", type=Path)
+    
+    args = parser.parse_args(argv)
+    archive = FrameArchive(args.archive)
+    
+    if args.command == "info":
+        labeled = sum(1 for frame in archive.frames if "labels" in frame)
+        unique = len({frame["file"] for frame in archive.frames})
+        print(f"📼 {archive.archive_dir}: {len(archive.frames)} frames ({unique} unique, {labeled} labeled), "
+              f"{archive.duration:.1f}s, screen {archive.screen_size}")
+        return 0
+    
+    if args.command == "label":
+        first, _, last = args.frames.partition("-")
+        archive.set_labels(int(first), int(last or first), args.templates)
+        archive.save()
+        print(f"🏷️ Labeled frames {args.frames} with {args.templates}")
+        return 0
+    
+    if args.command == "evaluate":
+        assets_dir = Path(__file__).parent.parent / "games" / args.game / "assets"
+        templates = args.templates or sorted(p.name for p in assets_dir.glob("*.png"))
+        detector = ImageDetector(assets_dir, capture=ReplayCapture(archive, speed=None), match_mode=args.match_mode)
+        report = evaluate_archive(detector, archive, templates, threshold=args.threshold)
+    else:
+        benchmark = GameFactory.create_benchmark(args.game)
+        report = replay_benchmark_steps(benchmark, archive, speed=args.speed)
+    
+    _print_summary(report.summary())
+    if args.output:
+        report.save(args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,333 @@
+"""
+Katana Game Benchmark Automation Framework - Core Screen States Module
+
+This module classifies whole frames into known screen states (e.g. main menu,
+workshop browser, map lobby). Every registered sample frame is reduced to a
+small grayscale thumbnail fingerprint; a frame is classified against all
+samples of all states with one matrix product, so a benchmark can tell where
+the game currently is without waiting for templates one after another.
+
+Fingerprints are normalized (zero mean, unit length), so the comparison is a
+correlation that tolerates overall brightness and contrast changes. The index
+is stored as screen_states.json next to the game's assets.
+
+Usage:
+    python -m katana.core.states --game cs2 add main_menu frame1.png frame2.png
+    python -m katana.core.states --game cs2 capture main_menu --delay 5
+    python -m katana.core.states --game cs2 archive RECORDING_DIR --frames 10-42 --state main_menu
+    python -m katana.core.states --game cs2 list
+    python -m katana.core.states --game cs2 classify frame.png
+"""
+import cv2
+import json
+import time
+import logging
+import argparse
+import threading
+import numpy as np
+from pathlib import Path
+
+logger = logging.getLogger("katana")
+
+# Name of the state index file stored next to the assets
+STATE_INDEX_FILE = "screen_states.json"
+
+# Version of the fingerprint format; bumping it ignores older index files
+STATE_VERSION = 1
+
+def thumbnail(frame, size=(32, 18)):
+    """Reduce a frame to the grayscale thumbnail states are fingerprinted from
+    
+    Args:
+        frame (numpy.ndarray): BGR or grayscale frame
+        size (tuple): (width, height) of the thumbnail
+        
+    Returns:
+        numpy.ndarray: uint8 thumbnail
+    """
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+def fingerprint(thumb):
+    """Convert a thumbnail to a normalized fingerprint vector
+    
+    Args:
+        thumb (numpy.ndarray): Thumbnail (see thumbnail)
+        
+    Returns:
+        numpy.ndarray: Zero-mean, unit-length float32 vector (all zeros for a flat thumbnail)
+    """
+    vector = thumb.astype(np.float32).ravel()
+    vector -= vector.mean()
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+
+class ScreenStateIndex:
+    """Persistent index of sample fingerprints per screen state"""
+    
+    def __init__(self, index_path=None, size=(32, 18), min_similarity=0.9, min_margin=0.02):
+        """Initialize the state index
+        
+        Args:
+            index_path (Path, optional): JSON file the samples are persisted to (in-memory only if None)
+            size (tuple): (width, height) of the fingerprint thumbnails
+            min_similarity (float): Smallest correlation of a frame with a state's best sample
+            min_margin (float): Smallest lead of the best state over the runner-up state
+        """
+        self.index_path = Path(index_path) if index_path else None
+        self.size = size
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self._samples = {}
+        self._matrix = None
+        self._labels = []
+        self._lock = threading.Lock()
+        self.load()
+    
+    @property
+    def states(self):
+        """list: Names of the registered states"""
+        return sorted(self._samples)
+    
+    def __len__(self):
+        return len(self._samples)
+    
+    def sample_count(self, state):
+        """Get the number of samples registered for a state
+        
+        Args:
+            state (str): State name
+            
+        Returns:
+            int: Number of samples (0 for an unknown state)
+        """
+        with self._lock:
+            return len(self._samples.get(state, ()))
+    
+    def load(self):
+        """Load samples from the index file, if it exists"""
+        if not self.index_path or not self.index_path.is_file():
+            return
+        
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+            if data.get("version") != STATE_VERSION or tuple(data.get("size", ())) != tuple(self.size):
+                logger.warning(f"⚠️ Ignoring screen states in {self.index_path} (different fingerprint format)")
+                return
+            with self._lock:
+                self._samples = {
+                    state: [np.array(sample, dtype=np.uint8).reshape(self.size[1], self.size[0]) for sample in samples]
+                    for state, samples in data.get("states", {}).items()
+                }
+                self._rebuild()
+            logger.info(f"🗺️ Loaded {len(self._samples)} screen states from {self.index_path}")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load screen states from {self.index_path}: {e}")
+    
+    def save(self):
+        """Write samples to the index file"""
+        if not self.index_path:
+            return
+        
+        try:
+            with self._lock:
+                states = {state: [sample.ravel().tolist() for sample in samples]
+                          for state, samples in self._samples.items()}
+            data = json.dumps({"version": STATE_VERSION, "size": list(self.size), "states": states})
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.index_path, "w") as f:
+                f.write(data)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to save screen states to {self.index_path}: {e}")
+    
+    def _rebuild(self):
+        """Stack the fingerprints of all samples into one matrix (lock held)"""
+        vectors, labels = [], []
+        for state, samples in sorted(self._samples.items()):
+            for sample in samples:
+                vectors.append(fingerprint(sample))
+                labels.append(state)
+        self._matrix = np.stack(vectors) if vectors else None
+        self._labels = labels
+    
+    def add(self, state, frame):
+        """Register a sample frame of a state
+        
+        Args:
+            state (str): State name
+            frame (numpy.ndarray): BGR or grayscale frame showing the state
+        """
+        with self._lock:
+            self._samples.setdefault(state, []).append(thumbnail(frame, self.size))
+            self._rebuild()
+    
+    def remove(self, state):
+        """Remove a state and all its samples
+        
+        Args:
+            state (str): State name
+            
+        Returns:
+            bool: True if the state was registered
+        """
+        with self._lock:
+            removed = self._samples.pop(state, None) is not None
+            self._rebuild()
+        return removed
+    
+    def scores(self, frame):
+        """Score a frame against every state
+        
+        Args:
+            frame (numpy.ndarray): BGR or grayscale frame
+            
+        Returns:
+            dict: State name -> correlation with its best-matching sample (-1.0-1.0)
+        """
+        with self._lock:
+            matrix, labels = self._matrix, self._labels
+        if matrix is None:
+            return {}
+        
+        # One matrix product scores the frame against every sample of every state
+        similarities = matrix @ fingerprint(thumbnail(frame, self.size))
+        scores = {}
+        for state, similarity in zip(labels, similarities.tolist()):
+            scores[state] = max(similarity, scores.get(state, -1.0))
+        return scores
+    
+    def classify(self, frame):
+        """Classify a frame into a known state
+        
+        Args:
+            frame (numpy.ndarray): BGR or grayscale frame
+            
+        Returns:
+            tuple: (state, similarity), state is None if no state is close and clearly ahead of the others
+        """
+        scores = self.scores(frame)
+        if not scores:
+            return None, 0.0
+        
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        state, similarity = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+        if similarity < self.min_similarity or similarity - runner_up < self.min_margin:
+            return None, similarity
+        return state, similarity
+
+
+def main(argv=None):
+    """Command line entry point for registering and checking screen states"""
+    from .replay import FrameArchive
+    from .capture import create_capture_backend
+    
+    parser = argparse.ArgumentParser(description="Register and classify whole-screen states")
+    parser.add_argument("--game", "-g", required=True, help="Game whose state index is used")
+    parser.add_argument("--index", type=Path, help="State index file (default: the game's assets directory)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    
+    add = sub.add_parser("add", help="Register frames from image files as samples of a state")
+    add.add_argument("state")
+    add.add_argument("images", nargs="+", type=Path)
+    
+    capture = sub.add_parser("capture", help="Register the current screen as a sample of a state")
+    capture.add_argument("state")
+    capture.add_argument("--delay", type=float, default=3.0, help="Seconds to wait before capturing")
+    
+    archive = sub.add_parser("archive", help="Register full-screen frames of a recording as samples of a state")
+    archive.add_argument("archive", type=Path)
+    archive.add_argument("--frames", required=True, help="Frame range, e.g. 10-42")
+    archive.add_argument("--state", required=True)
+    archive.add_argument("--samples", type=int, default=4, help="Number of frames taken from the range")
+    
+    sub.add_parser("list", help="List the registered states")
+    
+    remove = sub.add_parser("remove", help="Remove a state")
+    remove.add_argument("state")
+    
+    classify = sub.add_parser("classify", help="Classify frames from image files")
+    classify.add_argument("images", nargs="+", type=Path)
+    
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
+    index_path = args.index or Path(__file__).parent.parent / "games" / args.game / "assets" / STATE_INDEX_FILE
+    index = ScreenStateIndex(index_path)
+    
+    if args.command == "add":
+        for image_path in args.images:
+            frame = cv2.imread(str(image_path), cv2.IMREAD_COLOR)
+            if frame is None:
+                print(f"❌ Failed to read {image_path}")
+                return 1
+            index.add(args.state, frame)
+        index.save()
+        print(f"✅ Added {len(args.images)} samples to '{args.state}'")
+    
+    elif args.command == "capture":
+        print(f"📸 Capturing in {args.delay:.0f}s, switch to the game...")
+        time.sleep(args.delay)
+        backend = create_capture_backend()
+        try:
+            index.add(args.state, backend.grab())
+        finally:
+            backend.close()
+        index.save()
+        print(f"✅ Added the current screen to '{args.state}'")
+    
+    elif args.command == "archive":
+        recording = FrameArchive(args.archive)
+        first, _, last = args.frames.partition("-")
+        try:
+            first, last = int(first), int(last or first)
+        except ValueError:
+            print(f"❌ Invalid frame range '{args.frames}', expected e.g. 10-42")
+            return 1
+        if not 0 <= first <= last < len(recording.frames):
+            print(f"❌ Frame range {args.frames} is outside {args.archive} (frames 0-{len(recording.frames) - 1})")
+            return 1
+        # Frames captured from a region only show part of the screen
+        candidates = [i for i in range(first, last + 1) if recording.frames[i].get("region") is None]
+        if not candidates:
+            print(f"❌ No full-screen frames in range {args.frames}")
+            return 1
+        picks = sorted({candidates[i] for i in np.linspace(0, len(candidates) - 1, args.samples).astype(int)})
+        for frame_index in picks:
+            frame = recording.read_frame(frame_index)
+            if frame is not None:
+                index.add(args.state, frame)
+        index.save()
+        print(f"✅ Added {len(picks)} frames of {args.archive} to '{args.state}'")
+    
+    elif args.command == "list":
+        for state in index.states:
+            print(f"  - {state}: {index.sample_count(state)} samples")
+    
+    elif args.command == "remove":
+        if not index.remove(args.state):
+            print(f"❌ Unknown state '{args.state}'")
+            return 1
+        index.save()
+        print(f"🗑️ Removed '{args.state}'")
+    
+    elif args.command == "classify":
+        for image_path in args.images:
+            frame = cv2.imread(str(image_path), cv2.IMREAD_COLOR)
+            if frame is None:
+                print(f"❌ Failed to read {image_path}")
+                continue
+            state, similarity = index.classify(frame)
+            print(f"{image_path.name:<32} -> {state or 'unknown'} ({similarity:.3f})")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
\ No newline at end of file
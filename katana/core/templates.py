@@ -0,0 +1,242 @@
+"""
+Katana Game Benchmark Automation Framework - Core Templates Module
+
+This module provides loading and caching of template images used by the
+detector. Decoded and resized templates are kept in a size-bounded LRU
+cache so each asset is read from disk once per session instead of once
+per poll.
+"""
+import cv2
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from .probes import ProbeSignature
+
+logger = logging.getLogger("katana")
+
+# Color modes supported by the template cache
+COLOR_BGR = "bgr"
+COLOR_GRAY = "gray"
+
+class Template:
+    """A decoded (and possibly rescaled) template image"""
+    
+    def __init__(self, path, image, scale=(1.0, 1.0), color_mode=COLOR_BGR, origin=(0, 0), full_size=None):
+        """Initialize the template
+        
+        Args:
+            path (Path): Path of the source asset
+            image (numpy.ndarray): Decoded template pixels (a crop of the asset if origin is set)
+            scale (tuple): (scale_x, scale_y) applied to the source asset
+            color_mode (str): Color mode of the pixels ('bgr' or 'gray')
+            origin (tuple): (x, y) offset of the pixels within the whole (scaled) asset
+            full_size (tuple, optional): (width, height) of the whole (scaled) asset, defaults to the pixel size
+        """
+        self.path = Path(path)
+        self.image = image
+        self.scale = scale
+        self.color_mode = color_mode
+        self.origin = origin
+        self.full_size = full_size or (image.shape[1], image.shape[0])
+        # Early-reject probes, computed once per loaded size (None for flat templates)
+        self.probes = ProbeSignature.from_image(image)
+    
+    @property
+    def name(self):
+        """str: File name of the source asset"""
+        return self.path.name
+    
+    @property
+    def size(self):
+        """tuple: (width, height) of the template in pixels"""
+        return self.image.shape[1], self.image.shape[0]
+    
+    @property
+    def cropped(self):
+        """bool: True if only a distinctive part of the asset is matched"""
+        return self.full_size != self.size
+    
+    @property
+    def nbytes(self):
+        """int: Memory used by the template pixels"""
+        return self.image.nbytes
+
+
+class TemplateCache:
+    """Size-bounded LRU cache of decoded templates keyed by (path, scale, color mode)"""
+    
+    def __init__(self, max_entries=64, crop_index=None):
+        """Initialize the cache
+        
+        Args:
+            max_entries (int): Maximum number of templates kept in memory
+            crop_index (TemplateCropIndex, optional): Crops large assets to a distinctive part
+        """
+        self.max_entries = max_entries
+        self.crop_index = crop_index
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        # Templates preloaded from asset packs; never evicted
+        self._pinned = {}
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def _normalize_scale(scale):
+        """Normalize a scale argument to a hashable (scale_x, scale_y) tuple"""
+        if scale is None:
+            return (1.0, 1.0)
+        if isinstance(scale, (int, float)):
+            return (round(float(scale), 4), round(float(scale), 4))
+        return (round(float(scale[0]), 4), round(float(scale[1]), 4))
+    
+    def get(self, template_path, scale=None, color_mode=COLOR_BGR):
+        """Get a template, decoding and resizing it on first use
+        
+        Args:
+            template_path (Path): Resolved path of the template asset
+            scale (float or tuple, optional): Uniform or (x, y) scale factor
+            color_mode (str): 'bgr' or 'gray'
+        
+        Returns:
+            Template or None: Cached template, or None if it could not be loaded
+        """
+        template_path = Path(template_path)
+        scale = self._normalize_scale(scale)
+        key = (str(template_path), scale, color_mode)
+        
+        with self._lock:
+            entry = self._pinned.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        
+        entry = self._load(template_path, scale, color_mode)
+        if entry is None:
+            return None
+        
+        # Another thread may have loaded the same template meanwhile; keep the first copy
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                return existing
+            self.put(key, entry)
+        return entry
+    
+    def put(self, key, entry):
+        """Insert a template under a cache key, evicting the least recently used entries
+        
+        Args:
+            key (tuple): (path, scale, color_mode) cache key
+            entry (Template): Template to store
+        """
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def pin(self, template):
+        """Preload a template so it is served without decoding and never evicted
+        
+        Args:
+            template (Template): Template to keep, stored under its path, scale and color mode
+        """
+        key = (str(template.path), self._normalize_scale(template.scale), template.color_mode)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._pinned[key] = template
+    
+    def unpin_all(self):
+        """Drop all pinned templates"""
+        with self._lock:
+            self._pinned.clear()
+    
+    def _load(self, template_path, scale, color_mode):
+        """Decode a template from disk and apply scale and color mode
+        
+        Args:
+            template_path (Path): Path of the template asset
+            scale (tuple): (scale_x, scale_y) to apply
+            color_mode (str): 'bgr' or 'gray'
+        
+        Returns:
+            Template or None: Loaded template, or None on failure
+        """
+        if scale == (1.0, 1.0):
+            flags = cv2.IMREAD_GRAYSCALE if color_mode == COLOR_GRAY else cv2.IMREAD_COLOR
+            image = cv2.imread(str(template_path), flags)
+            if image is None:
+                logger.error(f"❌ Failed to load template: {template_path}")
+                return None
+            
+            crop = self.crop_index.crop_for(template_path, image) if self.crop_index is not None else None
+            if crop is None:
+                return Template(template_path, image, scale, color_mode)
+            x, y, width, height = crop
+            full_size = (image.shape[1], image.shape[0])
+            image = image[y:y + height, x:x + width].copy()
+            return Template(template_path, image, scale, color_mode, origin=(x, y), full_size=full_size)
+        
+        # Scaled variants are derived from the cached unscaled template
+        base = self.get(template_path, None, color_mode)
+        if base is None:
+            return None
+        
+        new_width = max(1, int(base.image.shape[1] * scale[0]))
+        new_height = max(1, int(base.image.shape[0] * scale[1]))
+        
+        # Choose appropriate interpolation method
+        interpolation = cv2.INTER_AREA if scale[0] < 1.0 else cv2.INTER_LINEAR
+        
+        try:
+            image = cv2.resize(base.image, (new_width, new_height), interpolation=interpolation)
+        except Exception as e:
+            logger.error(f"❌ Failed to resize template: {e}")
+            return None
+        
+        # Crop offset and asset size scale along with the pixels
+        origin = (int(round(base.origin[0] * scale[0])), int(round(base.origin[1] * scale[1])))
+        full_size = (max(new_width, int(base.full_size[0] * scale[0])), max(new_height, int(base.full_size[1] * scale[1])))
+        return Template(template_path, image, scale, color_mode, origin=origin, full_size=full_size)
+    
+    def clear(self):
+        """Drop all cached templates and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._pinned.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+    
+    def __len__(self):
+        return len(self._entries) + len(self._pinned)
+    
+    def stats(self):
+        """Get cache statistics
+        
+        Returns:
+            dict: Entry count, memory use and hit/miss/eviction counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "pinned": len(self._pinned),
+                "max_entries": self.max_entries,
+                "bytes": sum(entry.nbytes for entry in list(self._entries.values()) + list(self._pinned.values())),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
\ No newline at end of file
@@ -0,0 +1,276 @@
+"""
+Katana Game Benchmark Automation Framework - Core Window Module
+
+This module keeps a session with the game window. The window is looked up by
+title once; its handle and client-area geometry are cached and only
+revalidated (a handle check and a geometry read) every refresh interval,
+so detector polls never enumerate the desktop's windows.
+
+WindowCapture restricts capture to the window's client area. Regions,
+match locations and the capture resolution are then relative to the game's
+client area, and GameWindow.to_screen translates them back for input.
+"""
+import sys
+import time
+import ctypes
+import logging
+import threading
+import pygetwindow as gw
+
+from .capture import CaptureBackend
+
+logger = logging.getLogger("katana")
+
+class GameWindow:
+    """Cached handle and client-area geometry of a game window"""
+    
+    def __init__(self, title, refresh_interval=0.5):
+        """Initialize the window session
+        
+        Args:
+            title (str): Window title (or part of it) to look up
+            refresh_interval (float): Seconds a validated handle and geometry are trusted
+        """
+        self.title = title
+        self.refresh_interval = refresh_interval
+        self.lookups = 0
+        self.refreshes = 0
+        self._window = None
+        self._region = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+    
+    @property
+    def handle(self):
+        """int or None: Native window handle (HWND on Windows)"""
+        if self._window is None:
+            return None
+        return getattr(self._window, "_hWnd", None)
+    
+    def resolve(self):
+        """Look the window up by title, replacing the cached handle
+        
+        Returns:
+            bool: True if a window was found
+        """
+        with self._lock:
+            return self._resolve()
+    
+    def _resolve(self):
+        """Look the window up by title (lock held)"""
+        self.lookups += 1
+        windows = gw.getWindowsWithTitle(self.title)
+        self._window = windows[0] if windows else None
+        self._region = None
+        self._checked = time.monotonic()
+        if self._window is None:
+            return False
+        
+        self._region = self._read_region()
+        logger.info(f"🪟 Found window '{self.title}' (client area {self._region})")
+        return True
+    
+    def _is_valid(self):
+        """Check that the cached handle still refers to a window (lock held)"""
+        if self._window is None:
+            return False
+        if sys.platform == "win32" and self.handle is not None:
+            return bool(ctypes.windll.user32.IsWindow(self.handle))
+        try:
+            return bool(self._window.title)
+        except Exception:
+            return False
+    
+    def _read_region(self):
+        """Read the client area of the cached window in screen coordinates (lock held)"""
+        if sys.platform == "win32" and self.handle is not None:
+            # Client area without borders and title bar
+            from ctypes import wintypes
+            rect = wintypes.RECT()
+            origin = wintypes.POINT(0, 0)
+            user32 = ctypes.windll.user32
+            if user32.GetClientRect(self.handle, ctypes.byref(rect)) and \
+                    user32.ClientToScreen(self.handle, ctypes.byref(origin)):
+                return (origin.x, origin.y, rect.right - rect.left, rect.bottom - rect.top)
+        window = self._window
+        return (window.left, window.top, window.width, window.height)
+    
+    def refresh(self, force=False):
+        """Revalidate the cached handle and geometry once the refresh interval has passed
+        
+        A handle that no longer refers to a window (e.g. after a restart of
+        the game) is replaced by looking the window up again.
+        
+        Args:
+            force (bool): Revalidate even within the refresh interval
+            
+        Returns:
+            tuple or None: Client area (left, top, width, height) on screen, None if there is no window
+        """
+        with self._lock:
+            if not force and time.monotonic() - self._checked < self.refresh_interval:
+                return self._region
+            
+            self.refreshes += 1
+            if not self._is_valid():
+                self._resolve()
+                return self._region
+            
+            try:
+                region = self._read_region()
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to read the geometry of '{self.title}': {e}")
+                region = None
+            if region != self._region:
+                logger.info(f"🪟 Window '{self.title}' client area is now {region}")
+            self._region = region
+            self._checked = time.monotonic()
+            return region
+    
+    @property
+    def region(self):
+        """tuple or None: Client area (left, top, width, height) on screen, None if there is no window"""
+        region = self.refresh()
+        if region is None or region[2] <= 0 or region[3] <= 0:
+            return None
+        return region
+    
+    @property
+    def resolution(self):
+        """tuple or None: (width, height) of the client area"""
+        region = self.region
+        return (region[2], region[3]) if region else None
+    
+    def to_screen(self, x, y):
+        """Translate client-area coordinates to screen coordinates
+        
+        Args:
+            x (int): X coordinate within the client area
+            y (int): Y coordinate within the client area
+            
+        Returns:
+            tuple: (x, y) on screen (unchanged if there is no window)
+        """
+        region = self.region
+        if region is None:
+            return x, y
+        return x + region[0], y + region[1]
+    
+    def to_window(self, x, y):
+        """Translate screen coordinates to client-area coordinates
+        
+        Args:
+            x (int): X coordinate on screen
+            y (int): Y coordinate on screen
+            
+        Returns:
+            tuple: (x, y) within the client area (unchanged if there is no window)
+        """
+        region = self.region
+        if region is None:
+            return x, y
+        return x - region[0], y - region[1]
+    
+    @property
+    def is_active(self):
+        """bool: True if the window has the input focus"""
+        with self._lock:
+            window = self._window
+        try:
+            return window is not None and bool(window.isActive)
+        except Exception:
+            return False
+    
+    def focus(self, timeout=1.0, check_interval=0.05):
+        """Bring the window to the foreground
+        
+        Args:
+            timeout (float): Maximum time to wait for the window to become active in seconds
+            check_interval (float): Time between checks in seconds
+            
+        Returns:
+            bool: True if the window is active
+        """
+        if self.region is None:
+            logger.error(f"❌ No window with title '{self.title}' found")
+            return False
+        if self.is_active:
+            return True
+        
+        try:
+            self._window.activate()
+        except Exception as e:
+            logger.error(f"⚠️ Window activation error: {e}")
+            return False
+        
+        deadline = time.monotonic() + timeout
+        while not self.is_active:
+            if time.monotonic() >= deadline:
+                logger.warning(f"⚠️ Tried to activate '{self.title}', but it's not in focus")
+                return False
+            time.sleep(check_interval)
+        
+        logger.info(f"✅ Window '{self.title}' is now active")
+        # The window may have moved or resized while in the background
+        self.refresh(force=True)
+        return True
+    
+    def stats(self):
+        """Get window session statistics
+        
+        Returns:
+            dict: Title lookups and revalidations performed
+        """
+        return {"lookups": self.lookups, "refreshes": self.refreshes}
+
+
+class WindowCapture(CaptureBackend):
+    """Captures only the client area of a game window through another backend
+    
+    Regions are relative to the client area and the screen size is the
+    client-area size. Without a window the whole screen is captured.
+    """
+    
+    name = "window"
+    
+    def __init__(self, backend, window):
+        """Initialize the window capture
+        
+        Args:
+            backend (CaptureBackend): Backend that performs the actual capture
+            window (GameWindow): Window whose client area is captured
+        """
+        super().__init__()
+        self.backend = backend
+        self.window = window
+        # Frames and latencies are counted once, by the wrapped backend
+        self.stats = backend.stats
+    
+    def _screen_region(self, region):
+        """Translate a client-area region to a screen region, clipped to the client area"""
+        client = self.window.region
+        if client is None:
+            return region
+        if not region:
+            return client
+        
+        left, top, width, height = region
+        left, top = max(0, left), max(0, top)
+        width = max(1, min(width, client[2] - left))
+        height = max(1, min(height, client[3] - top))
+        return (client[0] + left, client[1] + top, width, height)
+    
+    def grab_timestamped(self, region=None, grayscale=False):
+        return self.backend.grab_timestamped(self._screen_region(region), grayscale)
+    
+    def _grab(self, region, grayscale):
+        return self.grab_timestamped(region, grayscale)[0]
+    
+    def screen_size(self):
+        resolution = self.window.resolution
+        return resolution if resolution else self.backend.screen_size()
+    
+    def close(self):
+        """Release the wrapped backend"""
+        self.backend.close()
+        super().close()
\ No newline at end of file
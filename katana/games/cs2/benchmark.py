@@ -11,13 +11,19 @@ from pathlib import Path
 from ...core.benchmark import GameBenchmark, BenchmarkResult
 from ...core.detection import ImageDetector
 from ...core.interaction import GameInteractor
+from ...core.assetpacks import AssetPackBuilder
+from ...core.states import ScreenStateIndex, STATE_INDEX_FILE
+from ...core.navigation import Navigator
 from .config import GAME_ID, GAME_NAME, WINDOW_TITLE, REQUIRED_ASSETS, CONFIG
+from .navigation import build_navigation_graph, MENU_SCREENS, MAP_LOBBY, BENCHMARK_RUNNING, BENCHMARK_RESULTS, EXITED
 
 logger = logging.getLogger("katana")
 
 class CS2Benchmark(GameBenchmark):
     """Counter-Strike 2 benchmark implementation"""
     
+    supports_warm_session = True
+    
     def __init__(self):
         """Initialize the CS2 benchmark"""
         super().__init__(
@@ -31,103 +37,111 @@ class CS2Benchmark(GameBenchmark):
         self.assets_dir = Path(__file__).parent / "assets"
         
         # Initialize detector and interactor
-        self.detector = ImageDetector(self.assets_dir)
-        self.interactor = GameInteractor(self.assets_dir, self.detector)
+        self.detector = ImageDetector(
+            self.assets_dir,
+            capture=CONFIG.get("capture_backend", "pyautogui"),
+            match_mode=CONFIG.get("match_mode", "full"),
+            pyramid_scale=CONFIG.get("pyramid_scale", 0.5),
+            region_hints=CONFIG.get("region_hints"),
+            workers=CONFIG.get("detector_workers", 0)
+        )
+        if CONFIG.get("background_capture_fps", 0) > 0:
+            self.detector.enable_background_capture(fps=CONFIG["background_capture_fps"])
+        self.interactor = GameInteractor(self.assets_dir, self.detector, profile=CONFIG.get("input_profile", "safe"))
+        
+        # Whole-screen state classifier (empty until states are registered)
+        self.screen_states = ScreenStateIndex(self.assets_dir / STATE_INDEX_FILE)
+        
+        # Declared menu graph, driven by the navigator
+        self.navigation_graph = build_navigation_graph()
+        self.navigator = Navigator(self.navigation_graph, self.detector, self.interactor, self.screen_states)
         
         # Verify required assets
         self.check_assets(REQUIRED_ASSETS)
         
+    def load_asset_pack(self, resolution):
+        """Load the pre-scaled templates of the resolution a preset applied
+        
+        Args:
+            resolution (tuple): Game resolution (width, height)
+            
+        Returns:
+            bool: True if templates are now served from an asset pack
+        """
+        if not CONFIG.get("asset_packs"):
+            return False
+        
+        builder = AssetPackBuilder("cs2", self.assets_dir, pack_root=CONFIG["asset_packs"])
+        pack = builder.load_or_build(resolution)
+        return self.detector.use_asset_pack(pack) > 0
+    
     def focus_game_window(self):
-        """Focus the CS2 window"""
-        return self.interactor.focus_window(self.window_title)
+        """Focus the CS2 window and capture only its client area"""
+        if not self.interactor.focus_window(self.window_title):
+            return False
+        
+        if CONFIG.get("window_capture") and not self.interactor.simulate:
+            self.detector.use_window(self.interactor.get_window(self.window_title))
+        return True
     
     def wait_until_ready(self):
-        """Wait until CS2 main screen is ready"""
-        logger.info("⏳ Waiting for CS2 main screen to appear...")
+        """Wait until CS2 shows one of its menu screens"""
+        logger.info("⏳ Waiting for a CS2 menu screen to appear...")
         
-        # Press ESC a couple times to close any dialogs
-        self.interactor.press_key('esc', presses=3, interval=1)
+        # Closing dialogs would back out of a menu the game is already on
+        screen = self.navigator.detect()
+        if screen is None:
+            self.navigation_graph.reset_action(self.navigator)
+            screen = self.navigator.detect(timeout=CONFIG.get("template_timeout", 40))
         
-        # Wait for Play tab to appear
-        found = self.detector.wait_for_template(
-            "play_tab.png", 
-            timeout=CONFIG.get("template_timeout", 40)
-        )
-        
-        if found:
-            logger.info("✅ Main screen detected")
+        if screen in MENU_SCREENS:
+            logger.info(f"✅ Menu screen detected: {screen}")
             return True
         else:
-            logger.error("❌ Main screen not detected within timeout")
+            logger.error("❌ Menu screen not detected within timeout")
             return False
     
-    def navigate_to_benchmark(self):
-        """Navigate to the CS2 benchmark map"""
-        logger.info("🧭 Navigating to CS2 benchmark map...")
+    def recover(self):
+        """Close dialogs with ESC and re-detect the current screen
         
-        # Step 1: Click Play tab
-        logger.info("🧭 [Step 1] Clicking PLAY tab")
-        play_clicked = self.interactor.click_template_with_retry("play_tab.png")
-        if not play_clicked:
-            logger.error("❌ Failed to click PLAY tab")
-            return False
-        
-        # Step 2: Click Workshop tab
-        logger.info("🧱 [Step 2] Looking for Workshop Maps tab")
-        workshop_found = self.detector.wait_for_template(
-            "workshop_tab.png", 
-            timeout=20, 
-            check_interval=2
-        )
-        
-        if workshop_found:
-            self.interactor.click_template("workshop_tab.png")
-        else:
-            logger.error("❌ Workshop tab not found")
-            return False
-        
-        # Step 3: Select the benchmark map
-        logger.info("🗺️ [Step 3] Selecting CS2 FPS Benchmark map")
-        benchmark_found = self.detector.wait_for_template(
-            "cs2_fps_benchmark.png", 
-            timeout=20, 
-            check_interval=2
-        )
+        Returns:
+            bool: True if a CS2 screen is recognized again
+        """
+        self.navigation_graph.reset_action(self.navigator)
+        return self.navigator.detect(timeout=10) is not None
+    
+    def check_health(self):
+        """Check that the running CS2 can be reused: running, focusable and on a known screen
         
-        if benchmark_found:
-            self.interactor.click_template("cs2_fps_benchmark.png")
-        else:
-            logger.error("❌ CS2 FPS Benchmark map not found")
-            return False
+        Returns:
+            bool: True if the next run can restart the benchmark in place
+        """
+        return super().check_health() and self.navigator.detect(timeout=10) is not None
+    
+    def launch_ready_check(self):
+        """CS2 is interactive once one of its screens is recognized"""
+        return lambda: self.navigator.detect() is not None
+    
+    def restart_benchmark(self):
+        """Leave the finished benchmark map and return to its lobby without restarting CS2
         
-        return True
+        Returns:
+            bool: True if the benchmark map lobby is shown
+        """
+        logger.info("🔁 Restarting the benchmark map in the running game...")
+        return self.navigator.navigate(MAP_LOBBY, start=BENCHMARK_RESULTS, detect_timeout=10)
+    
+    def navigate_to_benchmark(self):
+        """Navigate to the CS2 benchmark map"""
+        logger.info("🧭 Navigating to CS2 benchmark map...")
+        return self.navigator.navigate(MAP_LOBBY, detect_timeout=10)
     
     def start_benchmark(self):
         """Start the benchmark execution"""
         logger.info("🎯 Starting benchmark execution...")
         
-        # Click the GO button
-        go_found = self.detector.wait_for_template(
-            "go_button.png", 
-            timeout=15, 
-            check_interval=2
-        )
-        
-        if go_found:
-            self.interactor.click_template("go_button.png")
-        else:
-            logger.error("❌ GO button not found")
-            return False
-        
-        # Wait for benchmark to visually begin
-        logger.info("🧠 Waiting for benchmark to visually begin...")
-        benchmark_started = self.detector.wait_for_template(
-            "benchmark_first_frame.png", 
-            timeout=20, 
-            check_interval=1
-        )
-        
-        if benchmark_started:
+        # Click GO and wait for the benchmark to visually begin
+        if self.navigator.navigate(BENCHMARK_RUNNING, detect_timeout=15):
             self.benchmark_start_time = time.time()
             logger.info("✅ Visual benchmark start confirmed")
             return True
@@ -138,6 +152,23 @@ class CS2Benchmark(GameBenchmark):
     def collect_results(self, run_id=0):
         """Collect benchmark results
         
+        Args:
+            run_id (int): ID of the current benchmark run
+            
+        Returns:
+            BenchmarkResult: Container with benchmark results
+        """
+        # Keep detection off the game's cores while the benchmark is measured
+        self.detector.set_workers(CONFIG.get("detector_workers_measured", 0))
+        try:
+            with self.detector.capture_paused():
+                return self._collect_results(run_id)
+        finally:
+            self.detector.set_workers(CONFIG.get("detector_workers", 0))
+    
+    def _collect_results(self, run_id):
+        """Wait for the benchmark to finish and capture its results
+        
         Args:
             run_id (int): ID of the current benchmark run
             
@@ -164,6 +195,7 @@ class CS2Benchmark(GameBenchmark):
                 
                 logger.info(f"⏱️ [Run {run_id}] Benchmark duration: {duration:.2f} seconds")
                 result.duration = duration
+                result.duration_measured = True
                 
                 # Wait a moment for results to display fully
                 time.sleep(12)
@@ -187,8 +219,28 @@ class CS2Benchmark(GameBenchmark):
             
             known_duration = self.benchmark_duration
             
-            logger.info(f"📥 [Run {run_id}] Timed collection: sleeping for {known_duration:.2f}s + 7s buffer...")
-            time.sleep(known_duration + 12)
+            # Sleep through the benchmark, then watch for the end screen around its expected end
+            watch_from = self.benchmark_start_time + max(0, known_duration - 10)
+            logger.info(f"📥 [Run {run_id}] Timed collection: sleeping until {max(0, known_duration - 10):.0f}s "
+                        f"into the benchmark (known duration {known_duration:.2f}s)...")
+            time.sleep(max(0, watch_from - time.time()))
+            benchmark_end = self.detector.wait_for_template(
+                "benchmark_end_screen.png",
+                timeout=22,
+                check_interval=1
+            )
+            
+            if benchmark_end:
+                self.benchmark_end_time = time.time()
+                result.duration = self.benchmark_end_time - self.benchmark_start_time
+                result.duration_measured = True
+                logger.info(f"⏱️ [Run {run_id}] Benchmark duration: {result.duration:.2f} seconds")
+                
+                # Wait a moment for results to display fully
+                time.sleep(12)
+            else:
+                logger.warning(f"⚠️ [Run {run_id}] End screen not detected, using the known duration")
+                result.duration = known_duration
             
             # Here you could add code to capture performance metrics with external tools
             # For example: PresentMon, FRAPS, etc.
@@ -200,7 +252,6 @@ class CS2Benchmark(GameBenchmark):
                 f"cs2_benchmark_result_run{run_id}_{timestamp}.png"
             )
             result.screenshot_path = screenshot_path
-            result.duration = known_duration
         
         return result
     
@@ -208,47 +259,36 @@ class CS2Benchmark(GameBenchmark):
         """Clean up after benchmark completion"""
         logger.info("🧹 Initiating CS2 shutdown sequence...")
         
-        # Give time for any final screens to display
-        time.sleep(10)
-        
-        # Toggle console off with ~ key
-        logger.info("🗙 Toggling console off...")
-        self.interactor.press_key('`')
-        time.sleep(1)
-        
-        # Click on power button to open exit menu
-        logger.info("🔋 Clicking the power icon...")
-        time.sleep(3)
+        # Close the console, open the exit menu and quit, confirming every screen
+        exited = self.navigator.navigate(EXITED, start=BENCHMARK_RESULTS, detect_timeout=10)
         
-        power_found = self.detector.wait_for_template(
-            "power_button.png", 
-            timeout=10
-        )
-        
-        if power_found:
-            self.interactor.click_template("power_button.png")
-            time.sleep(2)
-        else:
-            logger.warning("⚠️ Power button not found")
-        
-        # Click Quit button to exit CS2
-        logger.info("🚪 Clicking Quit to exit CS2...")
-        
-        quit_found = self.detector.wait_for_template(
-            "quit_button.png", 
-            timeout=10
-        )
-        
-        if quit_found:
-            self.interactor.click_template("quit_button.png")
+        if exited:
             logger.info("✅ CS2 exited")
         else:
-            logger.warning("⚠️ Quit button not found. You may need to exit manually.")
+            logger.warning("⚠️ Exit sequence failed. You may need to exit manually.")
             
-            # Try to force close with Alt+F4
-            logger.info("🔄 Trying to force exit with Alt+F4...")
-            pyautogui.hotkey('alt', 'f4')
+            # Alt+F4 closes whatever window has the focus, so only send it to CS2
+            if self.interactor.simulate:
+                logger.info("🔄 Simulated input, not sending Alt+F4")
+            elif not self.interactor.get_window(self.window_title).is_active:
+                logger.warning("⚠️ CS2 window does not have the focus, not sending Alt+F4")
+            else:
+                # Try to force close with Alt+F4
+                logger.info("🔄 Trying to force exit with Alt+F4...")
+                pyautogui.hotkey('alt', 'f4')
+                
+                # Wait for the game to fully close
+                time.sleep(5)
         
-        # Wait for the game to fully close
-        time.sleep(5)
+        capture_stats = self.detector.capture_stats()
+        logger.info(f"📷 Capture stats ({self.detector.capture.name}): {capture_stats['frames']} frames, "
+                    f"avg {capture_stats['avg_latency_ms']:.1f} ms, "
+                    f"{capture_stats['allocations_per_frame']:.2f} allocations/frame")
+        for action, stats in self.interactor.action_stats().items():
+            logger.info(f"⌨️ Input stats ({action}): {stats['count']} actions, avg {stats['avg_ms']:.0f} ms, "
+                        f"max {stats['max_ms']:.0f} ms, {stats['unconfirmed']} unconfirmed")
+        tracker = self.launch_tracker()
+        for start, stats in (tracker.stats() if tracker else {}).items():
+            logger.info(f"🚀 Launch stats ({start} start): {stats['count']} launches, avg {stats['avg_s']:.1f}s, "
+                        f"max {stats['max_s']:.1f}s")
         return True
\ No newline at end of file
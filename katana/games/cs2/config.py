@@ -28,13 +28,27 @@ REQUIRED_ASSETS = [
 # Configuration parameters
 CONFIG = {
     "launcher": "steam",  # Game launcher to use
-    "launch_wait_time": 40,  # Time to wait after launch before interaction
+    "launch_wait_time": 40,  # Time to wait after launch before interaction (only without a process_name)
+    "launch_timeout": 180,  # Longest wait for the process, window and first stable frame after launch
+    "launch_history": "results/launch_history.jsonl",  # Recorded launch latencies (cold and warm starts)
+    "warm_session": False,  # Keep CS2 running between the runs of a series and restart the map in place
     "benchmark_map": "cs2_fps_benchmark",  # Name of benchmark map/mode
+    "duration_cache": "results/cache/benchmark_durations.json",  # Durations per map, preset and build (None disables)
     "cooldown": 120,  # Default cooldown between runs in seconds
     "default_runs": 4,  # Default number of benchmark runs
     "template_threshold": 0.8,  # Default template matching threshold
     "template_timeout": 30,  # Default template detection timeout
     "process_name": "cs2.exe",  # Process name of the running game
+    "capture_backend": "auto",  # Screen capture backend ('auto' uses mss when installed)
+    "match_mode": "full",  # Template matching mode ('full', 'pyramid' or 'keypoint')
+    "pyramid_scale": 0.5,  # Coarse level scale in pyramid mode (lower is faster, less accurate)
+    "region_hints": "results/cache/region_hints.json",  # Persistent last-known template locations (None disables)
+    "detector_workers": 2,  # Threads used for template scoring while navigating menus
+    "detector_workers_measured": 0,  # Threads used for template scoring during the measured benchmark
+    "background_capture_fps": 0,  # Background capture rate while navigating menus (0 captures per detector call)
+    "asset_packs": "results/cache/asset_packs",  # Pre-scaled templates per preset resolution (None disables)
+    "window_capture": True,  # Capture and match only the game window's client area (False captures the desktop)
+    "input_profile": "safe",  # Input timing ('safe' fixed delays, 'fast' instant input confirmed by screen changes)
     "steam_url": "steam://install/730",  # Steam protocol URL for direct installation
     "store_url": "https://store.steampowered.com/app/730/CounterStrike_2/",  # Web URL to the store page
 }
@@ -0,0 +1,55 @@
+"""
+Katana Game Benchmark Automation Framework - CS2 Navigation Graph
+
+This module declares the CS2 menu screens, the transitions between them and
+the visual post-conditions confirming each screen (see katana.core.navigation).
+"""
+from ...core.navigation import NavigationGraph, click, press, write, sequence
+
+# Screens in the order they are tried when detecting the current screen
+MAIN_MENU = "main_menu"  # PLAY tab visible, no submenu open
+PLAY_MENU = "play_menu"  # Workshop Maps tab visible
+WORKSHOP_MAPS = "workshop_maps"  # Benchmark map visible in the workshop list
+MAP_LOBBY = "map_lobby"  # Benchmark map selected, GO button visible
+BENCHMARK_RUNNING = "benchmark_running"  # First frame of the benchmark
+BENCHMARK_RESULTS = "benchmark_results"  # End-of-benchmark output in the console
+IN_GAME = "in_game"  # Console closed, power icon visible
+EXIT_MENU = "exit_menu"  # Quit confirmation visible
+EXITED = "exited"  # Game window gone
+
+# Screens on the way from the main menu to the benchmark map
+MENU_SCREENS = [MAIN_MENU, PLAY_MENU, WORKSHOP_MAPS, MAP_LOBBY]
+
+def build_navigation_graph():
+    """Build the CS2 navigation graph
+    
+    Returns:
+        NavigationGraph: CS2 screens and transitions
+    """
+    # ESC closes dialogs and backs out of submenus to the main menu
+    graph = NavigationGraph(reset_action=press("esc", presses=3, interval=1))
+    
+    # The tab bar stays visible in the submenus, so each menu screen rules out the deeper ones
+    graph.add_screen(MAIN_MENU, templates=["play_tab.png"],
+                     absent=["workshop_tab.png", "cs2_fps_benchmark.png", "go_button.png"], state=MAIN_MENU)
+    graph.add_screen(PLAY_MENU, templates=["workshop_tab.png"], absent=["cs2_fps_benchmark.png", "go_button.png"],
+                     state=PLAY_MENU)
+    graph.add_screen(WORKSHOP_MAPS, templates=["cs2_fps_benchmark.png"], absent=["go_button.png"], state=WORKSHOP_MAPS)
+    graph.add_screen(MAP_LOBBY, templates=["go_button.png"], state=MAP_LOBBY)
+    graph.add_screen(BENCHMARK_RUNNING, templates=["benchmark_first_frame.png"])
+    graph.add_screen(BENCHMARK_RESULTS, templates=["benchmark_end_screen.png"])
+    graph.add_screen(IN_GAME, templates=["power_button.png"])
+    graph.add_screen(EXIT_MENU, templates=["quit_button.png"])
+    graph.add_screen(EXITED, absent=["quit_button.png", "power_button.png"])
+    
+    graph.add_transition(MAIN_MENU, PLAY_MENU, click("play_tab.png"))
+    graph.add_transition(PLAY_MENU, WORKSHOP_MAPS, click("workshop_tab.png", retries=0))
+    graph.add_transition(WORKSHOP_MAPS, MAP_LOBBY, click("cs2_fps_benchmark.png", retries=0))
+    graph.add_transition(MAP_LOBBY, BENCHMARK_RUNNING, click("go_button.png", retries=0), timeout=20)
+    graph.add_transition(BENCHMARK_RESULTS, IN_GAME, press("`"), timeout=15)
+    # Leaving the map from the open console returns to the menus without restarting the game
+    graph.add_transition(BENCHMARK_RESULTS, MAIN_MENU, sequence(write("disconnect"), press("enter"), press("`")),
+                         timeout=30)
+    graph.add_transition(IN_GAME, EXIT_MENU, click("power_button.png", retries=0), timeout=10)
+    graph.add_transition(EXIT_MENU, EXITED, click("quit_button.png", retries=0), timeout=15)
+    return graph
\ No newline at end of file
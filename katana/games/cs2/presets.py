@@ -9,7 +9,7 @@ import re
 import shutil
 from pathlib import Path
 
-from ...core.presets import PresetAdapter
+from ...core.presets import PresetAdapter, find_steam_path
 
 logger = logging.getLogger("katana")
 
@@ -80,37 +80,7 @@ class CS2PresetAdapter(PresetAdapter):
         Returns:
             Path: Path to the Steam directory
         """
-        try:
-            # Try to get from registry on Windows
-            import os
-            if os.name == 'nt':
-                try:
-                    import winreg
-                    hkey = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Valve\Steam")
-                    steam_path = winreg.QueryValueEx(hkey, "SteamPath")[0]
-                    winreg.CloseKey(hkey)
-                    return Path(steam_path)
-                except Exception as e:
-                    logger.warning(f"⚠️ Could not find Steam path in registry: {e}")
-            
-            # Check common locations
-            common_paths = [
-                Path.home() / ".steam/steam" if hasattr(Path, 'home') else None,  # Linux
-                Path.home() / "Library/Application Support/Steam" if hasattr(Path, 'home') else None,  # macOS
-                Path("C:/Program Files (x86)/Steam"),  # Windows
-                Path("C:/Program Files/Steam"),  # Windows
-                Path("D:/Program Files (x86)/Steam"),  # Windows on D: drive
-                Path("D:/Program Files/Steam")  # Windows on D: drive
-            ]
-            
-            for path in common_paths:
-                if path and path.exists():
-                    return path
-            
-            return None
-        except Exception as e:
-            logger.error(f"❌ Error finding Steam path: {e}")
-            return None
+        return find_steam_path()
     
     def apply_preset(self, preset_data, backup=True):
         """Apply a preset to the CS2 video settings file
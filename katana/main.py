@@ -14,6 +14,7 @@ from colorama import init, Fore, Style
 
 from .factory import GameFactory
 from .core.presets import PresetManager
+from .core.replay import RecordingCapture
 from .games.cs2.presets import CS2PresetAdapter
 
 # Initialize colorama for colored terminal output
@@ -100,6 +101,12 @@ def parse_args():
     parser.add_argument("--list-presets", action="store_true",
                       help="List available graphics presets for the selected game")
     
+    parser.add_argument("--record", type=Path, default=None,
+                      help="Record captured frames to this directory for offline replay")
+    
+    parser.add_argument("--warm", action="store_true", default=None,
+                      help="Keep the game running between runs and restart the benchmark in place")
+    
     return parser.parse_args()
 
 def prompt_for_game(available_games):
@@ -264,12 +271,25 @@ def main():
         # Create benchmark instance
         benchmark = GameFactory.create_benchmark(game_id)
         
+        # Record every frame the detector captures if requested
+        if args.record:
+            benchmark.detector.set_capture(RecordingCapture(benchmark.detector.capture, args.record))
+        
         # Apply preset if specified
         if preset_id:
             print(f"\n🔧 Applying preset: {preset_id}")
             success = preset_manager.apply_preset(game_id, preset_id)
             if not success:
                 print(f"❌ Failed to apply preset '{preset_id}'. Using current settings.")
+            else:
+                # The preset keys the cached benchmark durations
+                if hasattr(benchmark, 'use_preset'):
+                    benchmark.use_preset(preset_id)
+                
+                # Match templates pre-scaled to the preset's resolution
+                resolution = preset_manager.get_preset_resolution(game_id, preset_id)
+                if resolution and hasattr(benchmark, 'load_asset_pack'):
+                    benchmark.load_asset_pack(resolution)
         
         # Get benchmark parameters
         runs = args.runs
@@ -298,7 +318,11 @@ def main():
         print("\n🚀 Starting benchmark series...")
         
         # Run benchmark series
-        results = benchmark.run_benchmark_series(run_count=runs, cooldown=cooldown)
+        try:
+            results = benchmark.run_benchmark_series(run_count=runs, cooldown=cooldown, warm=args.warm)
+        finally:
+            if args.record:
+                benchmark.detector.capture.close()
         
         print("\n✅ Benchmark completed successfully!")
         print(f"📊 Results saved to the 'results' directory")
@@ -0,0 +1,5 @@
+"""
+Katana Game Benchmark Automation Framework - Tools Package
+
+This package contains developer tools for measuring and maintaining the framework itself.
+"""
\ No newline at end of file
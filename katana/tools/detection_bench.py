@@ -0,0 +1,466 @@
+"""
+Katana Game Benchmark Automation Framework - Detection Microbenchmark
+
+This tool measures the detector itself. The shipped game assets are composited
+into synthetic frames at several resolutions and served through a static
+capture backend, so only template matching is timed. Each case reports
+p50/p99 latency, throughput and peak memory, and the results are written
+as JSON so they can be compared between versions.
+
+The assets are scaled to each resolution, so at resolutions other than the
+reference one the unscaled calls (find_template, batch, ...) usually find
+nothing and time the miss path; every case reports which path it measured.
+Peak memory is the growth of the process's resident set while one call
+runs, sampled from a thread, since tracemalloc does not see the native
+allocations of OpenCV and NumPy. Memory the allocators reuse without
+growing the process is not counted.
+
+Usage:
+    python -m katana.tools.detection_bench [--game cs2] [--modes full pyramid] [--output results.json]
+    python -m katana.tools.detection_bench --compare baseline.json
+    python -m katana.tools.detection_bench --check
+"""
+import cv2
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import threading
+import numpy as np
+import psutil
+from pathlib import Path
+
+from .. import __version__
+from ..core.capture import StaticCapture
+from ..core.detection import ImageDetector, MATCH_FULL, MATCH_PYRAMID, MATCH_KEYPOINT
+from ..core.hints import RegionHintIndex
+
+logger = logging.getLogger("katana")
+
+# Version of the result file format
+RESULTS_VERSION = 2
+
+# Frame resolutions benchmarked by default
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4k": (3840, 2160),
+}
+
+# Resolution the shipped assets were captured at
+REFERENCE_RESOLUTION = (1920, 1080)
+
+# Coarse level scales checked against full-resolution matching
+PYRAMID_SCALES = [0.25, 0.5, 0.75]
+
+# Benchmarked detector calls
+CASES = ["find_template", "find_template_with_scaling", "find_template_with_retry",
+         "find_template_with_scaling_retry", "batch", "wait_for_any_template"]
+
+def compose_frame(assets, resolution, reference_resolution=REFERENCE_RESOLUTION, seed=0, margin=32):
+    """Build a synthetic frame containing every asset scaled to the resolution
+    
+    Assets are packed in rows over a blurred noise background so matching
+    sees realistic texture instead of a flat color.
+    
+    Args:
+        assets (list): Paths of the template images to place
+        resolution (tuple): (width, height) of the frame
+        reference_resolution (tuple): Resolution at which the assets were captured
+        seed (int): Seed of the background noise
+        margin (int): Pixels between placed assets
+        
+    Returns:
+        tuple: (frame, placements) with placements mapping asset name to (left, top, width, height)
+    """
+    width, height = resolution
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    frame = cv2.GaussianBlur(frame, (0, 0), 3)
+    
+    scale_x = width / reference_resolution[0]
+    scale_y = height / reference_resolution[1]
+    
+    placements = {}
+    x, y, row_height = margin, margin, 0
+    for asset in assets:
+        image = cv2.imread(str(asset), cv2.IMREAD_COLOR)
+        if image is None:
+            logger.warning(f"⚠️ Could not read asset {asset}, skipping")
+            continue
+        size = (max(1, round(image.shape[1] * scale_x)), max(1, round(image.shape[0] * scale_y)))
+        interpolation = cv2.INTER_AREA if scale_x < 1.0 else cv2.INTER_LINEAR
+        image = cv2.resize(image, size, interpolation=interpolation)
+        
+        # Start a new row when the asset does not fit the current one
+        if x + size[0] + margin > width:
+            x, y, row_height = margin, y + row_height + margin, 0
+        if y + size[1] + margin > height:
+            raise ValueError(f"Assets do not fit a {width}x{height} frame")
+        
+        frame[y:y + size[1], x:x + size[0]] = image
+        placements[Path(asset).name] = (x, y, size[0], size[1])
+        x += size[0] + margin
+        row_height = max(row_height, size[1])
+    
+    return frame, placements
+
+
+def _measured_path(hit_rate):
+    """Name the detector path a case timed from its hit rate"""
+    if hit_rate == 0:
+        return "miss"
+    return "hit" if hit_rate == 1 else "mixed"
+
+
+def _peak_rss_growth(call, interval=0.001):
+    """Run a call while sampling the resident set size of the process
+    
+    Args:
+        call (callable): Function to run
+        interval (float): Time between samples in seconds
+        
+    Returns:
+        int: Largest resident set growth over the size before the call, in bytes
+    """
+    process = psutil.Process()
+    baseline = process.memory_info().rss
+    peak = [baseline]
+    done = threading.Event()
+    
+    def sample():
+        while not done.is_set():
+            peak[0] = max(peak[0], process.memory_info().rss)
+            done.wait(interval)
+    
+    sampler = threading.Thread(target=sample, name="katana-bench-rss", daemon=True)
+    sampler.start()
+    try:
+        call()
+    finally:
+        done.set()
+        sampler.join()
+    return max(peak[0], process.memory_info().rss) - baseline
+
+
+def _summarize(latencies, hits, peak_bytes):
+    """Summarize the timings of one case
+    
+    Args:
+        latencies (list): Call latencies in seconds
+        hits (int): Number of calls that found their template(s)
+        peak_bytes (int): Peak resident set growth of one call
+        
+    Returns:
+        dict: Latency percentiles (ms), throughput, hit rate, measured path and peak memory
+    """
+    latencies = np.array(latencies)
+    hit_rate = hits / len(latencies)
+    return {
+        "iterations": len(latencies),
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "mean_ms": float(latencies.mean() * 1000),
+        "max_ms": float(latencies.max() * 1000),
+        "calls_per_s": float(len(latencies) / latencies.sum()) if latencies.sum() > 0 else None,
+        "hit_rate": hit_rate,
+        "path": _measured_path(hit_rate),
+        "peak_rss_growth_mb": peak_bytes / (1024 * 1024),
+    }
+
+
+def _case_call(detector, case, template_names, resolution):
+    """Build the detector call benchmarked by a case
+    
+    Args:
+        detector (ImageDetector): Detector under test
+        case (str): Case name from CASES
+        template_names (list): Templates the call is made for
+        resolution (tuple): (width, height) of the frame
+        
+    Returns:
+        callable: Function performing one call and returning the number of hits
+    """
+    if case == "batch":
+        return lambda: sum(match.passes(0.8) for match in detector.find_templates(None, template_names, threshold=0.8))
+    if case == "wait_for_any_template":
+        # A single poll, so a miss times the matching rather than the timeout
+        return lambda: int(detector.wait_for_any_template(template_names, timeout=0, check_interval=0,
+                                                          skip_unchanged=False)[0] is not None)
+    
+    calls = {
+        "find_template": lambda name: detector.find_template(name),
+        "find_template_with_scaling": lambda name: detector.find_template_with_scaling(
+            name, current_resolution=resolution, reference_resolution=REFERENCE_RESOLUTION),
+        "find_template_with_retry": lambda name: detector.find_template_with_retry(name),
+        "find_template_with_scaling_retry": lambda name: detector.find_template_with_scaling_retry(
+            name, current_resolution=resolution, reference_resolution=REFERENCE_RESOLUTION),
+    }
+    call = calls[case]
+    return lambda: sum(call(name) is not None for name in template_names)
+
+
+def run_case(detector, case, template_names, resolution, iterations):
+    """Time one case against the detector's current frame
+    
+    One warm-up call fills the template cache, the timed calls follow and a
+    final call runs while the resident set size is sampled to record peak memory.
+    
+    Args:
+        detector (ImageDetector): Detector under test
+        case (str): Case name from CASES
+        template_names (list): Templates the calls are made for
+        resolution (tuple): (width, height) of the frame
+        iterations (int): Number of timed calls
+        
+    Returns:
+        dict: Case summary (see _summarize)
+    """
+    call = _case_call(detector, case, template_names, resolution)
+    call()
+    
+    latencies = []
+    hits = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        found = call()
+        latencies.append(time.perf_counter() - start)
+        # Single-template cases count a hit per template found, batches per frame
+        hits += found / len(template_names) if case.startswith("find_template") else min(found, 1)
+    
+    return _summarize(latencies, hits, _peak_rss_growth(call))
+
+
+def run_suite(assets_dir, resolutions=None, modes=None, cases=None, templates=None, iterations=10,
+              workers=0, hints=False):
+    """Run the detection microbenchmark
+    
+    Args:
+        assets_dir (Path): Directory of the template images
+        resolutions (list, optional): Resolution names from RESOLUTIONS (default all)
+        modes (list, optional): Match modes to benchmark (default full and pyramid)
+        cases (list, optional): Case names from CASES (default all)
+        templates (list, optional): Template names to use (default all assets)
+        iterations (int): Timed calls per case
+        workers (int): Detector scoring threads
+        hints (bool): Enable in-memory region hints
+        
+    Returns:
+        list: Result entries (resolution, mode, case and the case summary)
+    """
+    assets_dir = Path(assets_dir)
+    assets = sorted(assets_dir.glob("*.png"))
+    if templates:
+        assets = [asset for asset in assets if asset.name in templates]
+    template_names = [asset.name for asset in assets]
+    if not template_names:
+        raise ValueError(f"No templates to benchmark in {assets_dir}")
+    
+    results = []
+    for resolution_name in resolutions or list(RESOLUTIONS):
+        resolution = RESOLUTIONS[resolution_name]
+        frame, _ = compose_frame(assets, resolution)
+        
+        for mode in modes or [MATCH_FULL, MATCH_PYRAMID]:
+            detector = ImageDetector(assets_dir, capture=StaticCapture(frame), match_mode=mode,
+                                     region_hints=RegionHintIndex() if hints else None, workers=workers)
+            try:
+                for case in cases or CASES:
+                    summary = run_case(detector, case, template_names, resolution, iterations)
+                    results.append({"resolution": resolution_name, "mode": mode, "case": case, **summary})
+                    print(f"{resolution_name:>6} {mode:<8} {case:<34} p50 {summary['p50_ms']:8.2f} ms  "
+                          f"p99 {summary['p99_ms']:8.2f} ms  hits {summary['hit_rate']:>4.0%} "
+                          f"({summary['path']} path)  peak RSS +{summary['peak_rss_growth_mb']:.1f} MB")
+            finally:
+                detector.close()
+    
+    return results
+
+
+def check_buffer_reuse(assets_dir, template_name, mode, resolution=REFERENCE_RESOLUTION):
+    """Check that a detector sees a new frame written into a reused capture buffer
+    
+    Backends like mss convert every capture into the same output array, so
+    frame caches must not be keyed on the array itself. The template is
+    searched in a frame without it, then the frame with it is copied into the
+    same buffer and searched again.
+    
+    Args:
+        assets_dir (Path): Directory of the template images
+        template_name (str): Template to search for
+        mode (str): Match mode of the detector
+        resolution (tuple): (width, height) of the frames
+        
+    Returns:
+        bool: True if the template is only found once it is in the buffer
+    """
+    assets_dir = Path(assets_dir)
+    empty, _ = compose_frame([], resolution)
+    shown, placements = compose_frame([assets_dir / template_name], resolution)
+    
+    capture = StaticCapture(empty.copy())
+    detector = ImageDetector(assets_dir, capture=capture, match_mode=mode)
+    try:
+        before = detector.find_template(template_name)
+        np.copyto(capture.frame, shown)
+        after = detector.find_template(template_name)
+    finally:
+        detector.close()
+    
+    left, top, width, height = placements[template_name]
+    found = after is not None and abs(after[0] - (left + width // 2)) <= 2 and abs(after[1] - (top + height // 2)) <= 2
+    passed = before is None and found
+    print(f"{'✅' if passed else '❌'} {mode:<8} reused buffer: {template_name} before {before}, after {after}")
+    return passed
+
+
+def check_pyramid_agreement(assets_dir, template_names, pyramid_scale, resolution=REFERENCE_RESOLUTION,
+                            max_offset=2, max_confidence_delta=0.01):
+    """Check that pyramid matching finds the templates where full-resolution matching does
+    
+    Every template is composited into one frame and scored in full and in
+    pyramid mode; the pyramid only picks candidates, so the refined match
+    has to land on the same pixels with the same confidence.
+    
+    Args:
+        assets_dir (Path): Directory of the template images
+        template_names (list): Templates to check
+        pyramid_scale (float): Coarse level scale of the pyramid detector
+        resolution (tuple): (width, height) of the frame
+        max_offset (int): Allowed distance between the match centers in pixels, per axis
+        max_confidence_delta (float): Allowed confidence difference
+        
+    Returns:
+        bool: True if both modes agree on every template
+    """
+    assets_dir = Path(assets_dir)
+    frame, _ = compose_frame([assets_dir / name for name in template_names], resolution)
+    
+    matches = {}
+    for mode in (MATCH_FULL, MATCH_PYRAMID):
+        detector = ImageDetector(assets_dir, capture=StaticCapture(frame), match_mode=mode, pyramid_scale=pyramid_scale)
+        try:
+            matches[mode] = detector.find_templates(None, template_names)
+        finally:
+            detector.close()
+    
+    passed = True
+    for full, pyramid in zip(matches[MATCH_FULL], matches[MATCH_PYRAMID]):
+        agrees = full.location is not None and pyramid.location is not None
+        if agrees:
+            agrees = (abs(full.location[0] - pyramid.location[0]) <= max_offset
+                      and abs(full.location[1] - pyramid.location[1]) <= max_offset
+                      and abs(full.confidence - pyramid.confidence) <= max_confidence_delta)
+        passed = passed and agrees
+        print(f"{'✅' if agrees else '❌'} pyramid {pyramid_scale:<4} {full.name}: full {full.location} "
+              f"({full.confidence:.3f}), pyramid {pyramid.location} ({pyramid.confidence:.3f})")
+    return passed
+
+
+def compare_results(baseline, results, tolerance=0.2):
+    """Compare p50 latencies against a baseline result file
+    
+    Args:
+        baseline (dict): Previously written result document
+        results (list): Result entries of the current run
+        tolerance (float): Allowed relative p50 slowdown before a case counts as a regression
+        
+    Returns:
+        list: (resolution, mode, case, baseline_ms, current_ms) of regressed cases
+    """
+    previous = {(r["resolution"], r["mode"], r["case"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        key = (result["resolution"], result["mode"], result["case"])
+        if key not in previous:
+            continue
+        before, after = previous[key]["p50_ms"], result["p50_ms"]
+        change = (after - before) / before if before > 0 else 0.0
+        marker = "❌" if change > tolerance else "✅"
+        # A case that switched between the hit and miss paths times different work
+        previous_path = previous[key].get("path")
+        note = f", {previous_path} -> {result['path']} path" if previous_path and previous_path != result["path"] else ""
+        print(f"{marker} {key[0]:>6} {key[1]:<8} {key[2]:<34} {before:8.2f} -> {after:8.2f} ms ({change:+.0%}{note})")
+        if change > tolerance:
+            regressions.append((*key, before, after))
+    return regressions
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Katana detection microbenchmark")
+    parser.add_argument("--game", "-g", default="cs2", help="Game whose assets are benchmarked")
+    parser.add_argument("--resolutions", nargs="+", choices=list(RESOLUTIONS), help="Frame resolutions")
+    parser.add_argument("--modes", nargs="+", choices=[MATCH_FULL, MATCH_PYRAMID, MATCH_KEYPOINT], help="Match modes")
+    parser.add_argument("--cases", nargs="+", choices=CASES, help="Detector calls to time")
+    parser.add_argument("--templates", nargs="+", help="Template names (default: all assets)")
+    parser.add_argument("--iterations", "-n", type=int, default=10, help="Timed calls per case")
+    parser.add_argument("--workers", type=int, default=0, help="Detector scoring threads")
+    parser.add_argument("--hints", action="store_true", help="Enable in-memory region hints")
+    parser.add_argument("--output", "-o", type=Path, help="Result file (default: results/bench/detection_<time>.json)")
+    parser.add_argument("--compare", type=Path, help="Baseline result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative p50 slowdown")
+    parser.add_argument("--check", action="store_true",
+                        help="Only check that every mode sees frames written into a reused capture buffer "
+                             "and that pyramid matching agrees with full-resolution matching")
+    parser.add_argument("--pyramid-scales", nargs="+", type=float, default=PYRAMID_SCALES,
+                        help="Coarse level scales checked by --check")
+    args = parser.parse_args(argv)
+    
+    # Keep the detector's per-call logging out of the measurements' output
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s - %(message)s")
+    logger.setLevel(logging.ERROR)
+    
+    assets_dir = Path(__file__).parent.parent / "games" / args.game / "assets"
+    if args.check:
+        template_names = args.templates or [asset.name for asset in sorted(assets_dir.glob("*.png"))]
+        checks = [check_buffer_reuse(assets_dir, name, mode)
+                  for mode in args.modes or [MATCH_FULL, MATCH_PYRAMID, MATCH_KEYPOINT] for name in template_names]
+        checks += [check_pyramid_agreement(assets_dir, template_names, scale) for scale in args.pyramid_scales]
+        return 0 if all(checks) else 1
+    
+    results = run_suite(assets_dir, resolutions=args.resolutions, modes=args.modes, cases=args.cases,
+                        templates=args.templates, iterations=args.iterations, workers=args.workers,
+                        hints=args.hints)
+    
+    document = {
+        "version": RESULTS_VERSION,
+        "katana_version": __version__,
+        "timestamp": time.strftime("%Y%m%d_%H%M%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "config": {
+            "game": args.game,
+            "iterations": args.iterations,
+            "workers": args.workers,
+            "hints": args.hints,
+            "reference_resolution": list(REFERENCE_RESOLUTION),
+        },
+        "results": results,
+    }
+    
+    output_path = args.output or Path("results") / "bench" / f"detection_{document['timestamp']}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"✅ Results saved to: {output_path}")
+    
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare_results(json.load(f), results, tolerance=args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} case(s) regressed by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file